@@ -0,0 +1,151 @@
+import json
+from itertools import groupby
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.db import engine
+
+BULK_CHUNK_SIZE = 1000
+NDJSON_MEDIA_TYPES = {"application/x-ndjson", "application/jsonl", "application/json-seq"}
+# Integer columns are 64-bit in SQLite and PostgreSQL (BIGINT); anything wider
+# fails in the driver, after validation, and would abort the whole request.
+INTEGER_MIN = -(2**63)
+INTEGER_MAX = 2**63 - 1
+
+
+class BulkRowError(BaseModel):
+    index: int
+    errors: List[Dict[str, Any]]
+
+
+class BulkResult(BaseModel):
+    created: int = 0
+    errors: List[BulkRowError] = []
+
+
+async def _ndjson_rows(request: Request) -> AsyncIterator[Tuple[int, Any]]:
+    index = 0
+    pending = b""
+    async for chunk in request.stream():
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield index, _parse_line(line)
+                index += 1
+    if pending.strip():
+        yield index, _parse_line(pending)
+
+
+def _parse_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError as exc:
+        return exc
+
+
+async def _json_rows(request: Request) -> AsyncIterator[Tuple[int, Any]]:
+    try:
+        rows = json.loads(await request.body())
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="Body is not valid JSON") from exc
+    if not isinstance(rows, list):
+        raise HTTPException(status_code=400, detail="Expected a JSON array of objects")
+    for index, row in enumerate(rows):
+        yield index, row
+
+
+def _validate(model: type[SQLModel], row: Any) -> Tuple[Optional[Dict[str, Any]], List]:
+    if isinstance(row, ValueError):
+        return None, [{"type": "json_invalid", "msg": str(row)}]
+    if not isinstance(row, dict):
+        return None, [{"type": "model_type", "msg": "Expected a JSON object"}]
+    try:
+        values = model.model_validate(row).model_dump()
+    except ValidationError as exc:
+        return None, jsonable_encoder(exc.errors(include_url=False))
+    errors = [
+        {
+            "type": "int_range",
+            "loc": [name],
+            "msg": f"Integer must be between {INTEGER_MIN} and {INTEGER_MAX}",
+            "input": value,
+        }
+        for name, value in values.items()
+        if isinstance(value, int) and not INTEGER_MIN <= value <= INTEGER_MAX
+    ]
+    if errors:
+        return None, errors
+    if values.get("id") is None:
+        values.pop("id", None)
+    return values, []
+
+
+async def _insert_chunk(
+    model: type[SQLModel], chunk: List[Tuple[int, Dict[str, Any]]], result: BulkResult
+) -> None:
+    """Insert one validated chunk in a single transaction.
+
+    Consecutive rows with the same columns go in as one executemany; if the
+    database rejects the chunk, rows are retried one at a time in savepoints
+    so only the offending rows fail.
+    """
+    table = model.__table__
+    statement = insert(table)
+    async with AsyncSession(engine) as session:
+        try:
+            rows = (values for _, values in chunk)
+            for _, run in groupby(rows, key=lambda values: values.keys()):
+                await session.execute(statement, list(run))
+            await session.commit()
+            result.created += len(chunk)
+            return
+        except SQLAlchemyError:
+            await session.rollback()
+
+        for index, values in chunk:
+            try:
+                async with session.begin_nested():
+                    await session.execute(statement, [values])
+            except SQLAlchemyError as exc:
+                error = {"type": "database_error", "msg": str(exc.orig or exc).splitlines()[0]}
+                result.errors.append(BulkRowError(index=index, errors=[error]))
+                continue
+            result.created += 1
+        await session.commit()
+
+
+async def bulk_create(
+    request: Request, model: type[SQLModel], chunk_size: int = BULK_CHUNK_SIZE
+) -> BulkResult:
+    """Create rows of ``model`` from a JSON array or an NDJSON stream.
+
+    Rows are validated and inserted in chunks of ``chunk_size``, one
+    transaction per chunk. Invalid rows are reported by their position in
+    the input and do not prevent the rest of their chunk from being stored.
+    """
+    media_type = request.headers.get("content-type", "").split(";")[0].strip()
+    rows = _ndjson_rows(request) if media_type in NDJSON_MEDIA_TYPES else _json_rows(request)
+
+    result = BulkResult()
+    chunk: List[Tuple[int, Dict[str, Any]]] = []
+    async for index, row in rows:
+        values, errors = _validate(model, row)
+        if errors:
+            result.errors.append(BulkRowError(index=index, errors=errors))
+            continue
+        chunk.append((index, values))
+        if len(chunk) >= chunk_size:
+            await _insert_chunk(model, chunk, result)
+            chunk = []
+    if chunk:
+        await _insert_chunk(model, chunk, result)
+    result.errors.sort(key=lambda error: error.index)
+    return result
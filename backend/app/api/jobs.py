@@ -0,0 +1,83 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+
+class MrpJobRequest(BaseModel):
+    """MRP run input; with ``from_database`` stock and BOM are read from the tables.
+
+    Database items are keyed ``module:<id>``, ``material:<id>`` and
+    ``fabric:<id>``, and ``demand`` must use the same keys. Fractional
+    database quantities are planned exactly and reported in their stored units.
+    """
+
+    demand: Dict[str, int]
+    stock: Dict[str, int] = {}
+    bom: Dict[str, Dict[str, int]] = {}
+    from_database: bool = False
+
+
+class MaterialInput(BaseModel):
+    name: str
+    material_type: str
+    unit_cost: float
+    quantity: float = 0
+    metadata: Dict[str, float] = {}
+
+
+class LaborInput(BaseModel):
+    name: str
+    hourly_rate: float
+    hours: float
+
+
+class HardwareInput(BaseModel):
+    name: str
+    unit_cost: float
+    quantity: float
+
+
+class TimeInput(BaseModel):
+    name: str
+    minutes: float
+
+
+class RuleInput(BaseModel):
+    """Quantity rule of a material type: a ``formula`` or a built-in rule.
+
+    ``roll_width`` selects the fabric rule and ``density`` the filling rule.
+    """
+
+    material_type: str
+    formula: Optional[str] = None
+    parameters: Dict[str, float] = {}
+    defaults: Dict[str, float] = {}
+    roll_width: Optional[float] = None
+    density: Optional[float] = None
+
+
+class EscandalloInput(BaseModel):
+    module_id: str
+    measurements: Dict[str, float]
+    materials: List[MaterialInput] = []
+    labor: List[LaborInput] = []
+    hardware: List[HardwareInput] = []
+    times: List[TimeInput] = []
+    rules: List[RuleInput] = []
+
+
+class CostingJobRequest(BaseModel):
+    escandallos: List[EscandalloInput]
+
+
+class JobStatus(BaseModel):
+    id: int
+    kind: str
+    status: str
+    progress: float
+    input_hash: str
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -0,0 +1,199 @@
+import base64
+import json
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+
+from fastapi import HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import Column, and_, or_
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.db import engine
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+EXPORT_BATCH_SIZE = 1000
+RESERVED_PARAMS = {"cursor", "limit", "sort", "fields"}
+
+
+@dataclass
+class ListQuery:
+    cursor: Optional[str] = None
+    limit: int = DEFAULT_LIMIT
+    sort: Optional[str] = None
+    fields: Optional[str] = None
+    filters: Dict[str, str] = field(default_factory=dict)
+
+
+def list_query(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    sort: Optional[str] = Query(None, description="Indexed column, prefix with - for descending"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return"),
+) -> ListQuery:
+    """Shared query parameters of every list endpoint.
+
+    Any other query parameter naming an indexed column is an equality filter.
+    """
+    filters = {
+        key: value for key, value in request.query_params.items() if key not in RESERVED_PARAMS
+    }
+    return ListQuery(cursor=cursor, limit=limit, sort=sort, fields=fields, filters=filters)
+
+
+def _columns(model: type[SQLModel]) -> Dict[str, Column]:
+    return {column.name: column for column in model.__table__.columns}
+
+
+def _indexed_columns(model: type[SQLModel]) -> Dict[str, Column]:
+    return {
+        name: column
+        for name, column in _columns(model).items()
+        if column.primary_key or column.index or column.unique
+    }
+
+
+def _primary_key(model: type[SQLModel]) -> Column:
+    return next(column for column in model.__table__.columns if column.primary_key)
+
+
+def _parse(column: Column, value: Any) -> Any:
+    if value is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is bool and isinstance(value, str):
+        return value.lower() in {"1", "true", "yes"}
+    if python_type in (int, float):
+        return python_type(value)
+    return value
+
+
+def _encode_cursor(values: Sequence[Any]) -> str:
+    payload = json.dumps(jsonable_encoder(list(values)), separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+    if not isinstance(values, list) or len(values) != 2:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def _sort_column(model: type[SQLModel], sort: Optional[str]) -> tuple[Column, bool]:
+    if not sort:
+        return _primary_key(model), False
+    descending = sort.startswith("-")
+    name = sort[1:] if descending else sort
+    column = _indexed_columns(model).get(name)
+    if column is None or (column.nullable and not column.primary_key):
+        raise HTTPException(status_code=400, detail=f"Cannot sort by '{name}'")
+    return column, descending
+
+
+def _selected_columns(model: type[SQLModel], fields: Optional[str]) -> List[Column]:
+    columns = _columns(model)
+    if not fields:
+        return list(columns.values())
+    selected = []
+    for name in (part.strip() for part in fields.split(",")):
+        if name not in columns:
+            raise HTTPException(status_code=400, detail=f"Unknown field '{name}'")
+        selected.append(columns[name])
+    return selected
+
+
+def _base_statement(model: type[SQLModel], query: ListQuery):
+    sort_column, descending = _sort_column(model, query.sort)
+    primary_key = _primary_key(model)
+    selected = _selected_columns(model, query.fields)
+    labels = [column.name for column in selected]
+    hidden = [column for column in (sort_column, primary_key) if column.name not in labels]
+
+    statement = select(*selected, *hidden)
+    indexed = _indexed_columns(model)
+    for name, value in query.filters.items():
+        column = indexed.get(name)
+        if column is None:
+            raise HTTPException(status_code=400, detail=f"Cannot filter by '{name}'")
+        try:
+            statement = statement.where(column == _parse(column, value))
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=f"Invalid value for '{name}'") from exc
+
+    order = (sort_column.desc(), primary_key.desc()) if descending else (sort_column, primary_key)
+    return statement.order_by(*order), labels, sort_column, primary_key, descending
+
+
+def _row_dict(row: Any, labels: Sequence[str]) -> Dict[str, Any]:
+    mapping = row._mapping
+    return {label: mapping[label] for label in labels}
+
+
+async def paginate(
+    session: AsyncSession, model: type[SQLModel], query: ListQuery
+) -> JSONResponse:
+    """Return one keyset page of ``model`` as a JSON array.
+
+    The cursor for the following page, if any, is returned in the
+    ``X-Next-Cursor`` header so list responses stay plain arrays.
+    """
+    statement, labels, sort_column, primary_key, descending = _base_statement(model, query)
+    if query.cursor:
+        sort_value, last_id = _decode_cursor(query.cursor)
+        try:
+            sort_value = _parse(sort_column, sort_value)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+        if descending:
+            after = or_(
+                sort_column < sort_value, and_(sort_column == sort_value, primary_key < last_id)
+            )
+        else:
+            after = or_(
+                sort_column > sort_value, and_(sort_column == sort_value, primary_key > last_id)
+            )
+        statement = statement.where(after)
+
+    rows = (await session.exec(statement.limit(query.limit + 1))).all()
+    headers = {}
+    if len(rows) > query.limit:
+        rows = rows[: query.limit]
+        last = rows[-1]._mapping
+        headers["X-Next-Cursor"] = _encode_cursor((last[sort_column.name], last[primary_key.name]))
+    content = jsonable_encoder([_row_dict(row, labels) for row in rows])
+    return JSONResponse(content=content, headers=headers)
+
+
+def stream_ndjson(model: type[SQLModel], query: ListQuery) -> StreamingResponse:
+    """Stream every matching row as newline-delimited JSON.
+
+    Rows are fetched in batches of ``EXPORT_BATCH_SIZE`` on a dedicated
+    session, so the full result set is never held in memory.
+    """
+    statement, labels, _, _, _ = _base_statement(model, query)
+
+    async def lines() -> AsyncIterator[bytes]:
+        async with AsyncSession(engine) as session:
+            result = await session.stream(
+                statement.execution_options(yield_per=EXPORT_BATCH_SIZE)
+            )
+            async for row in result:
+                yield (json.dumps(jsonable_encoder(_row_dict(row, labels))) + "\n").encode()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
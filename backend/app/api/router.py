@@ -1,8 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
+from typing import Any, Dict
 
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.bulk import BulkResult, bulk_create
+from app.api.jobs import CostingJobRequest, JobStatus, MrpJobRequest
+from app.api.pagination import ListQuery, list_query, paginate, stream_ndjson
+from app.cache import catalogue_cache
 from app.db import get_session
+from app.jobs import SUCCEEDED, job_runner
+from app.mrp_inputs import load_mrp_inputs, to_integer_units
 from app.models import (
+    ComputeJob,
     Customer,
     Fabric,
     Material,
@@ -18,142 +27,340 @@ from app.models import (
 router = APIRouter()
 
 
-def get_or_404(session: Session, model, item_id: int):
-    item = session.get(model, item_id)
+async def get_or_404(session: AsyncSession, model, item_id: int):
+    item = await session.get(model, item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     return item
 
 
 @router.get("/models", response_model=list[SofaModel])
-def list_models(session: Session = Depends(get_session)):
-    return session.exec(select(SofaModel)).all()
+async def list_models(
+    request: Request,
+    query: ListQuery = Depends(list_query),
+    session: AsyncSession = Depends(get_session),
+):
+    return await catalogue_cache.respond(
+        request, SofaModel, lambda: paginate(session, SofaModel, query)
+    )
+
+
+@router.get("/models/export")
+async def export_models(query: ListQuery = Depends(list_query)):
+    return stream_ndjson(SofaModel, query)
+
+
+@router.post("/models/bulk", response_model=BulkResult)
+async def bulk_create_models(request: Request):
+    # Chunks committed before a failure (a bad NDJSON line, a dropped
+    # connection) are already visible, so invalidate on every exit.
+    try:
+        return await bulk_create(request, SofaModel)
+    finally:
+        catalogue_cache.invalidate(SofaModel)
 
 
 @router.post("/models", response_model=SofaModel)
-def create_model(model: SofaModel, session: Session = Depends(get_session)):
+async def create_model(model: SofaModel, session: AsyncSession = Depends(get_session)):
     session.add(model)
-    session.commit()
-    session.refresh(model)
+    await session.commit()
+    catalogue_cache.invalidate(SofaModel)
+    await session.refresh(model)
     return model
 
 
 @router.get("/modules", response_model=list[Module])
-def list_modules(session: Session = Depends(get_session)):
-    return session.exec(select(Module)).all()
+async def list_modules(
+    request: Request,
+    query: ListQuery = Depends(list_query),
+    session: AsyncSession = Depends(get_session),
+):
+    return await catalogue_cache.respond(
+        request, Module, lambda: paginate(session, Module, query)
+    )
+
+
+@router.get("/modules/export")
+async def export_modules(query: ListQuery = Depends(list_query)):
+    return stream_ndjson(Module, query)
+
+
+@router.post("/modules/bulk", response_model=BulkResult)
+async def bulk_create_modules(request: Request):
+    try:
+        return await bulk_create(request, Module)
+    finally:
+        catalogue_cache.invalidate(Module)
 
 
 @router.post("/modules", response_model=Module)
-def create_module(module: Module, session: Session = Depends(get_session)):
+async def create_module(module: Module, session: AsyncSession = Depends(get_session)):
     session.add(module)
-    session.commit()
-    session.refresh(module)
+    await session.commit()
+    catalogue_cache.invalidate(Module)
+    await session.refresh(module)
     return module
 
 
 @router.get("/fabrics", response_model=list[Fabric])
-def list_fabrics(session: Session = Depends(get_session)):
-    return session.exec(select(Fabric)).all()
+async def list_fabrics(
+    request: Request,
+    query: ListQuery = Depends(list_query),
+    session: AsyncSession = Depends(get_session),
+):
+    return await catalogue_cache.respond(
+        request, Fabric, lambda: paginate(session, Fabric, query)
+    )
+
+
+@router.get("/fabrics/export")
+async def export_fabrics(query: ListQuery = Depends(list_query)):
+    return stream_ndjson(Fabric, query)
+
+
+@router.post("/fabrics/bulk", response_model=BulkResult)
+async def bulk_create_fabrics(request: Request):
+    try:
+        return await bulk_create(request, Fabric)
+    finally:
+        catalogue_cache.invalidate(Fabric)
 
 
 @router.post("/fabrics", response_model=Fabric)
-def create_fabric(fabric: Fabric, session: Session = Depends(get_session)):
+async def create_fabric(fabric: Fabric, session: AsyncSession = Depends(get_session)):
     session.add(fabric)
-    session.commit()
-    session.refresh(fabric)
+    await session.commit()
+    catalogue_cache.invalidate(Fabric)
+    await session.refresh(fabric)
     return fabric
 
 
 @router.get("/materials", response_model=list[Material])
-def list_materials(session: Session = Depends(get_session)):
-    return session.exec(select(Material)).all()
+async def list_materials(
+    request: Request,
+    query: ListQuery = Depends(list_query),
+    session: AsyncSession = Depends(get_session),
+):
+    return await catalogue_cache.respond(
+        request, Material, lambda: paginate(session, Material, query)
+    )
+
+
+@router.get("/materials/export")
+async def export_materials(query: ListQuery = Depends(list_query)):
+    return stream_ndjson(Material, query)
+
+
+@router.post("/materials/bulk", response_model=BulkResult)
+async def bulk_create_materials(request: Request):
+    try:
+        return await bulk_create(request, Material)
+    finally:
+        catalogue_cache.invalidate(Material)
 
 
 @router.post("/materials", response_model=Material)
-def create_material(material: Material, session: Session = Depends(get_session)):
+async def create_material(material: Material, session: AsyncSession = Depends(get_session)):
     session.add(material)
-    session.commit()
-    session.refresh(material)
+    await session.commit()
+    catalogue_cache.invalidate(Material)
+    await session.refresh(material)
     return material
 
 
 @router.get("/suppliers", response_model=list[Supplier])
-def list_suppliers(session: Session = Depends(get_session)):
-    return session.exec(select(Supplier)).all()
+async def list_suppliers(
+    query: ListQuery = Depends(list_query), session: AsyncSession = Depends(get_session)
+):
+    return await paginate(session, Supplier, query)
+
+
+@router.get("/suppliers/export")
+async def export_suppliers(query: ListQuery = Depends(list_query)):
+    return stream_ndjson(Supplier, query)
+
+
+@router.post("/suppliers/bulk", response_model=BulkResult)
+async def bulk_create_suppliers(request: Request):
+    return await bulk_create(request, Supplier)
 
 
 @router.post("/suppliers", response_model=Supplier)
-def create_supplier(supplier: Supplier, session: Session = Depends(get_session)):
+async def create_supplier(supplier: Supplier, session: AsyncSession = Depends(get_session)):
     session.add(supplier)
-    session.commit()
-    session.refresh(supplier)
+    await session.commit()
+    await session.refresh(supplier)
     return supplier
 
 
 @router.get("/customers", response_model=list[Customer])
-def list_customers(session: Session = Depends(get_session)):
-    return session.exec(select(Customer)).all()
+async def list_customers(
+    query: ListQuery = Depends(list_query), session: AsyncSession = Depends(get_session)
+):
+    return await paginate(session, Customer, query)
+
+
+@router.get("/customers/export")
+async def export_customers(query: ListQuery = Depends(list_query)):
+    return stream_ndjson(Customer, query)
+
+
+@router.post("/customers/bulk", response_model=BulkResult)
+async def bulk_create_customers(request: Request):
+    return await bulk_create(request, Customer)
 
 
 @router.post("/customers", response_model=Customer)
-def create_customer(customer: Customer, session: Session = Depends(get_session)):
+async def create_customer(customer: Customer, session: AsyncSession = Depends(get_session)):
     session.add(customer)
-    session.commit()
-    session.refresh(customer)
+    await session.commit()
+    await session.refresh(customer)
     return customer
 
 
 @router.get("/sales-orders", response_model=list[SalesOrder])
-def list_sales_orders(session: Session = Depends(get_session)):
-    return session.exec(select(SalesOrder)).all()
+async def list_sales_orders(
+    query: ListQuery = Depends(list_query), session: AsyncSession = Depends(get_session)
+):
+    return await paginate(session, SalesOrder, query)
+
+
+@router.get("/sales-orders/export")
+async def export_sales_orders(query: ListQuery = Depends(list_query)):
+    return stream_ndjson(SalesOrder, query)
+
+
+@router.post("/sales-orders/bulk", response_model=BulkResult)
+async def bulk_create_sales_orders(request: Request):
+    return await bulk_create(request, SalesOrder)
 
 
 @router.post("/sales-orders", response_model=SalesOrder)
-def create_sales_order(order: SalesOrder, session: Session = Depends(get_session)):
+async def create_sales_order(order: SalesOrder, session: AsyncSession = Depends(get_session)):
     session.add(order)
-    session.commit()
-    session.refresh(order)
+    await session.commit()
+    await session.refresh(order)
     return order
 
 
 @router.get("/production-orders", response_model=list[ProductionOrder])
-def list_production_orders(session: Session = Depends(get_session)):
-    return session.exec(select(ProductionOrder)).all()
+async def list_production_orders(
+    query: ListQuery = Depends(list_query), session: AsyncSession = Depends(get_session)
+):
+    return await paginate(session, ProductionOrder, query)
+
+
+@router.get("/production-orders/export")
+async def export_production_orders(query: ListQuery = Depends(list_query)):
+    return stream_ndjson(ProductionOrder, query)
+
+
+@router.post("/production-orders/bulk", response_model=BulkResult)
+async def bulk_create_production_orders(request: Request):
+    return await bulk_create(request, ProductionOrder)
 
 
 @router.post("/production-orders", response_model=ProductionOrder)
-def create_production_order(
-    order: ProductionOrder, session: Session = Depends(get_session)
+async def create_production_order(
+    order: ProductionOrder, session: AsyncSession = Depends(get_session)
 ):
     session.add(order)
-    session.commit()
-    session.refresh(order)
+    await session.commit()
+    await session.refresh(order)
     return order
 
 
 @router.get("/stock-locations", response_model=list[StockLocation])
-def list_stock_locations(session: Session = Depends(get_session)):
-    return session.exec(select(StockLocation)).all()
+async def list_stock_locations(
+    query: ListQuery = Depends(list_query), session: AsyncSession = Depends(get_session)
+):
+    return await paginate(session, StockLocation, query)
+
+
+@router.get("/stock-locations/export")
+async def export_stock_locations(query: ListQuery = Depends(list_query)):
+    return stream_ndjson(StockLocation, query)
+
+
+@router.post("/stock-locations/bulk", response_model=BulkResult)
+async def bulk_create_stock_locations(request: Request):
+    return await bulk_create(request, StockLocation)
 
 
 @router.post("/stock-locations", response_model=StockLocation)
-def create_stock_location(
-    location: StockLocation, session: Session = Depends(get_session)
+async def create_stock_location(
+    location: StockLocation, session: AsyncSession = Depends(get_session)
 ):
     session.add(location)
-    session.commit()
-    session.refresh(location)
+    await session.commit()
+    await session.refresh(location)
     return location
 
 
 @router.get("/stock-items", response_model=list[StockItem])
-def list_stock_items(session: Session = Depends(get_session)):
-    return session.exec(select(StockItem)).all()
+async def list_stock_items(
+    query: ListQuery = Depends(list_query), session: AsyncSession = Depends(get_session)
+):
+    return await paginate(session, StockItem, query)
+
+
+@router.get("/stock-items/export")
+async def export_stock_items(query: ListQuery = Depends(list_query)):
+    return stream_ndjson(StockItem, query)
+
+
+@router.post("/stock-items/bulk", response_model=BulkResult)
+async def bulk_create_stock_items(request: Request):
+    return await bulk_create(request, StockItem)
 
 
 @router.post("/stock-items", response_model=StockItem)
-def create_stock_item(item: StockItem, session: Session = Depends(get_session)):
+async def create_stock_item(item: StockItem, session: AsyncSession = Depends(get_session)):
     session.add(item)
-    session.commit()
-    session.refresh(item)
+    await session.commit()
+    await session.refresh(item)
     return item
+
+
+async def submit_job(
+    response: Response, session: AsyncSession, kind: str, params: Dict[str, Any]
+) -> ComputeJob:
+    job, created = await job_runner.submit(session, kind, params)
+    response.status_code = 202 if created else 200
+    response.headers["Location"] = f"/api/jobs/{job.id}"
+    return job
+
+
+@router.post("/jobs/mrp", response_model=JobStatus, status_code=202)
+async def create_mrp_job(
+    request: MrpJobRequest, response: Response, session: AsyncSession = Depends(get_session)
+):
+    params = request.model_dump(exclude={"from_database"})
+    if request.from_database:
+        if request.stock or request.bom:
+            raise HTTPException(status_code=400, detail="stock and bom are read from the database")
+        inputs, decimals = to_integer_units(await load_mrp_inputs(session, request.demand))
+        params.update(demand=inputs.demand, stock=inputs.stock, bom=inputs.bom)
+        if decimals:
+            params["decimals"] = decimals
+    return await submit_job(response, session, "mrp", params)
+
+
+@router.post("/jobs/costing", response_model=JobStatus, status_code=202)
+async def create_costing_job(
+    request: CostingJobRequest, response: Response, session: AsyncSession = Depends(get_session)
+):
+    return await submit_job(response, session, "costing", request.model_dump())
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatus)
+async def read_job(job_id: int, session: AsyncSession = Depends(get_session)):
+    return await get_or_404(session, ComputeJob, job_id)
+
+
+@router.get("/jobs/{job_id}/result")
+async def read_job_result(job_id: int, session: AsyncSession = Depends(get_session)):
+    job = await get_or_404(session, ComputeJob, job_id)
+    if job.status != SUCCEEDED:
+        raise HTTPException(status_code=409, detail=job.error or f"Job is {job.status}")
+    return job.result
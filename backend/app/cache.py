@@ -0,0 +1,127 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from fastapi import Request, Response
+from sqlmodel import SQLModel
+
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "300"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "512"))
+CACHED_HEADERS = ("X-Next-Cursor",)
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    etag: str
+    expires_at: float
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        if not if_none_match:
+            return False
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or self.etag in tags
+
+    def to_response(self, request: Request) -> Response:
+        headers = {**self.headers, "ETag": self.etag, "Cache-Control": "no-cache"}
+        if self.matches(request.headers.get("if-none-match")):
+            return Response(status_code=304, headers=headers)
+        return Response(content=self.body, media_type="application/json", headers=headers)
+
+
+class ResponseCache:
+    """In-process cache of serialized list responses, bounded by TTL and LRU.
+
+    Entries are grouped by table so a write can drop every cached page of
+    that table at once. Each worker process keeps its own cache; the TTL
+    bounds how long a worker that did not see a write can serve stale rows.
+    """
+
+    def __init__(
+        self, ttl_seconds: float = CACHE_TTL_SECONDS, max_entries: int = CACHE_MAX_ENTRIES
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], CachedResponse]" = OrderedDict()
+        self._keys_by_table: Dict[str, Set[Tuple[str, str]]] = {}
+        self._generations: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, table: str, query: str) -> Optional[CachedResponse]:
+        key = (table, query)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._discard(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, table: str, query: str, response: Response) -> CachedResponse:
+        body = bytes(response.body)
+        entry = CachedResponse(
+            body=body,
+            etag='"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"',
+            expires_at=time.monotonic() + self.ttl_seconds,
+            headers={
+                name: response.headers[name] for name in CACHED_HEADERS if name in response.headers
+            },
+        )
+        key = (table, query)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        self._keys_by_table.setdefault(table, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._discard(next(iter(self._entries)))
+        return entry
+
+    def invalidate(self, model: type[SQLModel]) -> None:
+        table = model.__tablename__
+        self._generations[table] = self._generations.get(table, 0) + 1
+        for key in self._keys_by_table.pop(table, set()):
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._keys_by_table.clear()
+
+    def _discard(self, key: Tuple[str, str]) -> None:
+        self._entries.pop(key, None)
+        keys = self._keys_by_table.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+
+    async def respond(
+        self,
+        request: Request,
+        model: type[SQLModel],
+        render: Callable[[], Awaitable[Response]],
+    ) -> Response:
+        """Serve a list response for ``model`` from cache, rendering it on a miss.
+
+        Hits return the stored bytes without touching the database or
+        serializing rows, or a 304 when ``If-None-Match`` carries the ETag.
+        """
+        table = model.__tablename__
+        query = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+        entry = self.get(table, query)
+        if entry is None:
+            generation = self._generations.get(table, 0)
+            response = await render()
+            if response.status_code != 200:
+                return response
+            if self._generations.get(table, 0) != generation:
+                # A write landed while rendering; serve this page but don't keep it.
+                return response
+            entry = self.put(table, query, response)
+        return entry.to_response(request)
+
+
+catalogue_cache = ResponseCache()
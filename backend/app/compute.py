@@ -0,0 +1,122 @@
+"""MRP and costing runs executed by the job worker pool.
+
+The planning code lives in ``src/`` (``fabrica`` and ``escandallo``), so the
+backend runs with ``PYTHONPATH=../src``. Every function takes and returns
+plain JSON values: they cross process boundaries and are stored as job
+results as they are.
+"""
+
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional
+
+from escandallo import (
+    Escandallo,
+    FabricRule,
+    FillingRule,
+    HardwareItem,
+    LaborItem,
+    MaterialItem,
+    MaterialRule,
+    TimeEntry,
+)
+from escandallo_formulas import FormulaRule
+from fabrica import planificar_mrp
+
+
+@dataclass(frozen=True)
+class JobKind:
+    run: Callable[[Dict[str, Any]], Dict[str, Any]]
+    # List in the params that is split into chunks to report progress; the
+    # result of each chunk holds its rows under the same key.
+    chunk_key: Optional[str] = None
+
+    def split(self, params: Dict[str, Any], chunk_size: int) -> List[Dict[str, Any]]:
+        if self.chunk_key is None or len(params[self.chunk_key]) <= chunk_size:
+            return [params]
+        rows = params[self.chunk_key]
+        return [
+            {**params, self.chunk_key: rows[start : start + chunk_size]}
+            for start in range(0, len(rows), chunk_size)
+        ]
+
+    def merge(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        if len(results) == 1:
+            return results[0]
+        return {self.chunk_key: [row for result in results for row in result[self.chunk_key]]}
+
+
+def _in_stored_units(quantity: int, decimals: int) -> Any:
+    return quantity if not decimals else float(Decimal(quantity).scaleb(-decimals))
+
+
+def run_mrp(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Plan with ``planificar_mrp``; ``decimals`` comes from ``to_integer_units``."""
+    requirements = planificar_mrp(params["demand"], params["stock"], params["bom"])
+    decimals = params.get("decimals", {})
+    rows = []
+    for item, requirement in sorted(requirements.items()):
+        places = decimals.get(item, 0)
+        rows.append(
+            {
+                "item": item,
+                "demand": _in_stored_units(requirement.demanda, places),
+                "stock": _in_stored_units(requirement.stock, places),
+                "net_requirement": _in_stored_units(requirement.requerimiento_neto, places),
+            }
+        )
+    return {"requirements": rows}
+
+
+def _rule(data: Dict[str, Any]) -> MaterialRule:
+    if data.get("formula") is not None:
+        return FormulaRule.from_dict(data)
+    if data.get("roll_width") is not None:
+        return FabricRule(material_type=data["material_type"], roll_width=data["roll_width"])
+    if data.get("density") is not None:
+        return FillingRule(material_type=data["material_type"], density=data["density"])
+    raise ValueError(f"Rule for '{data['material_type']}' needs a formula, roll_width or density")
+
+
+def _escandallo(data: Dict[str, Any]) -> Escandallo:
+    escandallo = Escandallo(
+        module_id=data["module_id"],
+        measurements=dict(data["measurements"]),
+        materials=[MaterialItem(**material) for material in data["materials"]],
+        labor=[LaborItem(**item) for item in data["labor"]],
+        hardware=[HardwareItem(**item) for item in data["hardware"]],
+        times=[TimeEntry(**entry) for entry in data["times"]],
+        rules={rule["material_type"]: _rule(rule) for rule in data["rules"]},
+    )
+    escandallo.recalculate("costing job")
+    return escandallo
+
+
+def run_costing(params: Dict[str, Any]) -> Dict[str, Any]:
+    rows = []
+    for data in params["escandallos"]:
+        escandallo = _escandallo(data)
+        rows.append(
+            {
+                "module_id": escandallo.module_id,
+                "material_cost": escandallo.total_material_cost(),
+                "labor_cost": escandallo.total_labor_cost(),
+                "hardware_cost": escandallo.total_hardware_cost(),
+                "total_cost": escandallo.total_cost(),
+                "materials": [
+                    {
+                        "name": material.name,
+                        "quantity": material.quantity,
+                        "total_cost": material.total_cost,
+                    }
+                    for material in escandallo.materials
+                ],
+            }
+        )
+    return {"escandallos": rows}
+
+
+JOB_KINDS = {
+    "mrp": JobKind(run_mrp),
+    "costing": JobKind(run_costing, chunk_key="escandallos"),
+}
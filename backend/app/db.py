@@ -1,13 +1,82 @@
-from sqlmodel import Session, SQLModel, create_engine
+import os
 
-DATABASE_URL = "sqlite:///./fabrica.db"
-engine = create_engine(DATABASE_URL, echo=False)
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./fabrica.db")
+DATABASE_POOL_SIZE = int(os.getenv("DATABASE_POOL_SIZE", "10"))
+# SQLite has a single writer, so connections beyond the pool only add writers
+# busy-waiting on its lock; server databases get room for bursts instead.
+DATABASE_MAX_OVERFLOW = int(
+    os.getenv("DATABASE_MAX_OVERFLOW", "0" if DATABASE_URL.startswith("sqlite") else "20")
+)
+DATABASE_ECHO = os.getenv("DATABASE_ECHO", "") == "1"
 
-def init_db() -> None:
-    SQLModel.metadata.create_all(engine)
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
 
+# Applied to every new SQLite connection: WAL lets readers proceed while a
+# writer holds the lock, and busy_timeout makes writers wait instead of failing.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 15000,
+    "cache_size": -64000,
+    "temp_store": "MEMORY",
+}
 
-def get_session():
-    with Session(engine) as session:
+
+def async_database_url(url: str) -> str:
+    """Return ``url`` with the async driver for its dialect if none is given."""
+    scheme, separator, rest = url.partition("://")
+    return ASYNC_DRIVERS.get(scheme, scheme) + separator + rest
+
+
+def _engine_options(url: str) -> dict:
+    if url.startswith("sqlite") and (":memory:" in url or url.endswith("://")):
+        return {}
+    return {
+        "pool_size": DATABASE_POOL_SIZE,
+        "max_overflow": DATABASE_MAX_OVERFLOW,
+        "pool_pre_ping": not url.startswith("sqlite"),
+    }
+
+
+engine = create_async_engine(
+    async_database_url(DATABASE_URL),
+    echo=DATABASE_ECHO,
+    **_engine_options(DATABASE_URL),
+)
+
+if engine.dialect.name == "sqlite":
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def _create_schema(connection) -> None:
+    SQLModel.metadata.create_all(connection)
+    # create_all skips tables that already exist, so indexes added to a model
+    # later are created here for databases made by an older version.
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+
+async def init_db() -> None:
+    async with engine.begin() as connection:
+        await connection.run_sync(_create_schema)
+
+
+async def get_session():
+    async with AsyncSession(engine, expire_on_commit=False) as session:
         yield session
@@ -0,0 +1,296 @@
+import asyncio
+import hashlib
+import json
+import os
+import socket
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.compute import JOB_KINDS
+from app.db import engine
+from app.models import ComputeJob
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", str(os.cpu_count() or 1)))
+JOB_CHUNK_SIZE = int(os.getenv("JOB_CHUNK_SIZE", "200"))
+# A running job renews its lease every third of this; a job whose lease has
+# expired is taken over by the next process that looks for abandoned jobs.
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+# Part of every input hash: bump it when a job kind changes its results so
+# results cached by the previous code are not served again.
+JOB_RESULT_VERSION = 1
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+def input_hash(kind: str, params: Dict[str, Any]) -> str:
+    """Hash of the canonical JSON of a job's kind and validated parameters."""
+    payload = json.dumps(
+        {"kind": kind, "version": JOB_RESULT_VERSION, "params": params},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class JobRunner:
+    """Runs MRP and costing jobs in a local process pool, tracked in ``ComputeJob``.
+
+    Requests are keyed by the hash of their input: a request whose hash
+    matches a queued, running or succeeded job gets that job back, so
+    duplicate requests share one run and finished results are served from
+    the table. The unique ``reuse_key`` column enforces this across
+    processes. Failed jobs are not reused, so resubmitting retries them.
+
+    Each API process owns its pool and runs the jobs it holds a lease on,
+    renewing the lease while they run. A job whose lease is lost stops and
+    writes nothing. Every ``lease_seconds`` the runner takes over queued or
+    running jobs whose lease has expired, which is what happens to the jobs
+    of a process that stopped without releasing them.
+    """
+
+    def __init__(
+        self,
+        workers: int = JOB_WORKERS,
+        chunk_size: int = JOB_CHUNK_SIZE,
+        lease_seconds: float = JOB_LEASE_SECONDS,
+    ):
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.lease = timedelta(seconds=lease_seconds)
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._reclaimer: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        await self.reclaim_expired()
+        self._reclaimer = asyncio.create_task(self._reclaim_periodically())
+
+    async def shutdown(self) -> None:
+        if self._reclaimer is not None:
+            self._reclaimer.cancel()
+            await asyncio.gather(self._reclaimer, return_exceptions=True)
+            self._reclaimer = None
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        # Give the unfinished jobs back so the next process need not wait for
+        # their leases to expire.
+        async with AsyncSession(engine) as session:
+            await session.execute(
+                update(ComputeJob)
+                .where(
+                    ComputeJob.worker_id == self.worker_id,
+                    ComputeJob.status.in_((QUEUED, RUNNING)),
+                )
+                .values(
+                    status=QUEUED,
+                    progress=0,
+                    started_at=None,
+                    worker_id=None,
+                    lease_expires_at=None,
+                    updated_at=datetime.utcnow(),
+                )
+            )
+            await session.commit()
+
+    async def reclaim_expired(self) -> List[int]:
+        """Queue again, under this process, the jobs whose lease has expired.
+
+        Each job is taken with a conditional ``UPDATE``, so when several
+        processes look at the same time only one of them gets it.
+        """
+        now = datetime.utcnow()
+        expired = or_(ComputeJob.lease_expires_at.is_(None), ComputeJob.lease_expires_at < now)
+        active = ComputeJob.status.in_((QUEUED, RUNNING))
+        claimed = []
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            statement = select(ComputeJob).where(active, expired).order_by(ComputeJob.id)
+            for job in (await session.exec(statement)).all():
+                taken = await session.execute(
+                    update(ComputeJob)
+                    .where(ComputeJob.id == job.id, active, expired)
+                    .values(
+                        status=QUEUED,
+                        progress=0,
+                        started_at=None,
+                        worker_id=self.worker_id,
+                        lease_expires_at=now + self.lease,
+                        updated_at=now,
+                    )
+                )
+                await session.commit()
+                if taken.rowcount:
+                    claimed.append(job)
+        for job in claimed:
+            self._spawn(job)
+        return [job.id for job in claimed]
+
+    async def _reclaim_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.lease.total_seconds())
+            try:
+                await self.reclaim_expired()
+            except Exception:
+                # Transient database errors must not stop the sweep; the
+                # next round tries again.
+                continue
+
+    async def submit(
+        self, session: AsyncSession, kind: str, params: Dict[str, Any]
+    ) -> Tuple[ComputeJob, bool]:
+        """Return the job for ``params`` and whether it was created by this call."""
+        digest = input_hash(kind, params)
+        existing = await self._reusable(session, digest)
+        if existing is not None:
+            return existing, False
+        now = datetime.utcnow()
+        job = ComputeJob(
+            kind=kind,
+            input_hash=digest,
+            reuse_key=digest,
+            params=params,
+            worker_id=self.worker_id,
+            lease_expires_at=now + self.lease,
+        )
+        session.add(job)
+        try:
+            await session.commit()
+        except IntegrityError:
+            # Another request, maybe in another process, inserted the same
+            # input between the lookup and the insert: share its job.
+            await session.rollback()
+            existing = await self._reusable(session, digest)
+            if existing is None:
+                raise
+            return existing, False
+        await session.refresh(job)
+        self._spawn(job)
+        return job, True
+
+    @staticmethod
+    async def _reusable(session: AsyncSession, digest: str) -> Optional[ComputeJob]:
+        statement = select(ComputeJob).where(ComputeJob.reuse_key == digest)
+        return (await session.exec(statement)).first()
+
+    def _spawn(self, job: ComputeJob) -> None:
+        task = asyncio.create_task(self._run(job.id, job.kind, job.params))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, job_id: int, kind: str, params: Dict[str, Any]) -> None:
+        """Compute the job while its lease is renewed; stop if the lease is lost."""
+        heartbeat = asyncio.create_task(self._renew_lease(job_id))
+        work = asyncio.create_task(self._compute(job_id, kind, params))
+        try:
+            await asyncio.wait((heartbeat, work), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            # Shutting down (``shutdown`` queues the job again for the next
+            # process) or the lease was lost: either way the work stops here.
+            heartbeat.cancel()
+            work.cancel()
+            await asyncio.gather(heartbeat, work, return_exceptions=True)
+        if work.cancelled():
+            return  # another process runs, or will run, the job
+        exc = work.exception()
+        if exc is not None:
+            await self._update(
+                job_id,
+                status=FAILED,
+                error=f"{type(exc).__name__}: {exc}",
+                reuse_key=None,
+                worker_id=None,
+                lease_expires_at=None,
+                finished_at=datetime.utcnow(),
+            )
+            return
+        await self._update(
+            job_id,
+            status=SUCCEEDED,
+            progress=1.0,
+            result=work.result(),
+            worker_id=None,
+            lease_expires_at=None,
+            finished_at=datetime.utcnow(),
+        )
+
+    async def _compute(self, job_id: int, kind: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        pending: List[asyncio.Future] = []
+        try:
+            job_kind = JOB_KINDS[kind]
+            chunks = job_kind.split(params, self.chunk_size)
+            await self._update(job_id, status=RUNNING, started_at=datetime.utcnow())
+
+            async def run_chunk(index: int, chunk: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+                return index, await loop.run_in_executor(self._executor, job_kind.run, chunk)
+
+            pending = [asyncio.ensure_future(run_chunk(i, c)) for i, c in enumerate(chunks)]
+            results: List[Optional[Dict[str, Any]]] = [None] * len(chunks)
+            for done, future in enumerate(asyncio.as_completed(pending), start=1):
+                index, results[index] = await future
+                if done < len(chunks):
+                    await self._update(job_id, progress=done / len(chunks))
+            return job_kind.merge(results)
+        finally:
+            for future in pending:
+                future.cancel()
+
+    async def _renew_lease(self, job_id: int) -> None:
+        """Renew the lease on ``job_id`` until it is lost, then return.
+
+        The lease is lost when another process has taken the job over, or
+        when renewals keep failing until the last lease this process got has
+        run out; in that case the error is raised.
+        """
+        loop = asyncio.get_running_loop()
+        lease = self.lease.total_seconds()
+        renewed = loop.time()
+        while True:
+            await asyncio.sleep(lease / 3)
+            attempt = loop.time()
+            try:
+                if not await self._update(job_id):
+                    return
+            except Exception:
+                # A transient database error: retry at the next beat while the
+                # lease still holds when it comes.
+                if attempt + lease / 3 - renewed >= lease:
+                    raise
+                continue
+            renewed = attempt
+
+    async def _update(self, job_id: int, **values: Any) -> bool:
+        """Set ``values`` and renew the lease if this process still holds the job.
+
+        The ownership check and the write are one conditional ``UPDATE``, so
+        nothing is written once another process has taken the job over, not
+        even a result computed here. Returns whether the job was updated.
+        """
+        now = datetime.utcnow()
+        values.setdefault("lease_expires_at", now + self.lease)
+        async with AsyncSession(engine) as session:
+            updated = await session.execute(
+                update(ComputeJob)
+                .where(ComputeJob.id == job_id, ComputeJob.worker_id == self.worker_id)
+                .values(updated_at=now, **values)
+            )
+            await session.commit()
+        return bool(updated.rowcount)
+
+
+job_runner = JobRunner()
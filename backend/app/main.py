@@ -3,6 +3,7 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.router import router
 from app.db import init_db
+from app.jobs import job_runner
 
 app = FastAPI(title="Fabrica API", version="0.1.0")
 
@@ -12,12 +13,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 
 @app.on_event("startup")
-def on_startup() -> None:
-    init_db()
+async def on_startup() -> None:
+    await init_db()
+    await job_runner.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    await job_runner.shutdown()
 
 
 @app.get("/")
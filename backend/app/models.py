@@ -1,6 +1,7 @@
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, Optional
 
+from sqlalchemy import JSON, Index
 from sqlmodel import Field, SQLModel
 
 
@@ -87,16 +88,16 @@ class Module(TimestampedModel, table=True):
 
 class BillOfMaterials(TimestampedModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    module_id: int = Field(foreign_key="module.id")
+    module_id: int = Field(foreign_key="module.id", index=True)
     labor_minutes: int
     labor_cost: float
 
 
 class BomItem(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    bom_id: int = Field(foreign_key="billofmaterials.id")
-    material_id: Optional[int] = Field(default=None, foreign_key="material.id")
-    fabric_id: Optional[int] = Field(default=None, foreign_key="fabric.id")
+    bom_id: int = Field(foreign_key="billofmaterials.id", index=True)
+    material_id: Optional[int] = Field(default=None, foreign_key="material.id", index=True)
+    fabric_id: Optional[int] = Field(default=None, foreign_key="fabric.id", index=True)
     quantity: float
     unit: str
 
@@ -108,10 +109,14 @@ class StockLocation(SQLModel, table=True):
 
 
 class StockItem(TimestampedModel, table=True):
+    # Covers SUM(quantity) grouped by material and module, so stock totals
+    # are read from the index alone.
+    __table_args__ = (Index("ix_stockitem_totals", "material_id", "module_id", "quantity"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
-    location_id: int = Field(foreign_key="stocklocation.id")
-    material_id: Optional[int] = Field(default=None, foreign_key="material.id")
-    module_id: Optional[int] = Field(default=None, foreign_key="module.id")
+    location_id: int = Field(foreign_key="stocklocation.id", index=True)
+    material_id: Optional[int] = Field(default=None, foreign_key="material.id", index=True)
+    module_id: Optional[int] = Field(default=None, foreign_key="module.id", index=True)
     product_name: Optional[str] = None
     quantity: float
     unit: str
@@ -166,3 +171,24 @@ class PurchaseOrderItem(SQLModel, table=True):
     unit: str
     price: float
     currency: str = "EUR"
+
+
+class ComputeJob(TimestampedModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    kind: str = Field(index=True)
+    input_hash: str = Field(index=True)
+    # The input hash while the job can be reused (queued, running or
+    # succeeded), NULL once it fails: the unique constraint keeps one such
+    # job per input across every API process.
+    reuse_key: Optional[str] = Field(default=None, unique=True)
+    status: str = Field(default="queued", index=True)
+    # Process that holds the job and until when; any process may take over
+    # a queued or running job whose lease has expired.
+    worker_id: Optional[str] = None
+    lease_expires_at: Optional[datetime] = Field(default=None, index=True)
+    progress: float = 0
+    params: Dict[str, Any] = Field(default_factory=dict, sa_type=JSON)
+    result: Optional[Dict[str, Any]] = Field(default=None, sa_type=JSON)
+    error: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -0,0 +1,171 @@
+"""Build ``planificar_mrp`` inputs from the database with set-based queries.
+
+Items are keyed ``module:<id>``, ``material:<id>`` and ``fabric:<id>``. The
+BOM of a module is its latest ``BillOfMaterials`` (highest id), and stock is
+the sum of ``StockItem.quantity`` per material or module, in the unit the
+rows are stored in. Both are aggregated by the database and read as plain
+rows, without instantiating ORM objects.
+
+``SalesOrder`` has no lines, so demand per module cannot be derived from the
+tables and is given by the caller. Quantities are returned as stored.
+``planificar_mrp`` plans in whole units, so ``to_integer_units`` rescales
+fractional quantities (fabric metres, stock in kilos) to a whole number of
+``10**-decimals`` of each item before planning.
+"""
+
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models import BillOfMaterials, BomItem, StockItem
+from fabrica import calcular_codigos_nivel_bajo
+
+STREAM_PARTITION_SIZE = 5000
+# Stored quantities are floats; they are read with at most this many decimals
+# so sums such as 0.1 + 0.2 do not ask for a 10**-17 unit.
+MRP_MAX_DECIMALS = 6
+
+
+def module_key(module_id: int) -> str:
+    return f"module:{module_id}"
+
+
+def material_key(material_id: int) -> str:
+    return f"material:{material_id}"
+
+
+def fabric_key(fabric_id: int) -> str:
+    return f"fabric:{fabric_id}"
+
+
+@dataclass
+class MrpInputs:
+    demand: Dict[str, float]
+    stock: Dict[str, float] = field(default_factory=dict)
+    bom: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+
+def bom_statement():
+    """Component quantities of each module's latest BOM, one row per component."""
+    latest = select(func.max(BillOfMaterials.id)).group_by(BillOfMaterials.module_id)
+    return (
+        select(
+            BillOfMaterials.module_id,
+            BomItem.material_id,
+            BomItem.fabric_id,
+            func.sum(BomItem.quantity),
+        )
+        .join(BomItem, BomItem.bom_id == BillOfMaterials.id)
+        .where(BillOfMaterials.id.in_(latest))
+        .group_by(BillOfMaterials.module_id, BomItem.material_id, BomItem.fabric_id)
+    )
+
+
+def stock_statement(location_ids: Optional[Iterable[int]] = None):
+    """Total stock per material and per module, optionally of some locations only."""
+    statement = select(
+        StockItem.material_id, StockItem.module_id, func.sum(StockItem.quantity)
+    ).group_by(StockItem.material_id, StockItem.module_id)
+    if location_ids is not None:
+        statement = statement.where(StockItem.location_id.in_(list(location_ids)))
+    return statement
+
+
+async def _rows(session: AsyncSession, statement):
+    result = await session.stream(statement)
+    async for partition in result.partitions(STREAM_PARTITION_SIZE):
+        for row in partition:
+            yield row
+
+
+async def load_bom(session: AsyncSession) -> Dict[str, Dict[str, float]]:
+    bom: Dict[str, Dict[str, float]] = {}
+    async for module_id, material_id, fabric_id, quantity in _rows(session, bom_statement()):
+        if material_id is not None:
+            component = material_key(material_id)
+        elif fabric_id is not None:
+            component = fabric_key(fabric_id)
+        else:
+            continue
+        bom.setdefault(module_key(module_id), {})[component] = quantity
+    return bom
+
+
+async def load_stock(
+    session: AsyncSession, location_ids: Optional[Iterable[int]] = None
+) -> Dict[str, float]:
+    stock: Dict[str, float] = {}
+    async for material_id, module_id, quantity in _rows(session, stock_statement(location_ids)):
+        if material_id is not None:
+            key = material_key(material_id)
+        elif module_id is not None:
+            key = module_key(module_id)
+        else:
+            continue
+        stock[key] = stock.get(key, 0) + quantity
+    return stock
+
+
+async def load_mrp_inputs(
+    session: AsyncSession,
+    demand: Mapping[str, float],
+    location_ids: Optional[Iterable[int]] = None,
+) -> MrpInputs:
+    """Demand as given, plus stock and BOM adjacency read with two aggregated queries."""
+    return MrpInputs(
+        demand=dict(demand),
+        stock=await load_stock(session, location_ids),
+        bom=await load_bom(session),
+    )
+
+
+def _exact(quantity: float) -> Decimal:
+    return Decimal(str(round(quantity, MRP_MAX_DECIMALS))).normalize()
+
+
+def _decimals(quantity: float) -> int:
+    return max(-_exact(quantity).as_tuple().exponent, 0)
+
+
+def to_integer_units(inputs: MrpInputs) -> Tuple[MrpInputs, Dict[str, int]]:
+    """Rescale ``inputs`` to whole quantities, and the decimals used per item.
+
+    Each item is counted in units of ``10**-decimals``, with enough decimals
+    for its demand and stock and for every BOM line that consumes it:
+    ``parent decimals + line decimals``, so that a whole number of parent
+    units always needs a whole number of component units. Planning the
+    rescaled inputs is exact; divide each result by ``10**decimals`` of its
+    item to get back to the stored units. Items with whole quantities keep
+    ``decimals == 0`` and are left out of the returned mapping.
+    """
+    decimals: Dict[str, int] = {}
+    for quantities in (inputs.demand, inputs.stock):
+        for item, quantity in quantities.items():
+            decimals[item] = max(decimals.get(item, 0), _decimals(quantity))
+    levels = calcular_codigos_nivel_bajo(inputs.bom)
+    for parent in sorted(inputs.bom, key=levels.__getitem__):
+        parent_decimals = decimals.get(parent, 0)
+        for component, quantity in inputs.bom[parent].items():
+            needed = parent_decimals + _decimals(quantity)
+            decimals[component] = max(decimals.get(component, 0), needed)
+
+    def whole(quantities: Mapping[str, float]) -> Dict[str, int]:
+        return {
+            item: int(_exact(quantity).scaleb(decimals.get(item, 0)))
+            for item, quantity in quantities.items()
+        }
+
+    bom = {
+        parent: {
+            component: int(
+                _exact(quantity).scaleb(decimals.get(component, 0) - decimals.get(parent, 0))
+            )
+            for component, quantity in components.items()
+        }
+        for parent, components in inputs.bom.items()
+    }
+    scaled = MrpInputs(demand=whole(inputs.demand), stock=whole(inputs.stock), bom=bom)
+    return scaled, {item: places for item, places in decimals.items() if places}
@@ -0,0 +1,24 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+BACKEND = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND.parent / "src"))
+sys.path.insert(0, str(BACKEND))
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/test.db")
+
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+
+    from app.db import engine
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+        # Pooled connections belong to the client's event loop.
+        test_client.portal.call(engine.dispose)
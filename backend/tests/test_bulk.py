@@ -0,0 +1,35 @@
+import uuid
+
+# Suppliers: test_mrp_inputs inserts models, modules and materials with fixed ids.
+
+
+def test_out_of_range_integers_are_rejected_per_row(client):
+    name = uuid.uuid4().hex
+    row = {"name": name, "tax_id": "B-1", "contact_name": "Ana"}
+    rows = [row, {**row, "id": 2**63}, {**row, "id": -(2**70)}]
+
+    response = client.post("/api/suppliers/bulk", json=rows)
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["created"] == 1
+    assert [error["index"] for error in result["errors"]] == [1, 2]
+    assert {error["errors"][0]["type"] for error in result["errors"]} == {"int_range"}
+    assert len(client.get("/api/suppliers", params={"name": name}).json()) == 1
+
+
+def test_ndjson_rows_are_validated_like_json_arrays(client):
+    name = uuid.uuid4().hex
+    row = f'"name": "{name}", "tax_id": "B-2", "contact_name": "Ana"'
+    body = f"{{{row}}}\n{{{row}, \"id\": {2**64}}}\nnot json\n"
+
+    response = client.post(
+        "/api/suppliers/bulk", content=body, headers={"content-type": "application/x-ndjson"}
+    )
+
+    errors = response.json()["errors"]
+    assert response.json()["created"] == 1
+    assert [(error["index"], error["errors"][0]["type"]) for error in errors] == [
+        (1, "int_range"),
+        (2, "json_invalid"),
+    ]
@@ -0,0 +1,107 @@
+import asyncio
+import random
+
+from fastapi import Request, Response
+
+from app.cache import ResponseCache
+from app.models import Material
+
+
+def _response(body, cursor=None):
+    headers = {"X-Next-Cursor": cursor} if cursor else None
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def test_entries_are_bounded_by_lru():
+    cache = ResponseCache(ttl_seconds=60, max_entries=2)
+    cache.put("material", "a", _response(b"[1]"))
+    cache.put("material", "b", _response(b"[2]"))
+    assert cache.get("material", "a") is not None
+    cache.put("material", "c", _response(b"[3]"))
+
+    assert len(cache) == 2
+    assert cache.get("material", "b") is None
+    assert cache.get("material", "a").body == b"[1]"
+
+
+def test_expired_entries_are_dropped():
+    cache = ResponseCache(ttl_seconds=0, max_entries=8)
+    cache.put("material", "a", _response(b"[]"))
+
+    assert cache.get("material", "a") is None
+    assert len(cache) == 0
+
+
+def test_invalidate_drops_only_the_written_table():
+    cache = ResponseCache(ttl_seconds=60, max_entries=8)
+    cache.put("material", "a", _response(b"[1]", cursor="abc"))
+    cache.put("fabric", "a", _response(b"[2]"))
+
+    cache.invalidate(Material)
+
+    assert cache.get("material", "a") is None
+    assert cache.get("fabric", "a") is not None
+
+
+def test_etag_tracks_the_body_and_keeps_the_cursor():
+    cache = ResponseCache(ttl_seconds=60, max_entries=8)
+    first = cache.put("material", "a", _response(b"[1]", cursor="abc"))
+    second = cache.put("material", "a", _response(b"[2]"))
+
+    assert first.etag != second.etag
+    assert first.headers == {"X-Next-Cursor": "abc"}
+    assert first.matches(f'W/{first.etag}, "other"')
+    assert not first.matches(second.etag)
+
+
+def test_page_rendered_across_a_write_is_served_but_not_kept():
+    cache = ResponseCache(ttl_seconds=60, max_entries=8)
+    request = Request({"type": "http", "query_string": b"limit=5", "headers": []})
+
+    async def render():
+        cache.invalidate(Material)
+        return _response(b"[1]")
+
+    response = asyncio.run(cache.respond(request, Material, render))
+
+    assert response.body == b"[1]"
+    assert len(cache) == 0
+
+
+def _create_material(client, name):
+    # Explicit ids: test_mrp_inputs inserts materials with fixed small ids.
+    material = {"id": random.randrange(10**6, 10**9), "name": name, "unit": "kg",
+                "internal_code": name}
+    assert client.post("/api/materials", json=material).status_code == 200
+
+
+def test_list_responses_revalidate_and_change_after_a_write(client):
+    params = {"sort": "-id", "limit": 1000}
+    first = client.get("/api/materials", params=params)
+    etag = first.headers["ETag"]
+
+    cached = client.get("/api/materials", params=params, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+
+    _create_material(client, f"cache-{random.random()}")
+    fresh = client.get("/api/materials", params=params, headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["ETag"] != etag
+    assert len(fresh.json()) == len(first.json()) + 1
+
+
+def test_bulk_import_invalidates_even_with_rejected_rows(client):
+    params = {"limit": 1000}
+    etag = client.get("/api/materials", params=params).headers["ETag"]
+
+    name = f"bulk-{random.random()}"
+    rows = [
+        {"id": random.randrange(10**6, 10**9), "name": name, "unit": "kg", "internal_code": "B"},
+        {"name": name},
+    ]
+    result = client.post("/api/materials/bulk", json=rows).json()
+    assert result["created"] == 1
+
+    response = client.get("/api/materials", params=params, headers={"If-None-Match": etag})
+    assert response.status_code == 200
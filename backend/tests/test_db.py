@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+
+from app.db import (
+    DATABASE_MAX_OVERFLOW,
+    DATABASE_POOL_SIZE,
+    _engine_options,
+    async_database_url,
+    engine,
+)
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("sqlite:///./fabrica.db", "sqlite+aiosqlite:///./fabrica.db"),
+        ("postgresql://user@db/fabrica", "postgresql+asyncpg://user@db/fabrica"),
+        ("postgres://user@db/fabrica", "postgresql+asyncpg://user@db/fabrica"),
+        ("sqlite+aiosqlite:///x.db", "sqlite+aiosqlite:///x.db"),
+        ("postgresql+psycopg://user@db/fabrica", "postgresql+psycopg://user@db/fabrica"),
+    ],
+)
+def test_async_database_url_keeps_an_explicit_driver(url, expected):
+    assert async_database_url(url) == expected
+
+
+def test_in_memory_sqlite_gets_no_pool_options():
+    assert _engine_options("sqlite+aiosqlite:///:memory:") == {}
+    assert _engine_options("sqlite://") == {}
+
+
+def test_pool_options_ping_only_server_databases():
+    assert _engine_options("sqlite+aiosqlite:///fabrica.db") == {
+        "pool_size": DATABASE_POOL_SIZE,
+        "max_overflow": DATABASE_MAX_OVERFLOW,
+        "pool_pre_ping": False,
+    }
+    assert _engine_options("postgresql://user@db/fabrica")["pool_pre_ping"] is True
+
+
+def test_sqlite_connections_get_the_pragmas():
+    async def pragmas():
+        async with engine.connect() as connection:
+            journal = (await connection.execute(text("PRAGMA journal_mode"))).scalar()
+            timeout = (await connection.execute(text("PRAGMA busy_timeout"))).scalar()
+        await engine.dispose()
+        return journal, timeout
+
+    assert asyncio.run(pragmas()) == ("wal", 15000)
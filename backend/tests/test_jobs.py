@@ -0,0 +1,142 @@
+import asyncio
+import threading
+import uuid
+
+import pytest
+from sqlalchemy import update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app import jobs
+from app.compute import JobKind
+from app.db import engine, init_db
+from app.jobs import FAILED, RUNNING, SUCCEEDED, JobRunner
+from app.models import ComputeJob
+
+LEASE_SECONDS = 0.3
+
+
+@pytest.fixture
+def release():
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+@pytest.fixture
+def blocking_kind(monkeypatch, release):
+    """A job kind whose chunks wait for ``release`` in the default thread pool."""
+
+    def run(chunk):
+        if not release.wait(timeout=10):
+            raise TimeoutError("never released")
+        if chunk.get("fail"):
+            raise ValueError("bad chunk")
+        return {"rows": [row * 2 for row in chunk["rows"]]}
+
+    monkeypatch.setitem(jobs.JOB_KINDS, "blocking", JobKind(run=run, chunk_key="rows"))
+    return "blocking"
+
+
+def run_scenario(scenario):
+    async def main():
+        await init_db()
+        # Without ``start`` the runner has no pool and uses the loop's threads.
+        runner = JobRunner(workers=1, chunk_size=2, lease_seconds=LEASE_SECONDS)
+        try:
+            return await scenario(runner)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+
+async def submit(runner, kind, **params):
+    async with AsyncSession(engine) as session:
+        job, created = await runner.submit(session, kind, {"tag": uuid.uuid4().hex, **params})
+    assert created
+    return job.id, next(iter(runner._tasks))
+
+
+async def load(job_id):
+    async with AsyncSession(engine) as session:
+        return await session.get(ComputeJob, job_id)
+
+
+async def wait_for_status(job_id, status):
+    for _ in range(200):
+        if (await load(job_id)).status == status:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} never reached {status}")
+
+
+def test_job_succeeds_and_releases_its_lease(blocking_kind, release):
+    async def scenario(runner):
+        job_id, task = await submit(runner, blocking_kind, rows=[1, 2, 3])
+        await wait_for_status(job_id, RUNNING)
+        # Longer than the lease: the heartbeat keeps it.
+        await asyncio.sleep(2 * LEASE_SECONDS)
+        release.set()
+        await asyncio.wait_for(task, 5)
+        return await load(job_id)
+
+    job = run_scenario(scenario)
+
+    assert (job.status, job.result, job.worker_id) == (SUCCEEDED, {"rows": [2, 4, 6]}, None)
+
+
+def test_failed_job_records_the_error(blocking_kind, release):
+    async def scenario(runner):
+        release.set()
+        job_id, task = await submit(runner, blocking_kind, rows=[1], fail=True)
+        await asyncio.wait_for(task, 5)
+        return await load(job_id)
+
+    job = run_scenario(scenario)
+
+    assert (job.status, job.error, job.reuse_key) == (FAILED, "ValueError: bad chunk", None)
+
+
+def test_lost_lease_stops_the_job_without_writing(blocking_kind, release):
+    async def scenario(runner):
+        job_id, task = await submit(runner, blocking_kind, rows=[1, 2, 3])
+        await wait_for_status(job_id, RUNNING)
+        async with AsyncSession(engine) as session:
+            await session.execute(
+                update(ComputeJob).where(ComputeJob.id == job_id).values(worker_id="other")
+            )
+            await session.commit()
+
+        await asyncio.wait_for(task, 5)
+        release.set()
+        written = await runner._update(job_id, status=SUCCEEDED, result={"rows": []})
+        return written, await load(job_id)
+
+    written, job = run_scenario(scenario)
+
+    assert not written
+    assert (job.status, job.result, job.worker_id) == (RUNNING, None, "other")
+
+
+def test_failing_heartbeat_stops_the_job(blocking_kind, release):
+    async def scenario(runner):
+        update_job = runner._update
+        beats = []
+
+        async def flaky_update(job_id, **values):
+            if not values:  # a lease renewal
+                beats.append(job_id)
+                raise ConnectionError("database unavailable")
+            return await update_job(job_id, **values)
+
+        runner._update = flaky_update
+        job_id, task = await submit(runner, blocking_kind, rows=[1])
+        await asyncio.wait_for(task, 5)
+        release.set()
+        return beats, await load(job_id)
+
+    beats, job = run_scenario(scenario)
+
+    # One failed renewal is retried; the second would leave the lease expired.
+    assert len(beats) == 2
+    assert (job.status, job.result) == (RUNNING, None)
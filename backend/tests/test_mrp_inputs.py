@@ -0,0 +1,79 @@
+import asyncio
+
+from sqlalchemy import insert
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.compute import run_mrp
+from app.db import engine, init_db
+from app.models import (
+    BillOfMaterials,
+    BomItem,
+    Fabric,
+    Material,
+    Module,
+    SofaModel,
+    StockItem,
+    StockLocation,
+)
+from app.mrp_inputs import MrpInputs, load_mrp_inputs, to_integer_units
+
+
+async def _load_from_database(demand):
+    await init_db()
+    rows = {
+        SofaModel: [{"id": 1, "name": "Modelo"}],
+        Module: [
+            {"id": 7, "model_id": 1, "name": "Módulo", "width_cm": 90, "depth_cm": 95,
+             "height_cm": 80, "weight_kg": 30}
+        ],
+        Material: [{"id": 4, "name": "Espuma", "unit": "kg", "internal_code": "MAT-4"}],
+        Fabric: [
+            {"id": 3, "name": "Tela", "color": "gris", "composition": "poliéster",
+             "price_per_meter": 12.5, "supplier_code": "T-3", "internal_code": "TEL-3"}
+        ],
+        StockLocation: [{"id": 1, "name": "Almacén"}],
+        BillOfMaterials: [{"id": 1, "module_id": 7, "labor_minutes": 90, "labor_cost": 35.0}],
+        BomItem: [
+            {"bom_id": 1, "material_id": None, "fabric_id": 3, "quantity": 2.5, "unit": "m"},
+            {"bom_id": 1, "material_id": 4, "fabric_id": None, "quantity": 0.4, "unit": "kg"},
+        ],
+        StockItem: [{"location_id": 1, "material_id": 4, "quantity": 1.5, "unit": "kg"}],
+    }
+    async with engine.begin() as connection:
+        for model, values in rows.items():
+            await connection.execute(insert(model.__table__), values)
+    async with AsyncSession(engine) as session:
+        inputs = await load_mrp_inputs(session, demand)
+    await engine.dispose()
+    return inputs
+
+
+def test_fractional_bom_lines_are_planned_exactly():
+    inputs = asyncio.run(_load_from_database({"module:7": 10}))
+    scaled, decimals = to_integer_units(inputs)
+    result = run_mrp(
+        {"demand": scaled.demand, "stock": scaled.stock, "bom": scaled.bom, "decimals": decimals}
+    )
+
+    rows = {row["item"]: row for row in result["requirements"]}
+    assert rows["fabric:3"] == {
+        "item": "fabric:3", "demand": 25.0, "stock": 0.0, "net_requirement": 25.0
+    }
+    assert rows["material:4"] == {
+        "item": "material:4", "demand": 4.0, "stock": 1.5, "net_requirement": 2.5
+    }
+    assert rows["module:7"] == {"item": "module:7", "demand": 10, "stock": 0, "net_requirement": 10}
+
+
+def test_integer_units_follow_fractional_parents():
+    inputs = MrpInputs(
+        demand={"module:1": 3},
+        stock={"module:1": 0.5, "material:2": 0.25},
+        bom={"module:1": {"material:2": 1.5}},
+    )
+    scaled, decimals = to_integer_units(inputs)
+
+    assert decimals == {"module:1": 1, "material:2": 2}
+    assert scaled.demand == {"module:1": 30}
+    assert scaled.stock == {"module:1": 5, "material:2": 25}
+    assert scaled.bom == {"module:1": {"material:2": 15}}
@@ -0,0 +1,81 @@
+"""Benchmark de altas masivas en la API: endpoint de una fila frente a ``/bulk``.
+
+Levanta la aplicación FastAPI contra una base SQLite temporal y mide filas por
+segundo al dar de alta materiales con ``POST /api/materials`` fila a fila,
+con ``POST /api/materials/bulk`` enviando un array JSON y con el mismo
+endpoint recibiendo un flujo NDJSON.
+
+Uso: ``python benchmarks/bench_backend_bulk.py [--filas 50000] [--filas-unitarias 2000]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+
+def generar_materiales(cantidad: int, desplazamiento: int = 0):
+    return [
+        {
+            "name": f"Material {desplazamiento + indice:06d}",
+            "unit": "m" if indice % 3 else "ud",
+            "internal_code": f"MAT-{desplazamiento + indice:06d}",
+        }
+        for indice in range(cantidad)
+    ]
+
+
+def _fila(nombre: str, filas: int, duracion: float) -> None:
+    print(f"{nombre:<28} {filas:>8} {duracion:>9.2f} s {filas / duracion:>12,.0f} filas/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--filas", type=int, default=50_000)
+    parser.add_argument("--filas-unitarias", type=int, default=2_000)
+    args = parser.parse_args()
+
+    directorio = tempfile.mkdtemp()
+    os.chdir(directorio)
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    with TestClient(app) as cliente:
+        inicio = time.perf_counter()
+        for material in generar_materiales(args.filas_unitarias):
+            assert cliente.post("/api/materials", json=material).status_code == 200
+        unitario = time.perf_counter() - inicio
+
+        materiales = generar_materiales(args.filas, desplazamiento=args.filas_unitarias)
+        inicio = time.perf_counter()
+        respuesta = cliente.post("/api/materials/bulk", json=materiales)
+        masivo = time.perf_counter() - inicio
+        assert respuesta.json()["created"] == args.filas
+
+        cuerpo = "".join(json.dumps(material) + "\n" for material in materiales)
+        inicio = time.perf_counter()
+        respuesta = cliente.post(
+            "/api/materials/bulk",
+            content=cuerpo.encode(),
+            headers={"content-type": "application/x-ndjson"},
+        )
+        ndjson = time.perf_counter() - inicio
+        assert respuesta.json()["created"] == args.filas
+
+    print(f"{'endpoint':<28} {'filas':>8} {'tiempo':>11} {'rendimiento':>18}")
+    _fila("POST /materials (1 fila)", args.filas_unitarias, unitario)
+    _fila("POST /materials/bulk JSON", args.filas, masivo)
+    _fila("POST /materials/bulk NDJSON", args.filas, ndjson)
+    print(f"mejora bulk JSON: {(args.filas / masivo) / (args.filas_unitarias / unitario):.0f}x")
+
+
+if __name__ == "__main__":
+    main()
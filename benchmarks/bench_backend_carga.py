@@ -0,0 +1,137 @@
+"""Prueba de carga de la API: latencias p50/p99 con clientes concurrentes.
+
+Arranca ``uvicorn`` con el backend indicado contra una base SQLite temporal,
+la siembra con materiales y lanza ``--clientes`` clientes concurrentes durante
+``--duracion`` segundos. Cada cliente alterna lecturas paginadas
+(``GET /api/materials``) y, con probabilidad ``--escrituras``, altas de una fila
+(``POST /api/materials``), como las tabletas de planta mientras la oficina
+registra datos. Para comparar antes y después, se ejecuta con ``--backend``
+apuntando a un checkout anterior (p. ej. con ``git worktree``).
+
+Requiere ``httpx`` y ``uvicorn``.
+
+Uso: ``python benchmarks/bench_backend_carga.py [--clientes 32] [--duracion 10] [--backend ruta]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+BACKEND = Path(__file__).resolve().parents[1] / "backend"
+
+
+def _puerto_libre() -> int:
+    with socket.socket() as conexion:
+        conexion.bind(("127.0.0.1", 0))
+        return conexion.getsockname()[1]
+
+
+def arrancar_servidor(backend: Path, directorio: str, puerto: int) -> subprocess.Popen:
+    entorno = dict(
+        os.environ,
+        PYTHONPATH=str(backend),
+        DATABASE_URL=f"sqlite:///{directorio}/fabrica.db",
+    )
+    proceso = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(puerto),
+         "--log-level", "warning", "--timeout-keep-alive", "60"],
+        cwd=directorio,
+        env=entorno,
+    )
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{puerto}/", timeout=0.5)
+            return proceso
+        except httpx.TransportError:
+            time.sleep(0.1)
+    proceso.kill()
+    raise RuntimeError("uvicorn no arrancó")
+
+
+def _material(indice: int) -> dict:
+    return {"name": f"Material {indice:06d}", "unit": "m", "internal_code": f"MAT-{indice:06d}"}
+
+
+async def sembrar(cliente: httpx.AsyncClient, filas: int) -> None:
+    respuesta = await cliente.post("/api/materials/bulk", json=[_material(i) for i in range(filas)])
+    respuesta.raise_for_status()
+
+
+async def cliente_carga(
+    cliente: httpx.AsyncClient,
+    semilla: int,
+    fin: float,
+    escrituras: float,
+    lecturas_ms: list,
+    escrituras_ms: list,
+) -> None:
+    aleatorio = random.Random(semilla)
+    while time.perf_counter() < fin:
+        escribir = aleatorio.random() < escrituras
+        inicio = time.perf_counter()
+        if escribir:
+            material = _material(aleatorio.randrange(10**6))
+            respuesta = await cliente.post("/api/materials", json=material)
+        else:
+            respuesta = await cliente.get("/api/materials", params={"limit": 50, "sort": "name"})
+        respuesta.raise_for_status()
+        (escrituras_ms if escribir else lecturas_ms).append((time.perf_counter() - inicio) * 1000)
+
+
+def _percentil(valores: list, fraccion: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(fraccion * len(ordenados)))] if ordenados else 0.0
+
+
+async def ejecutar(url: str, clientes: int, duracion: float, escrituras: float, filas: int) -> None:
+    limites = httpx.Limits(max_connections=clientes)
+    async with httpx.AsyncClient(base_url=url, limits=limites, timeout=60) as cliente:
+        await sembrar(cliente, filas)
+        lecturas_ms: list = []
+        escrituras_ms: list = []
+        fin = time.perf_counter() + duracion
+        await asyncio.gather(*(
+            cliente_carga(cliente, semilla, fin, escrituras, lecturas_ms, escrituras_ms)
+            for semilla in range(clientes)
+        ))
+
+    print(f"clientes: {clientes}  duración: {duracion:.0f} s  escrituras: {escrituras:.0%}")
+    print(f"{'operación':<10} {'peticiones':>10} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for nombre, latencias in (("lectura", lecturas_ms), ("escritura", escrituras_ms)):
+        print(f"{nombre:<10} {len(latencias):>10} {len(latencias) / duracion:>8.0f} "
+              f"{_percentil(latencias, 0.50):>8.1f} {_percentil(latencias, 0.99):>8.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--backend", type=Path, default=BACKEND)
+    parser.add_argument("--clientes", type=int, default=32)
+    parser.add_argument("--duracion", type=float, default=10.0)
+    parser.add_argument("--escrituras", type=float, default=0.2)
+    parser.add_argument("--filas", type=int, default=5_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        puerto = _puerto_libre()
+        servidor = arrancar_servidor(args.backend.resolve(), directorio, puerto)
+        try:
+            asyncio.run(ejecutar(f"http://127.0.0.1:{puerto}", args.clientes, args.duracion,
+                                 args.escrituras, args.filas))
+        finally:
+            servidor.terminate()
+            servidor.wait()
+
+
+if __name__ == "__main__":
+    main()
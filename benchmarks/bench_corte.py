@@ -0,0 +1,91 @@
+"""Benchmark del planificador de corte de tela sobre el ancho del rollo.
+
+Genera ``--ordenes`` órdenes de producción con módulos aleatorios, planifica
+el corte de sus paneles con ``fabrica.corte`` y compara los metros con la
+estimación de ``FabricRule`` (área total / ancho de rollo). También verifica
+que ninguna pieza se sale del rollo ni se solapa con otra.
+
+Uso: ``python benchmarks/bench_corte.py [--ordenes 60] [--ancho-rollo 140]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from fabrica import Modulo, Pedido, crear_orden_produccion  # noqa: E402
+from fabrica import PlanCorte, piezas_modulo, planificar_corte_ordenes  # noqa: E402
+
+
+def generar_catalogo(cantidad: int, aleatorio: random.Random) -> dict:
+    catalogo = {}
+    for indice in range(cantidad):
+        medidas = {
+            "width": aleatorio.choice([60, 80, 90, 100, 120]),
+            "height": aleatorio.uniform(40, 95),
+            "depth": aleatorio.uniform(50, 110),
+        }
+        catalogo[f"SKU-{indice:03d}"] = piezas_modulo(
+            "panel", medidas, margen_costura=aleatorio.choice([1.0, 1.5, 2.0]),
+            capas=aleatorio.choice([1, 1, 2]),
+        )
+    return catalogo
+
+
+def validar(plan: PlanCorte) -> None:
+    colocaciones = sorted(plan.colocaciones, key=lambda c: c.y)
+    for indice, a in enumerate(colocaciones):
+        assert 0 <= a.x and a.x + a.ancho <= plan.ancho_rollo + 1e-9, a
+        for b in colocaciones[indice + 1:]:
+            if b.y >= a.y + a.largo - 1e-9:
+                break
+            solapa_x = a.x < b.x + b.ancho - 1e-9 and b.x < a.x + a.ancho - 1e-9
+            assert not solapa_x, (a, b)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ordenes", type=int, default=60)
+    parser.add_argument("--skus", type=int, default=40)
+    parser.add_argument("--ancho-rollo", type=float, default=140.0)
+    args = parser.parse_args()
+
+    aleatorio = random.Random(11)
+    catalogo = generar_catalogo(args.skus, aleatorio)
+    ordenes = [
+        crear_orden_produccion(
+            f"OP-{indice:04d}",
+            Pedido(
+                f"PED-{indice:04d}",
+                "cliente",
+                [
+                    Modulo(sku, "módulo", aleatorio.randint(1, 2))
+                    for sku in aleatorio.sample(sorted(catalogo), aleatorio.randint(1, 3))
+                ],
+            ),
+        )
+        for indice in range(args.ordenes)
+    ]
+
+    print(f"órdenes: {args.ordenes}  ancho de rollo: {args.ancho_rollo:g} cm")
+    print(f"{'método':>11} {'piezas':>7} {'metros':>8} {'estimado':>9} "
+          f"{'aprovech.':>10} {'tiempo':>9}")
+    for metodo in ("estantes", "guillotina", "auto"):
+        inicio = time.perf_counter()
+        plan = planificar_corte_ordenes(ordenes, catalogo, args.ancho_rollo, metodo=metodo)[""]
+        duracion = time.perf_counter() - inicio
+        validar(plan)
+        area = sum(c.pieza.area for c in plan.colocaciones)
+        estimado = area / max(args.ancho_rollo, 1) / 100
+        print(f"{metodo:>11} {len(plan.colocaciones):>7} "
+              f"{plan.metros:>8.2f} {estimado:>9.2f} {plan.aprovechamiento:>10.1%} "
+              f"{duracion * 1000:>7.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Benchmark del renderizado de documentos de fin de día (etiqueta, albarán, factura).
+
+Genera ``--ordenes`` órdenes de venta de un conjunto reducido de clientes y
+precios de catálogo y mide documentos por segundo de:
+
+- el bucle orden a orden: ``generar_documentos``, escribiendo cada documento
+  por separado;
+- ``renderizar_documentos`` en un proceso y con un pool de procesos.
+
+Comprueba que todas las variantes producen exactamente el mismo texto.
+
+Uso: ``python benchmarks/bench_documentos.py [--ordenes 3000] [--procesos 4]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import os
+import random
+import sys
+import time
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fabrica import (  # noqa: E402
+    Cliente,
+    Direccion,
+    LineaOrdenVenta,
+    Moneda,
+    Money,
+    OrdenVenta,
+    generar_documentos,
+    renderizar_documentos,
+)
+from fabrica.documentos import SEPARADOR_DOCUMENTOS  # noqa: E402
+
+EUR = Moneda("EUR", "€")
+
+
+def generar_ordenes(cantidad: int, clientes: int = 300, semilla: int = 23) -> list[OrdenVenta]:
+    aleatorio = random.Random(semilla)
+    cartera = [
+        Cliente(
+            identificador=f"CLI-{indice:04d}",
+            nombre=f"Cliente {indice}",
+            direccion_envio=Direccion(
+                calle=f"Calle {aleatorio.randint(1, 200)}, {aleatorio.randint(1, 90)}",
+                ciudad=aleatorio.choice(["Madrid", "Valencia", "Sevilla", "Bilbao"]),
+                provincia="Provincia",
+                codigo_postal=f"{aleatorio.randint(1000, 52999):05d}",
+                pais="España",
+                instrucciones="Entregar por la mañana" if indice % 4 == 0 else None,
+            ),
+        )
+        for indice in range(clientes)
+    ]
+    precios = [Money(Decimal(aleatorio.randint(2_000, 90_000)) / 100, EUR) for _ in range(80)]
+    ordenes = []
+    for indice in range(cantidad):
+        orden = OrdenVenta(f"OV-{indice:06d}", aleatorio.choice(cartera), EUR)
+        for linea in range(aleatorio.randint(2, 12)):
+            orden.agregar_linea(
+                LineaOrdenVenta(
+                    sku=f"SKU-{aleatorio.randint(1, 400):04d}",
+                    descripcion=f"Módulo {linea}",
+                    cantidad=aleatorio.randint(1, 6),
+                    precio_unitario=aleatorio.choice(precios),
+                )
+            )
+        ordenes.append(orden)
+    return ordenes
+
+
+def bucle_por_orden(ordenes: list[OrdenVenta], fecha: date, destino: io.StringIO) -> float:
+    inicio = time.perf_counter()
+    for orden in ordenes:
+        for documento in generar_documentos(orden, fecha):
+            destino.write(documento)
+            destino.write(SEPARADOR_DOCUMENTOS)
+    return time.perf_counter() - inicio
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ordenes", type=int, default=3_000)
+    parser.add_argument("--procesos", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    ordenes = generar_ordenes(args.ordenes)
+    fecha = date(2024, 3, 1)
+    total_documentos = 3 * len(ordenes)
+
+    referencia = io.StringIO()
+    segundos = bucle_por_orden(ordenes, fecha, referencia)
+    print(f"órdenes: {len(ordenes)}  documentos: {total_documentos}")
+    print(f"{'bucle orden a orden':<28} {total_documentos / segundos:>10,.0f} docs/s")
+
+    for procesos in sorted({1, args.procesos}):
+        salida = io.StringIO()
+        resultado = renderizar_documentos(ordenes, fecha, salida, procesos=procesos)
+        assert salida.getvalue() == referencia.getvalue()
+        assert resultado.documentos == total_documentos
+        etiqueta = f"renderizar_documentos ({procesos}p)"
+        print(f"{etiqueta:<28} {resultado.documentos_por_segundo:>10,.0f} docs/s")
+
+
+if __name__ == "__main__":
+    main()
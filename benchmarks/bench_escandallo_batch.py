@@ -0,0 +1,139 @@
+"""Benchmark del costeo masivo de escandallos: módulos × telas con NumPy.
+
+Genera ``--modulos`` escandallos y ``--telas`` telas, calcula la matriz de
+costes con ``escandallo_batch`` y la compara con el cálculo objeto a objeto
+(``Escandallo.recalculate`` + ``total_cost``) sobre una muestra de
+combinaciones, que también sirve de validación: los metros de tela deben
+coincidir exactamente y los totales salvo el redondeo de la suma.
+
+Uso: ``python benchmarks/bench_escandallo_batch.py [--modulos 2000] [--telas 300]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from escandallo import (  # noqa: E402
+    Escandallo,
+    FabricRule,
+    FillingRule,
+    HardwareItem,
+    LaborItem,
+    MaterialItem,
+)
+from escandallo_batch import FabricCatalogue, ModuleBatch  # noqa: E402
+
+
+def generar_escandallos(cantidad: int, semilla: int = 5) -> list[Escandallo]:
+    aleatorio = random.Random(semilla)
+    escandallos = []
+    for indice in range(cantidad):
+        materiales = [
+            MaterialItem(
+                name="tela",
+                material_type="fabric",
+                unit_cost=20.0,
+                metadata={"seam_allowance": aleatorio.choice([1.0, 1.5, 2.0]),
+                          "layers": aleatorio.choice([1, 2])},
+            ),
+            MaterialItem(name="espuma", material_type="filling",
+                         unit_cost=aleatorio.uniform(3, 9)),
+            MaterialItem(name="patas", material_type="hardware", unit_cost=4.5, quantity=4),
+        ]
+        if indice % 5 == 0:
+            materiales.append(
+                MaterialItem(name="forro", material_type="fabric", unit_cost=20.0,
+                             metadata={"seam_allowance": 0.5})
+            )
+        escandallos.append(
+            Escandallo(
+                module_id=f"MOD-{indice:05d}",
+                measurements={
+                    "width": aleatorio.uniform(60, 220),
+                    "height": aleatorio.uniform(70, 100),
+                    "depth": aleatorio.uniform(80, 110),
+                },
+                materials=materiales,
+                labor=[LaborItem("tapizado", 24.0, aleatorio.uniform(1, 4))],
+                hardware=[HardwareItem("herrajes", 3.2, aleatorio.randint(2, 8))],
+                rules={
+                    "fabric": FabricRule("fabric", 140),
+                    "filling": FillingRule("filling", aleatorio.uniform(0.02, 0.04)),
+                },
+            )
+        )
+    return escandallos
+
+
+def generar_telas(cantidad: int, semilla: int = 7) -> FabricCatalogue:
+    aleatorio = random.Random(semilla)
+    return FabricCatalogue.from_rules(
+        {
+            f"TELA-{indice:03d}": (
+                FabricRule("fabric", aleatorio.choice([137.0, 140.0, 150.0, 280.0])),
+                aleatorio.uniform(8, 60),
+            )
+            for indice in range(cantidad)
+        }
+    )
+
+
+def costear_objeto(escandallo: Escandallo, rollo: float, precio: float) -> tuple[float, float]:
+    escandallo.rules["fabric"] = FabricRule("fabric", rollo)
+    for material in escandallo.materials:
+        if material.material_type == "fabric":
+            material.unit_cost = precio
+    escandallo.recalculate("simulación")
+    metros = sum(m.quantity for m in escandallo.materials if m.material_type == "fabric")
+    return metros, escandallo.total_cost()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--modulos", type=int, default=2_000)
+    parser.add_argument("--telas", type=int, default=300)
+    parser.add_argument("--muestra", type=int, default=3_000)
+    args = parser.parse_args()
+
+    escandallos = generar_escandallos(args.modulos)
+    telas = generar_telas(args.telas)
+
+    inicio = time.perf_counter()
+    lote = ModuleBatch.from_escandallos(escandallos)
+    carga = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    matriz = lote.cost_matrix(telas)
+    vectorial = time.perf_counter() - inicio
+
+    aleatorio = random.Random(1)
+    muestra = [
+        (aleatorio.randrange(args.modulos), aleatorio.randrange(args.telas))
+        for _ in range(args.muestra)
+    ]
+    inicio = time.perf_counter()
+    for fila, columna in muestra:
+        metros, total = costear_objeto(
+            escandallos[fila], telas.roll_width[columna], telas.price_per_meter[columna]
+        )
+        assert metros == matriz.meters[fila, columna], (fila, columna)
+        assert math.isclose(total, matriz.total[fila, columna], rel_tol=1e-12), (fila, columna)
+    por_objeto = (time.perf_counter() - inicio) / len(muestra)
+
+    combinaciones = args.modulos * args.telas
+    print(f"combinaciones: {args.modulos} módulos × {args.telas} telas = {combinaciones:,}")
+    print(f"ModuleBatch.from_escandallos : {carga * 1000:9.1f} ms")
+    print(f"cost_matrix (NumPy)          : {vectorial * 1000:9.1f} ms")
+    print(f"objeto a objeto (estimado)   : {por_objeto * combinaciones:9.1f} s "
+          f"({por_objeto * 1e6:.1f} µs por combinación, {len(muestra)} validadas)")
+    print(f"mejora: {por_objeto * combinaciones / (carga + vectorial):,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
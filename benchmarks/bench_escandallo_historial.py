@@ -0,0 +1,118 @@
+"""Benchmark del historial de escandallos: copias completas frente a keyframes + parches.
+
+Aplica ``--ediciones`` cambios aleatorios (medidas y precios) a un escandallo
+de ``--materiales`` líneas y mide con ``tracemalloc`` la memoria retenida por
+el historial como lista de ``to_dict()`` completos y como ``SnapshotHistory``,
+además del tiempo de reconstruir una versión arbitraria.
+
+Uso: ``python benchmarks/bench_escandallo_historial.py [--ediciones 1000] [--materiales 60]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from escandallo import (  # noqa: E402
+    Escandallo,
+    EscandalloSnapshot,
+    FabricRule,
+    FillingRule,
+    MaterialItem,
+    SnapshotHistory,
+)
+
+
+def generar_versiones(ediciones: int, materiales: int, semilla: int = 11):
+    aleatorio = random.Random(semilla)
+    escandallo = Escandallo(
+        module_id="MOD-001",
+        measurements={"width": 90.0, "height": 85.0, "depth": 95.0},
+        materials=[
+            MaterialItem(
+                name=f"MAT-{indice:03d}",
+                material_type=aleatorio.choice(["fabric", "filling", "frame"]),
+                unit_cost=aleatorio.uniform(2, 40),
+                metadata={"seam_allowance": 2.0, "layers": 1},
+            )
+            for indice in range(materiales)
+        ],
+        rules={"fabric": FabricRule("fabric", 140), "filling": FillingRule("filling", 0.03)},
+    )
+    escandallo.recalculate("inicial")
+    yield escandallo.history[-1]
+    for _ in range(ediciones - 1):
+        if aleatorio.random() < 0.2:
+            clave = aleatorio.choice(["width", "height", "depth"])
+            escandallo.update_measurements({clave: aleatorio.uniform(60, 220)})
+        else:
+            nombre = f"MAT-{aleatorio.randrange(materiales):03d}"
+            escandallo.update_material(nombre, unit_cost=aleatorio.uniform(2, 40))
+        yield escandallo.history[-1]
+
+
+def _memoria(construir) -> tuple[float, object]:
+    gc.collect()
+    tracemalloc.start()
+    resultado = construir()
+    gc.collect()
+    retenida, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return retenida, resultado
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ediciones", type=int, default=1_000)
+    parser.add_argument("--materiales", type=int, default=60)
+    parser.add_argument("--keyframe", type=int, default=50)
+    args = parser.parse_args()
+
+    versiones = [
+        EscandalloSnapshot(timestamp=datetime(2026, 1, 1), reason=s.reason, data=s.data)
+        for s in generar_versiones(args.ediciones, args.materiales)
+    ]
+
+    completo, lista = _memoria(lambda: [copy.deepcopy(v) for v in versiones])
+
+    def construir_historial():
+        historial = SnapshotHistory(keyframe_interval=args.keyframe)
+        for version in versiones:
+            historial.append(version)
+        return historial
+
+    delta, historial = _memoria(construir_historial)
+    assert [s.data for s in historial] == [s.data for s in lista]
+
+    aleatorio = random.Random(1)
+    consultas = [aleatorio.choice(historial.versions()) for _ in range(200)]
+    inicio = time.perf_counter()
+    for version in consultas:
+        historial.reconstruct(version)
+    reconstruir = (time.perf_counter() - inicio) / len(consultas)
+    inicio = time.perf_counter()
+    cambios = historial.diff(historial.versions()[0], historial.versions()[-1])
+    comparar = time.perf_counter() - inicio
+
+    print(
+        f"ediciones: {args.ediciones}  materiales: {args.materiales}  "
+        f"keyframe cada {args.keyframe}"
+    )
+    print(f"historial con copias completas : {completo / 2**20:8.2f} MiB")
+    print(f"SnapshotHistory                : {delta / 2**20:8.2f} MiB "
+          f"({completo / delta:.1f}x menos)")
+    print(f"reconstruct() medio            : {reconstruir * 1000:8.3f} ms")
+    print(f"diff(primera, última)          : {comparar * 1000:8.3f} ms ({len(cambios)} cambios)")
+
+
+if __name__ == "__main__":
+    main()
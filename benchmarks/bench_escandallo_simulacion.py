@@ -0,0 +1,77 @@
+"""Benchmark de escalado de la simulación what-if de precios con procesos.
+
+Ejecuta los mismos escenarios sobre ``--escandallos`` escandallos con 1, 2,
+4... procesos hasta el número de núcleos (o los indicados en ``--procesos``)
+y muestra el tiempo, la aceleración y la eficiencia frente a un proceso.
+
+Uso: ``python benchmarks/bench_escandallo_simulacion.py [--escandallos 20000] [--escenarios 24]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_escandallo_batch import generar_escandallos  # noqa: E402
+from escandallo_simulation import Scenario, WhatIfSimulator  # noqa: E402
+
+
+def generar_escenarios(cantidad: int, semilla: int = 3) -> list[Scenario]:
+    aleatorio = random.Random(semilla)
+    escenarios = []
+    for indice in range(cantidad):
+        factores = {
+            nombre: 1 + aleatorio.uniform(-0.1, 0.15)
+            for nombre in ("tela", "espuma", "patas", "forro")
+            if aleatorio.random() < 0.6
+        }
+        medidas = {"width": aleatorio.uniform(80, 200)} if indice % 3 == 0 else {}
+        escenarios.append(Scenario(f"ESC-{indice:02d}", factores, medidas))
+    return escenarios
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--escandallos", type=int, default=20_000)
+    parser.add_argument("--escenarios", type=int, default=24)
+    parser.add_argument("--procesos", type=int, nargs="*")
+    args = parser.parse_args()
+
+    nucleos = os.cpu_count() or 1
+    potencias = (2**k for k in range(1, 8) if 2**k <= nucleos)
+    procesos = args.procesos or sorted({1, *potencias, nucleos})
+    escandallos = generar_escandallos(args.escandallos)
+    for escandallo in escandallos:
+        escandallo.recalculate("inicial")
+    escenarios = generar_escenarios(args.escenarios)
+
+    def modelo(escandallo) -> str:
+        return escandallo.module_id[:7]
+
+    print(f"escandallos: {args.escandallos}  escenarios: {args.escenarios}  núcleos: {nucleos}")
+    print(f"{'procesos':>8} {'tiempo':>10} {'aceleración':>12} {'eficiencia':>11}")
+    referencia = None
+    base = None
+    for cantidad in procesos:
+        simulador = WhatIfSimulator(escandallos, model_of=modelo, processes=cantidad)
+        inicio = time.perf_counter()
+        resultados = simulador.run(escenarios)
+        duracion = time.perf_counter() - inicio
+        if base is None:
+            base, referencia = duracion, resultados
+        for obtenido, esperado in zip(resultados, referencia):
+            assert math.isclose(obtenido.total_delta, esperado.total_delta, rel_tol=1e-9)
+        print(f"{cantidad:>8} {duracion:>8.2f} s {base / duracion:>11.2f}x "
+              f"{base / duracion / cantidad:>10.0%}")
+
+
+if __name__ == "__main__":
+    main()
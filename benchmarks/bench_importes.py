@@ -0,0 +1,101 @@
+"""Benchmark de los totales de órdenes de venta: ``Money`` frente a coma fija.
+
+Genera ``--ordenes`` órdenes con precios de un catálogo (más algunos precios
+sueltos con otros decimales) y calcula el total de cada una:
+
+- plegando ``Money.__add__`` sobre ``linea.total()`` como hacía ``OrdenVenta.total``;
+- con ``OrdenVenta.total`` actual;
+- con ``totales_ordenes`` (coma fija con los precios descompuestos una vez).
+
+Comprueba que los tres dan el mismo ``Decimal``, representación incluida.
+
+Uso: ``python benchmarks/bench_importes.py [--ordenes 30000] [--lineas-max 20]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fabrica import (  # noqa: E402
+    Cliente,
+    LineaOrdenVenta,
+    Moneda,
+    Money,
+    OrdenVenta,
+    total_ordenes,
+    totales_ordenes,
+)
+
+EUR = Moneda("EUR", "€")
+
+
+def generar_ordenes(cantidad: int, lineas_max: int, semilla: int = 29) -> list[OrdenVenta]:
+    aleatorio = random.Random(semilla)
+    catalogo = [Money(Decimal(aleatorio.randint(100, 90_000)) / 100, EUR) for _ in range(500)]
+    cliente = Cliente("CLI-0001", "Cliente")
+    ordenes = []
+    for indice in range(cantidad):
+        orden = OrdenVenta(f"OV-{indice:06d}", cliente, EUR)
+        for _ in range(aleatorio.randint(1, lineas_max)):
+            if aleatorio.random() < 0.95:
+                precio = aleatorio.choice(catalogo)
+            else:
+                decimales = aleatorio.randint(0, 3)
+                precio = Money(Decimal(f"{aleatorio.uniform(1, 500):.{decimales}f}"), EUR)
+            orden.agregar_linea(LineaOrdenVenta("SKU", "Módulo", aleatorio.randint(1, 9), precio))
+        ordenes.append(orden)
+    return ordenes
+
+
+def total_plegando_money(orden: OrdenVenta) -> Money:
+    total = Money(Decimal("0"), orden.moneda)
+    for linea in orden.lineas:
+        total = total + linea.precio_unitario * Decimal(linea.cantidad)
+    return total
+
+
+def medir(funcion, *argumentos):
+    inicio = time.perf_counter()
+    resultado = funcion(*argumentos)
+    return resultado, time.perf_counter() - inicio
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ordenes", type=int, default=30_000)
+    parser.add_argument("--lineas-max", type=int, default=20)
+    args = parser.parse_args()
+
+    ordenes = generar_ordenes(args.ordenes, args.lineas_max)
+    lineas = sum(len(orden.lineas) for orden in ordenes)
+
+    referencia, base = medir(lambda: {o.numero: total_plegando_money(o) for o in ordenes})
+    actual, segundos_total = medir(lambda: {o.numero: o.total() for o in ordenes})
+    fijos, segundos_fijo = medir(totales_ordenes, ordenes)
+    for numero, esperado in referencia.items():
+        assert str(actual[numero].importe) == str(esperado.importe), numero
+        assert str(fijos[numero].importe) == str(esperado.importe), numero
+    suma = Money(Decimal("0"), EUR)
+    for total in referencia.values():
+        suma = suma + total
+    assert str(total_ordenes(ordenes, EUR).importe) == str(suma.importe)
+
+    print(f"órdenes: {len(ordenes)}  líneas: {lineas:,}")
+    for etiqueta, segundos in (
+        ("plegando Money.__add__", base),
+        ("OrdenVenta.total", segundos_total),
+        ("totales_ordenes (coma fija)", segundos_fijo),
+    ):
+        print(f"{etiqueta:<28} {segundos * 1000:8.0f} ms {lineas / segundos:>12,.0f} líneas/s "
+              f"{base / segundos:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
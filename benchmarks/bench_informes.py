@@ -0,0 +1,162 @@
+"""Benchmark del motor de informes de ventas sobre ``OrdenVenta``.
+
+Genera ``--ordenes`` órdenes de venta (clientes, SKUs, estados y fechas de dos
+años), las registra en un ``InformeVentas`` y mide:
+
+- la ingesta completa;
+- consultas servidas desde los rollups y consultas que recorren las columnas
+  (filtros de fecha, agrupaciones fuera de los rollups);
+- cambios de estado seguidos a través de ``OrdenVenta.actualizar_estado``.
+
+Cada consulta se compara con un bucle Python sobre las órdenes que agrupa con
+``Decimal``; el resultado debe coincidir exactamente.
+
+Uso: ``python benchmarks/bench_informes.py [--ordenes 50000] [--repeticiones 3]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fabrica import (  # noqa: E402
+    Cliente,
+    EstadoOrdenVenta,
+    LineaOrdenVenta,
+    Moneda,
+    Money,
+    OrdenVenta,
+)
+from fabrica.informes import InformeVentas  # noqa: E402
+
+EUR = Moneda("EUR", "€")
+CONSULTAS = [
+    ("cliente x mes (rollup)", dict(agrupar_por=("cliente", "mes"))),
+    ("sku, enviadas (rollup)", dict(agrupar_por=("sku",), estados=["enviado"])),
+    ("estado x mes (rollup)", dict(agrupar_por=("estado", "mes"))),
+    ("total (rollup)", dict()),
+    (
+        "estado, 1T 2024 (columnas)",
+        dict(agrupar_por=("estado",), desde=date(2024, 1, 1), hasta=date(2024, 3, 31)),
+    ),
+    (
+        "cliente x sku, 50 SKU (columnas)",
+        dict(agrupar_por=("cliente", "sku"), skus=[f"SKU-{indice:04d}" for indice in range(50)]),
+    ),
+]
+
+
+def generar_ordenes(
+    cantidad: int, clientes: int = 2_000, skus: int = 800, semilla: int = 31
+) -> list[OrdenVenta]:
+    aleatorio = random.Random(semilla)
+    cartera = [Cliente(f"CLI-{indice:04d}", f"Cliente {indice}") for indice in range(clientes)]
+    catalogo = [f"SKU-{indice:04d}" for indice in range(skus)]
+    precios = [Money(Decimal(aleatorio.randint(100, 90_000)) / 100, EUR) for _ in range(500)]
+    estados = list(EstadoOrdenVenta)
+    ordenes = []
+    for indice in range(cantidad):
+        orden = OrdenVenta(
+            f"OV-{indice:06d}",
+            aleatorio.choice(cartera),
+            EUR,
+            fecha=date(2023, 1, 1) + timedelta(days=aleatorio.randrange(730)),
+            estado=aleatorio.choice(estados),
+        )
+        for _ in range(aleatorio.randint(1, 20)):
+            orden.agregar_linea(
+                LineaOrdenVenta(
+                    aleatorio.choice(catalogo),
+                    "Módulo",
+                    aleatorio.randint(1, 6),
+                    aleatorio.choice(precios),
+                )
+            )
+        ordenes.append(orden)
+    return ordenes
+
+
+def agrupar_en_python(ordenes: list[OrdenVenta], agrupar_por=(), skus=None, estados=None,
+                      desde=None, hasta=None) -> list[tuple]:
+    grupos: dict[tuple, list] = {}
+    for orden in ordenes:
+        if estados is not None and orden.estado.value not in estados:
+            continue
+        if desde is not None and orden.fecha < desde:
+            continue
+        if hasta is not None and orden.fecha > hasta:
+            continue
+        for linea in orden.lineas:
+            if skus is not None and linea.sku not in skus:
+                continue
+            valores = {
+                "cliente": orden.cliente.identificador,
+                "sku": linea.sku,
+                "estado": orden.estado.value,
+                "mes": f"{orden.fecha.year:04d}-{orden.fecha.month:02d}",
+            }
+            acumulado = grupos.setdefault(
+                tuple(valores[d] for d in agrupar_por), [Decimal("0"), 0, 0]
+            )
+            acumulado[0] += linea.precio_unitario.importe * linea.cantidad
+            acumulado[1] += linea.cantidad
+            acumulado[2] += 1
+    return sorted((grupo, *acumulado) for grupo, acumulado in grupos.items())
+
+
+def comprobar(informe: InformeVentas, ordenes: list[OrdenVenta], consulta: dict) -> None:
+    obtenido = [
+        (fila.grupo, fila.importe, fila.cantidad, fila.lineas)
+        for fila in informe.consultar(**consulta)
+    ]
+    assert obtenido == agrupar_en_python(ordenes, **consulta), consulta
+
+
+def mejor_de(repeticiones: int, funcion) -> tuple[object, float]:
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return resultado, min(tiempos)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ordenes", type=int, default=50_000)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    ordenes = generar_ordenes(args.ordenes)
+
+    informe = InformeVentas(EUR)
+    inicio = time.perf_counter()
+    informe.registrar_ordenes(ordenes)
+    ingesta = time.perf_counter() - inicio
+    print(f"órdenes: {len(ordenes):,}  líneas: {len(informe):,}")
+    print(f"{'ingesta':<34} {ingesta * 1000:8.0f} ms {len(informe) / ingesta:>12,.0f} líneas/s")
+
+    aleatorio = random.Random(5)
+    cambios = aleatorio.sample(ordenes, min(len(ordenes), 10_000))
+    inicio = time.perf_counter()
+    for orden in cambios:
+        orden.actualizar_estado(EstadoOrdenVenta.ENTREGADO)
+    segundos = time.perf_counter() - inicio
+    print(f"{'cambios de estado':<34} {segundos * 1000:8.0f} ms "
+          f"{len(cambios) / segundos:>12,.0f} cambios/s")
+
+    for etiqueta, consulta in CONSULTAS:
+        filas, segundos = mejor_de(args.repeticiones, lambda: informe.consultar(**consulta))
+        print(f"{etiqueta:<34} {segundos * 1000:8.1f} ms {len(filas):>12,} grupos")
+        comprobar(informe, ordenes, consulta)
+
+
+if __name__ == "__main__":
+    main()
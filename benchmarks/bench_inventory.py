@@ -0,0 +1,110 @@
+"""Benchmark de consultas del ledger de inventario con índices secundarios.
+
+Carga un ledger sintético y compara las búsquedas por compra, producción,
+ubicación y rango de fechas frente al recorrido lineal de todos los movimientos.
+
+Uso: ``python benchmarks/bench_inventory.py [--movimientos 1000000]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from inventory import (  # noqa: E402
+    InventoryLedger,
+    Location,
+    MovementType,
+    StockMovement,
+    StockType,
+)
+
+
+def generar_movimientos(cantidad: int, semilla: int = 3):
+    aleatorio = random.Random(semilla)
+    ubicaciones = [Location(f"ALM{a}", f"E{e:03d}") for a in range(4) for e in range(50)]
+    tipos_stock = list(StockType)
+    tipos_movimiento = list(MovementType)
+    inicio = datetime(2026, 1, 1)
+    for indice in range(cantidad):
+        yield StockMovement(
+            movement_id=f"MOV-{indice:08d}",
+            stock_type=aleatorio.choice(tipos_stock),
+            movement_type=aleatorio.choice(tipos_movimiento),
+            quantity=aleatorio.randint(1, 100),
+            location=aleatorio.choice(ubicaciones),
+            occurred_at=inicio + timedelta(seconds=indice * 30),
+            purchase_id=f"PC-{indice // 20:06d}" if indice % 10 == 0 else None,
+            production_id=f"OP-{indice // 15:06d}" if indice % 7 == 0 else None,
+        )
+
+
+def _medir(funcion, repeticiones: int = 5) -> float:
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def _fila(nombre: str, lineal: float, indexado: float) -> None:
+    print(f"{nombre:<28} {lineal * 1000:>11.2f} ms {indexado * 1000:>11.4f} ms "
+          f"{lineal / indexado:>10.0f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--movimientos", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    ledger = InventoryLedger()
+    for movimiento in generar_movimientos(args.movimientos):
+        ledger.record_movement(movimiento)
+    carga = time.perf_counter() - inicio
+    movimientos = ledger.movements
+    print(f"movimientos: {len(movimientos)}  carga con índices: {carga:.2f} s")
+    print(f"{'consulta':<28} {'lineal':>14} {'indexada':>14} {'mejora':>11}")
+
+    compra = movimientos[len(movimientos) // 2].purchase_id or "PC-000100"
+    _fila(
+        "movements_for_purchase",
+        _medir(lambda: [m for m in movimientos if m.purchase_id == compra], 1),
+        _medir(lambda: ledger.movements_for_purchase(compra)),
+    )
+    produccion = "OP-000200"
+    _fila(
+        "movements_for_production",
+        _medir(lambda: [m for m in movimientos if m.production_id == produccion], 1),
+        _medir(lambda: ledger.movements_for_production(produccion)),
+    )
+    ubicacion = movimientos[0].location
+    _fila(
+        "movements_at",
+        _medir(lambda: [m for m in movimientos if m.location == ubicacion], 1),
+        _medir(lambda: ledger.movements_at(ubicacion)),
+    )
+    desde = movimientos[len(movimientos) // 3].occurred_at
+    hasta = desde + timedelta(hours=6)
+    _fila(
+        "movements_between (6 h)",
+        _medir(lambda: [m for m in movimientos if desde <= m.occurred_at < hasta], 1),
+        _medir(lambda: ledger.movements_between(desde, hasta)),
+    )
+
+    inicio = time.perf_counter()
+    for indice in range(10_000):
+        movimientos[indice * 7 % len(movimientos)].link_purchase(f"PC-REV-{indice:05d}")
+    print(f"10.000 link_purchase con reindexado: {(time.perf_counter() - inicio) * 1000:.1f} ms")
+    assert ledger.movements_for_purchase("PC-REV-00001") == [movimientos[7]]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Benchmark de memoria por movimiento: ledger en lista frente a almacenamiento columnar.
+
+Mide con ``tracemalloc`` la memoria retenida por el almacén de movimientos
+(una lista de ``StockMovement`` o un ``ColumnarMovementStore``) por sí solo y
+dentro de un ``InventoryLedger`` con sus índices, que ambos comparten. Cada
+medición corre en un proceso nuevo para que no se contaminen entre sí.
+
+Uso: ``python benchmarks/bench_inventory_memory.py [--movimientos 200000]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import multiprocessing
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bench_inventory import generar_movimientos  # noqa: E402
+from inventory import ColumnarMovementStore, InventoryLedger  # noqa: E402
+
+
+def medir_almacen(crear_almacen, cantidad: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    almacen = crear_almacen()
+    for movimiento in generar_movimientos(cantidad):
+        almacen.append(movimiento)
+    gc.collect()
+    retenida, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return retenida / cantidad
+
+
+def medir_ledger(crear_almacen, cantidad: int) -> tuple[float, float]:
+    gc.collect()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    ledger = InventoryLedger(movements=crear_almacen())
+    for movimiento in generar_movimientos(cantidad):
+        ledger.record_movement(movimiento)
+    duracion = time.perf_counter() - inicio
+    gc.collect()
+    retenida, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return retenida / cantidad, duracion
+
+
+def _en_proceso_nuevo(funcion, *argumentos):
+    contexto = multiprocessing.get_context("spawn")
+    with contexto.Pool(1) as pool:
+        return pool.apply(funcion, argumentos)
+
+
+def comprobar_equivalencia(cantidad: int = 5_000) -> None:
+    lista = InventoryLedger()
+    columnar = InventoryLedger(movements=ColumnarMovementStore())
+    for movimiento in generar_movimientos(cantidad):
+        lista.record_movement(movimiento)
+        columnar.record_movement(movimiento)
+    assert lista.balance_by_location() == columnar.balance_by_location()
+    assert list(lista.movements) == list(columnar.movements)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--movimientos", type=int, default=200_000)
+    args = parser.parse_args()
+
+    comprobar_equivalencia()
+    almacen_lista = _en_proceso_nuevo(medir_almacen, list, args.movimientos)
+    almacen_columnar = _en_proceso_nuevo(medir_almacen, ColumnarMovementStore, args.movimientos)
+    lista, t_lista = _en_proceso_nuevo(medir_ledger, list, args.movimientos)
+    columnar, t_columnar = _en_proceso_nuevo(medir_ledger, ColumnarMovementStore, args.movimientos)
+
+    print(f"movimientos: {args.movimientos}  (bytes por movimiento)")
+    print(f"{'':<24} {'almacén':>9} {'ledger':>9} {'carga ledger':>13}")
+    print(f"{'lista de StockMovement':<24} {almacen_lista:>9.1f} {lista:>9.1f} {t_lista:>11.2f} s")
+    print(
+        f"{'ColumnarMovementStore':<24} {almacen_columnar:>9.1f} {columnar:>9.1f} "
+        f"{t_columnar:>11.2f} s"
+    )
+    print(
+        f"{'reducción':<24} {almacen_lista / almacen_columnar:>8.1f}x {lista / columnar:>8.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Benchmark de segmentos de inventario en disco: escritura, apertura y saldos.
+
+Escribe un segmento con ``SegmentWriter`` y mide cuánto tarda un proceso en
+abrirlo con ``mmap`` (comprobando solo el último registro, como por defecto, y
+verificando el CRC de cada registro con ``verify=True``) y
+calcular saldos sobre el buffer mapeado, frente a cargar todos los
+movimientos en un ``InventoryLedger``.
+
+Uso: ``python benchmarks/bench_inventory_segments.py [--movimientos 1000000]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bench_inventory import generar_movimientos  # noqa: E402
+from inventory_segments import LedgerSegment, SegmentWriter  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--movimientos", type=int, default=1_000_000)
+    parser.add_argument("--sync-every", type=int, default=4096)
+    parser.add_argument("--cargar-ledger", action="store_true", help="mide también to_ledger()")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "ledger.seg")
+        inicio = time.perf_counter()
+        with SegmentWriter(ruta, sync_every=args.sync_every) as escritor:
+            for movimiento in generar_movimientos(args.movimientos):
+                escritor.append(movimiento)
+        escritura = time.perf_counter() - inicio
+        tamano = os.path.getsize(ruta)
+        print(f"movimientos: {args.movimientos}  segmento: {tamano / 2**20:.1f} MiB")
+        print(f"escritura (fsync cada {args.sync_every}) : {escritura:8.2f} s "
+              f"({args.movimientos / escritura:,.0f} movimientos/s)")
+
+        inicio = time.perf_counter()
+        LedgerSegment.open(ruta, verify=True).close()
+        apertura_verificada = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        segmento = LedgerSegment.open(ruta)
+        apertura = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        saldos = segmento.balance_by_location()
+        calculo = time.perf_counter() - inicio
+        print(f"apertura con mmap               : {apertura * 1000:8.1f} ms")
+        print(f"apertura verificando cada CRC   : {apertura_verificada * 1000:8.1f} ms")
+        print(f"saldos por ubicación (mapeado)  : {calculo * 1000:8.1f} ms "
+              f"({len(saldos)} ubicaciones)")
+
+        if args.cargar_ledger:
+            inicio = time.perf_counter()
+            ledger = segmento.to_ledger()
+            carga = time.perf_counter() - inicio
+            assert ledger.balance_by_location() == saldos
+            print(f"to_ledger() (deserializando)    : {carga:8.2f} s")
+        segmento.close()
+
+
+if __name__ == "__main__":
+    main()
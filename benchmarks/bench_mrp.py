@@ -0,0 +1,154 @@
+"""Benchmark de la explosión multinivel de ``planificar_mrp``.
+
+Genera un catálogo sintético de módulos, subconjuntos y materias primas y
+compara el motor por códigos de nivel bajo, ``planificar_mrp`` con el BOM como
+mapa (una pasada topológica) y el planificador vectorial con la alternativa de
+re-ejecutar el ``planificar_mrp`` de un solo nivel, una vez por nivel, hasta
+que los netos se estabilizan.
+
+Uso: ``python benchmarks/bench_mrp.py [--skus 10000] [--niveles 5]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from fabrica.mrp import ExplosionBOM, RequerimientoMRP, planificar_mrp  # noqa: E402
+from fabrica.mrp_vectorial import MRPVectorial  # noqa: E402
+
+
+def generar_catalogo(
+    skus: int, niveles: int, componentes_por_item: int, semilla: int = 7
+) -> tuple[Dict[str, Dict[str, int]], Dict[str, int], Dict[str, int]]:
+    aleatorio = random.Random(semilla)
+    por_nivel: List[List[str]] = []
+    tamano = skus // niveles
+    for nivel in range(niveles):
+        por_nivel.append([f"N{nivel}-{indice:05d}" for indice in range(tamano)])
+
+    bom: Dict[str, Dict[str, int]] = {}
+    for nivel in range(niveles - 1):
+        inferiores = [item for grupo in por_nivel[nivel + 1 :] for item in grupo]
+        for item in por_nivel[nivel]:
+            componentes = aleatorio.sample(inferiores, componentes_por_item)
+            bom[item] = {componente: aleatorio.randint(1, 4) for componente in componentes}
+
+    demanda = {item: aleatorio.randint(0, 50) for item in por_nivel[0]}
+    stock = {
+        item: aleatorio.randint(0, 200)
+        for grupo in por_nivel
+        for item in grupo
+        if aleatorio.random() < 0.6
+    }
+    return bom, demanda, stock
+
+
+def planificar_mrp_un_nivel(
+    demanda: Mapping[str, int],
+    stock: Mapping[str, int],
+    bom: Optional[Mapping[str, Mapping[str, int]]] = None,
+) -> Dict[str, RequerimientoMRP]:
+    """El ``planificar_mrp`` anterior: expande la demanda un solo nivel."""
+    requerimientos: Dict[str, RequerimientoMRP] = {}
+    demanda_expandida: Dict[str, int] = dict(demanda)
+    if bom:
+        for producto, cantidad in demanda.items():
+            for componente, cantidad_componente in bom.get(producto, {}).items():
+                demanda_expandida[componente] = (
+                    demanda_expandida.get(componente, 0) + cantidad * cantidad_componente
+                )
+    for item, cantidad in demanda_expandida.items():
+        stock_item = int(stock.get(item, 0))
+        requerimientos[item] = RequerimientoMRP(
+            item=item,
+            demanda=int(cantidad),
+            stock=stock_item,
+            requerimiento_neto=max(int(cantidad) - stock_item, 0),
+        )
+    return requerimientos
+
+
+def planificar_por_niveles(
+    demanda: Mapping[str, int],
+    stock: Mapping[str, int],
+    bom: Mapping[str, Mapping[str, int]],
+) -> Dict[str, int]:
+    """Re-ejecuta ``planificar_mrp_un_nivel`` hasta que los netos se estabilizan.
+
+    Cada pasada le entrega la demanda independiente más la dependiente de los
+    netos de la pasada anterior, así que la explosión avanza un nivel por
+    pasada.
+    """
+    netos: Dict[str, int] = {}
+    while True:
+        brutos: Dict[str, int] = dict(demanda)
+        for producto, componentes in bom.items():
+            neto = netos.get(producto, 0)
+            for componente, cantidad in componentes.items():
+                brutos[componente] = brutos.get(componente, 0) + neto * cantidad
+        requerimientos = planificar_mrp_un_nivel(brutos, stock)
+        nuevos = {item: r.requerimiento_neto for item, r in requerimientos.items()}
+        if nuevos == netos:
+            return netos
+        netos = nuevos
+
+
+def _medir(funcion, repeticiones: int) -> float:
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--skus", type=int, default=10_000)
+    parser.add_argument("--niveles", type=int, default=5)
+    parser.add_argument("--componentes", type=int, default=4)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    bom, demanda, stock = generar_catalogo(args.skus, args.niveles, args.componentes)
+    aristas = sum(len(componentes) for componentes in bom.values())
+    print(f"SKUs: {args.skus}  niveles: {args.niveles}  aristas BOM: {aristas}")
+
+    inicio = time.perf_counter()
+    motor = ExplosionBOM(bom)
+    preparacion = time.perf_counter() - inicio
+
+    vectorial = MRPVectorial(motor)
+    assert vectorial.planificar(demanda, stock).a_diccionario() == motor.explotar(demanda, stock)
+
+    esperado = planificar_por_niveles(demanda, stock, bom)
+    obtenido = motor.explotar(demanda, stock)
+    netos = {item: r.requerimiento_neto for item, r in obtenido.items()}
+    assert {item: neto for item, neto in netos.items() if neto} == {
+        item: neto for item, neto in esperado.items() if neto
+    }
+
+    t_niveles = _medir(lambda: planificar_por_niveles(demanda, stock, bom), args.repeticiones)
+    t_motor = _medir(lambda: motor.explotar(demanda, stock), args.repeticiones)
+    t_completo = _medir(lambda: planificar_mrp(demanda, stock, bom), args.repeticiones)
+    t_vectorial = _medir(lambda: vectorial.planificar(demanda, stock), args.repeticiones)
+
+    print(f"re-ejecución por niveles : {t_niveles * 1000:9.1f} ms")
+    print(f"planificar_mrp (con BOM) : {t_completo * 1000:9.1f} ms")
+    print(f"ExplosionBOM.explotar    : {t_motor * 1000:9.1f} ms "
+          f"(preparación única {preparacion * 1000:.1f} ms)")
+    print(f"MRPVectorial.planificar  : {t_vectorial * 1000:9.1f} ms")
+    print(f"aceleración (mapa)       : {t_niveles / t_completo:9.1f}x")
+    print(f"aceleración (explosión)  : {t_niveles / t_motor:9.1f}x")
+    print(f"aceleración (vectorial)  : {t_niveles / t_vectorial:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
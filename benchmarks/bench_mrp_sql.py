@@ -0,0 +1,227 @@
+"""Benchmark de la carga de entradas del MRP desde la base de datos del backend.
+
+Crea una base SQLite temporal con ``--modulos`` módulos (algunos con dos
+versiones de BOM), ``--componentes`` componentes por BOM entre materiales y
+telas, y ``--stock`` filas de ``StockItem`` repartidas en varias ubicaciones.
+Compara:
+
+- el cargador ORM: instancia las filas de ``BillOfMaterials``, ``BomItem``
+  (una consulta por BOM) y ``StockItem`` y suma en Python;
+- ``load_mrp_inputs``: dos consultas agregadas leídas como filas.
+
+Ambos se miden con los índices de claves foráneas y el de totales de stock,
+y después sin ellos. Se comprueba que dan el mismo stock y la misma BOM, y
+el resultado se pasa a ``planificar_mrp`` en unidades enteras
+(``to_integer_units``).
+
+Uso: ``python benchmarks/bench_mrp_sql.py [--modulos 2000] [--stock 50000]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RAIZ / "src"))
+sys.path.insert(0, str(RAIZ / "backend"))
+BASE_TEMPORAL = Path(tempfile.mkdtemp()) / "bench_mrp.db"
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{BASE_TEMPORAL}"
+
+from sqlalchemy import insert, text  # noqa: E402
+from sqlmodel import select  # noqa: E402
+from sqlmodel.ext.asyncio.session import AsyncSession  # noqa: E402
+
+from app.db import engine, init_db  # noqa: E402
+from app.models import (  # noqa: E402
+    BillOfMaterials,
+    BomItem,
+    Fabric,
+    Material,
+    Module,
+    SofaModel,
+    StockItem,
+    StockLocation,
+)
+from app.mrp_inputs import (  # noqa: E402
+    MrpInputs,
+    fabric_key,
+    load_mrp_inputs,
+    material_key,
+    module_key,
+    to_integer_units,
+)
+from fabrica import planificar_mrp  # noqa: E402
+
+INDICES = [
+    "ix_billofmaterials_module_id",
+    "ix_bomitem_bom_id",
+    "ix_bomitem_material_id",
+    "ix_bomitem_fabric_id",
+    "ix_stockitem_location_id",
+    "ix_stockitem_material_id",
+    "ix_stockitem_module_id",
+    "ix_stockitem_totals",
+]
+
+
+async def poblar(modulos: int, componentes: int, filas_stock: int, semilla: int = 37) -> None:
+    aleatorio = random.Random(semilla)
+    materiales, telas, ubicaciones = 3 * modulos, modulos // 4 or 1, 10
+    filas = {
+        SofaModel: [{"id": 1, "name": "Modelo"}],
+        Module: [
+            {"id": i, "model_id": 1, "name": f"Módulo {i}", "width_cm": 90, "depth_cm": 95,
+             "height_cm": 80, "weight_kg": 30}
+            for i in range(1, modulos + 1)
+        ],
+        Material: [
+            {"id": i, "name": f"Material {i}", "unit": "ud", "internal_code": f"MAT-{i}"}
+            for i in range(1, materiales + 1)
+        ],
+        Fabric: [
+            {"id": i, "name": f"Tela {i}", "color": "gris", "composition": "poliéster",
+             "price_per_meter": 12.5, "supplier_code": f"T-{i}", "internal_code": f"TEL-{i}"}
+            for i in range(1, telas + 1)
+        ],
+        StockLocation: [{"id": i, "name": f"Almacén {i}"} for i in range(1, ubicaciones + 1)],
+    }
+    boms, items = [], []
+    for modulo in range(1, modulos + 1):
+        for _ in range(2 if aleatorio.random() < 0.2 else 1):
+            boms.append({"id": len(boms) + 1, "module_id": modulo, "labor_minutes": 90,
+                         "labor_cost": 35.0})
+            for _ in range(componentes):
+                es_material = aleatorio.random() < 0.8
+                items.append({
+                    "bom_id": len(boms),
+                    "material_id": aleatorio.randint(1, materiales) if es_material else None,
+                    "fabric_id": None if es_material else aleatorio.randint(1, telas),
+                    "quantity": aleatorio.randint(1, 40) / 4,
+                    "unit": "ud",
+                })
+    stock = []
+    for _ in range(filas_stock):
+        es_material = aleatorio.random() < 0.9
+        stock.append({
+            "location_id": aleatorio.randint(1, ubicaciones),
+            "material_id": aleatorio.randint(1, materiales) if es_material else None,
+            "module_id": None if es_material else aleatorio.randint(1, modulos),
+            "quantity": aleatorio.randint(0, 400) / 4,
+            "unit": "ud",
+        })
+    filas[BillOfMaterials] = boms
+    filas[BomItem] = items
+    filas[StockItem] = stock
+    async with engine.begin() as conexion:
+        for modelo, valores in filas.items():
+            await conexion.execute(insert(modelo.__table__), valores)
+
+
+async def cargar_con_orm(session: AsyncSession, demanda: dict) -> tuple[dict, dict]:
+    """Como se cargaba hasta ahora: objetos ORM y una consulta de líneas por BOM."""
+    ultimas: dict[int, BillOfMaterials] = {}
+    for bom in (await session.exec(select(BillOfMaterials))).all():
+        if bom.module_id not in ultimas or bom.id > ultimas[bom.module_id].id:
+            ultimas[bom.module_id] = bom
+    lista_materiales: dict[str, dict[str, float]] = {}
+    for bom in ultimas.values():
+        lineas = (await session.exec(select(BomItem).where(BomItem.bom_id == bom.id))).all()
+        componentes: dict[str, float] = {}
+        for linea in lineas:
+            if linea.material_id is not None:
+                clave = material_key(linea.material_id)
+            elif linea.fabric_id is not None:
+                clave = fabric_key(linea.fabric_id)
+            else:
+                continue
+            componentes[clave] = componentes.get(clave, 0) + linea.quantity
+        if componentes:
+            lista_materiales[module_key(bom.module_id)] = componentes
+    stock: dict[str, float] = {}
+    for item in (await session.exec(select(StockItem))).all():
+        if item.material_id is not None:
+            clave = material_key(item.material_id)
+        elif item.module_id is not None:
+            clave = module_key(item.module_id)
+        else:
+            continue
+        stock[clave] = stock.get(clave, 0) + item.quantity
+    return stock, lista_materiales
+
+
+async def cargar_por_conjuntos(session: AsyncSession, demanda: dict) -> tuple[dict, dict]:
+    entradas = await load_mrp_inputs(session, demanda)
+    return entradas.stock, entradas.bom
+
+
+def iguales(a: dict, b: dict) -> bool:
+    if a.keys() != b.keys():
+        return False
+    return all(
+        iguales(a[clave], b[clave]) if isinstance(a[clave], dict)
+        else math.isclose(a[clave], b[clave])
+        for clave in a
+    )
+
+
+async def medir(cargador, demanda: dict, repeticiones: int) -> tuple[tuple[dict, dict], float]:
+    tiempos = []
+    for _ in range(repeticiones):
+        async with AsyncSession(engine) as session:
+            inicio = time.perf_counter()
+            resultado = await cargador(session, demanda)
+            tiempos.append(time.perf_counter() - inicio)
+    return resultado, min(tiempos)
+
+
+async def principal(args: argparse.Namespace) -> None:
+    await init_db()
+    await poblar(args.modulos, args.componentes, args.stock)
+    aleatorio = random.Random(3)
+    demanda = {
+        module_key(modulo): aleatorio.randint(1, 20)
+        for modulo in aleatorio.sample(range(1, args.modulos + 1), min(200, args.modulos))
+    }
+    print(f"módulos: {args.modulos:,}  componentes por BOM: {args.componentes}  "
+          f"filas de stock: {args.stock:,}")
+
+    for etiqueta_indices in ("con índices", "sin índices"):
+        if etiqueta_indices == "sin índices":
+            async with engine.begin() as conexion:
+                for indice in INDICES:
+                    await conexion.execute(text(f"DROP INDEX {indice}"))
+        orm, segundos_orm = await medir(cargar_con_orm, demanda, args.repeticiones)
+        conjuntos, segundos = await medir(cargar_por_conjuntos, demanda, args.repeticiones)
+        assert iguales(orm[0], conjuntos[0]) and iguales(orm[1], conjuntos[1])
+        print(f"{etiqueta_indices}:")
+        print(f"  {'cargador ORM':<24} {segundos_orm * 1000:8.0f} ms")
+        print(f"  {'load_mrp_inputs':<24} {segundos * 1000:8.0f} ms "
+              f"{segundos_orm / segundos:6.1f}x")
+
+    enteras, _ = to_integer_units(MrpInputs(demand=demanda, stock=conjuntos[0], bom=conjuntos[1]))
+    requerimientos = planificar_mrp(enteras.demand, enteras.stock, enteras.bom)
+    netos = sum(1 for r in requerimientos.values() if r.requerimiento_neto > 0)
+    print(f"planificar_mrp: {len(requerimientos):,} artículos, {netos:,} con requerimiento neto")
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--modulos", type=int, default=2_000)
+    parser.add_argument("--componentes", type=int, default=12)
+    parser.add_argument("--stock", type=int, default=50_000)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(principal(args))
+
+
+if __name__ == "__main__":
+    main()
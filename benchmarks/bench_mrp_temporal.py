@@ -0,0 +1,72 @@
+"""Benchmark del MRP por periodos: longitud del horizonte frente a tiempo de corrida.
+
+Uso: ``python benchmarks/bench_mrp_temporal.py [--skus 20000] [--horizontes 13 26 52 104]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from bench_mrp import generar_catalogo  # noqa: E402
+from fabrica.mrp_temporal import Bucket, Horizonte, MRPTemporal  # noqa: E402
+from fabrica.mrp_vectorial import BOMCompilada  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--skus", type=int, default=20_000)
+    parser.add_argument("--niveles", type=int, default=5)
+    parser.add_argument("--componentes", type=int, default=3)
+    parser.add_argument("--horizontes", type=int, nargs="+", default=[13, 26, 52, 104])
+    parser.add_argument("--bucket", choices=[b.value for b in Bucket], default=Bucket.SEMANAL.value)
+    args = parser.parse_args()
+
+    aleatorio = random.Random(11)
+    bom, demanda_total, stock = generar_catalogo(args.skus, args.niveles, args.componentes)
+    bucket = Bucket(args.bucket)
+    inicio = date(2026, 1, 5)
+    plazos = {item: aleatorio.choice((0, 3, 7, 14, 21, 35)) for item in stock}
+
+    inicio_compilacion = time.perf_counter()
+    planificador = MRPTemporal(BOMCompilada(bom), plazos)
+    compilacion = time.perf_counter() - inicio_compilacion
+    print(
+        f"SKUs: {args.skus}  bucket: {bucket.value}  "
+        f"compilación BOM: {compilacion * 1000:.0f} ms"
+    )
+    print(f"{'periodos':>9} {'items':>9} {'planificación':>14} {'lanzamientos':>13}")
+
+    for periodos in args.horizontes:
+        dias = periodos * bucket.dias
+        demanda = {
+            item: {
+                inicio + timedelta(days=aleatorio.randrange(dias)): aleatorio.randint(1, cantidad)
+                for _ in range(4)
+            }
+            for item, cantidad in demanda_total.items()
+            if cantidad
+        }
+        recepciones = {
+            item: {inicio + timedelta(days=aleatorio.randrange(dias)): aleatorio.randint(1, 100)}
+            for item in list(stock)[::3]
+        }
+        horizonte = Horizonte(inicio, periodos, bucket)
+
+        inicio_corrida = time.perf_counter()
+        plan = planificador.planificar(horizonte, demanda, stock, recepciones)
+        corrida = time.perf_counter() - inicio_corrida
+        print(
+            f"{periodos:>9} {len(plan):>9} {corrida * 1000:>11.0f} ms "
+            f"{int((plan.lanzamientos > 0).sum()):>13}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Benchmark del planificador de producción a capacidad finita.
+
+Genera ``--ordenes`` órdenes sintéticas (módulos, cantidades, prioridades y
+alguna estación ya completada), las programa con ``programar_produccion`` y
+comprueba el resultado: ninguna estación usa más recursos de los que tiene,
+cada orden respeta el orden de la ruta y ninguna tarea empieza antes de que
+termine la anterior de la misma orden.
+
+Uso: ``python benchmarks/bench_planificacion.py [--ordenes 5000] [--repeticiones 3]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from fabrica import (  # noqa: E402
+    Estacion,
+    EstadoEstacion,
+    Modulo,
+    OrdenProduccion,
+    Pedido,
+    Programa,
+    crear_orden_produccion,
+    programar_produccion,
+)
+
+CAPACIDAD = {
+    Estacion.CORTE: 3,
+    Estacion.COSTURA: 8,
+    Estacion.TAPIZADO: 10,
+    Estacion.EMBALAJE: 2,
+}
+DURACIONES = {
+    Estacion.CORTE: 12.0,
+    Estacion.COSTURA: 35.0,
+    Estacion.TAPIZADO: 50.0,
+    Estacion.EMBALAJE: 8.0,
+}
+
+
+def generar_ordenes(
+    cantidad: int, skus: int = 200, semilla: int = 17
+) -> tuple[list[OrdenProduccion], dict[str, int], dict[tuple[Estacion, str], float]]:
+    """Órdenes, prioridades por orden y minutos por unidad de cada SKU y estación."""
+    aleatorio = random.Random(semilla)
+    catalogo = [f"SKU-{indice:04d}" for indice in range(skus)]
+    duraciones_sku = {
+        (estacion, sku): minutos * aleatorio.uniform(0.5, 1.8)
+        for sku in catalogo
+        for estacion, minutos in DURACIONES.items()
+        if aleatorio.random() < 0.7
+    }
+    ordenes, prioridades = [], {}
+    for indice in range(cantidad):
+        id_orden = f"OP-{indice:06d}"
+        modulos = [
+            Modulo(sku, "módulo", aleatorio.randint(1, 4))
+            for sku in aleatorio.sample(catalogo, aleatorio.randint(1, 3))
+        ]
+        orden = crear_orden_produccion(id_orden, Pedido(f"PED-{indice:06d}", "cliente", modulos))
+        if aleatorio.random() < 0.15:
+            orden.estaciones[Estacion.CORTE].estado = EstadoEstacion.COMPLETADO
+        ordenes.append(orden)
+        prioridades[id_orden] = aleatorio.choices([1, 2, 3, 4, 5], weights=[1, 2, 5, 2, 1])[0]
+    return ordenes, prioridades, duraciones_sku
+
+
+def validar(programa: Programa) -> None:
+    eventos = []
+    for tarea in programa.tareas:
+        assert tarea.recurso < programa.capacidad[tarea.estacion], tarea
+        eventos.append((tarea.inicio, 1, tarea.estacion))
+        eventos.append((tarea.fin, -1, tarea.estacion))
+    ocupados = {estacion: 0 for estacion in programa.capacidad}
+    for _, delta, estacion in sorted(eventos, key=lambda e: (e[0], e[1])):
+        ocupados[estacion] += delta
+        assert ocupados[estacion] <= programa.capacidad[estacion], estacion
+
+    ruta = list(Estacion)
+    anterior: dict[str, tuple[int, datetime]] = {}
+    for tarea in sorted(programa.tareas, key=lambda t: (t.id_orden, t.inicio)):
+        posicion = ruta.index(tarea.estacion)
+        if tarea.id_orden in anterior:
+            posicion_anterior, fin_anterior = anterior[tarea.id_orden]
+            assert posicion > posicion_anterior and tarea.inicio >= fin_anterior, tarea
+        anterior[tarea.id_orden] = (posicion, tarea.fin)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ordenes", type=int, default=5_000)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    ordenes, prioridades, duraciones_sku = generar_ordenes(args.ordenes)
+    inicio = datetime(2024, 1, 8, 8)
+    tiempos = []
+    for _ in range(args.repeticiones):
+        comienzo = time.perf_counter()
+        programa = programar_produccion(
+            ordenes, CAPACIDAD, DURACIONES, prioridades, inicio, duraciones_sku
+        )
+        tiempos.append(time.perf_counter() - comienzo)
+    validar(programa)
+
+    fines = programa.fin_por_orden()
+    espera: dict[int, list[float]] = {}
+    for id_orden, fin in fines.items():
+        espera.setdefault(prioridades[id_orden], []).append((fin - inicio).total_seconds() / 3600)
+
+    print(f"órdenes: {args.ordenes}  tareas: {len(programa.tareas)}")
+    print(f"programación: {min(tiempos) * 1000:.0f} ms (mejor de {args.repeticiones})")
+    print(f"makespan: {programa.makespan}")
+    for estacion, uso in programa.utilizacion().items():
+        print(f"  {estacion.value:<9} {CAPACIDAD[estacion]:>3} recursos  utilización {uso:.0%}")
+    for prioridad in sorted(espera):
+        horas = espera[prioridad]
+        print(f"  prioridad {prioridad}: {len(horas):>5} órdenes, "
+              f"fin medio a las {sum(horas) / len(horas):,.1f} h")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,27 @@
-from .documentos import generar_albaran, generar_documentos, generar_etiqueta, generar_factura
+from .documentos import (
+    ResultadoRenderizado,
+    generar_albaran,
+    generar_documentos,
+    generar_etiqueta,
+    generar_factura,
+    renderizar_documentos,
+)
 from .models import (
     Cliente,
     CondicionesComerciales,
     Contacto,
     Direccion,
     EstadoOrdenVenta,
+    ImporteFijo,
     LineaOrdenVenta,
     Moneda,
     Money,
     OrdenVenta,
+    SumadorImportes,
+    componer_importe,
+    descomponer_importe,
+    total_ordenes,
+    totales_ordenes,
 )
 
 __all__ = [
@@ -17,12 +30,20 @@ __all__ = [
     "Contacto",
     "Direccion",
     "EstadoOrdenVenta",
+    "ImporteFijo",
     "LineaOrdenVenta",
     "Moneda",
     "Money",
     "OrdenVenta",
+    "ResultadoRenderizado",
+    "SumadorImportes",
+    "componer_importe",
+    "descomponer_importe",
     "generar_albaran",
     "generar_documentos",
     "generar_etiqueta",
     "generar_factura",
+    "renderizar_documentos",
+    "total_ordenes",
+    "totales_ordenes",
 ]
@@ -1,9 +1,23 @@
 from __future__ import annotations
 
+import multiprocessing
+import time
+from dataclasses import dataclass
 from datetime import date
-from typing import Iterable
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
 
-from .models import Cliente, Direccion, LineaOrdenVenta, Money, OrdenVenta
+from .models import (
+    Cliente,
+    Direccion,
+    LineaOrdenVenta,
+    Money,
+    OrdenVenta,
+    componer_importe,
+    descomponer_importe,
+)
+
+SEPARADOR_DOCUMENTOS = "\f"
 
 
 def _formatear_direccion(direccion: Direccion) -> str:
@@ -73,3 +87,131 @@ def generar_documentos(orden: OrdenVenta, fecha_emision: date) -> Iterable[str]:
         generar_albaran(orden),
         generar_factura(orden, fecha_emision),
     )
+
+
+@dataclass(frozen=True)
+class ResultadoRenderizado:
+    ordenes: int
+    documentos: int
+    segundos: float
+
+    @property
+    def documentos_por_segundo(self) -> float:
+        return self.documentos / self.segundos if self.segundos else 0.0
+
+
+def _renderizar_bloque(tarea: Tuple[List[OrdenVenta], date, str]) -> Tuple[str, int, int]:
+    """Renderiza un bloque con el mismo texto que ``generar_documentos`` orden a orden.
+
+    Los tres documentos de cada orden salen de una sola plantilla y de una sola
+    pasada por sus líneas. Cada ``Direccion`` y cada precio se formatean una vez
+    por bloque, indexados por identidad: las órdenes de un mismo cliente y los
+    precios de catálogo comparten objeto, y hashear dataclasses congeladas cuesta
+    más que formatearlas. El total de la factura se suma en coma fija con los
+    precios ya descompuestos, como ``SumadorImportes``.
+    """
+    ordenes, fecha_emision, separador = tarea
+    emision = fecha_emision.isoformat()
+    direcciones: Dict[int, Tuple[Direccion, str]] = {}
+    precios: Dict[int, Tuple[Money, str]] = {}
+    partes: List[str] = []
+    for orden in ordenes:
+        cliente = orden.cliente
+        direccion = cliente.direccion_envio
+        if direccion is None:
+            raise ValueError("La orden no tiene direccion de envio configurada")
+        conocida = direcciones.get(id(direccion))
+        if conocida is None or conocida[0] is not direccion:
+            conocida = direcciones[id(direccion)] = (direccion, _formatear_direccion(direccion))
+        texto_direccion = conocida[1]
+        moneda = orden.moneda
+        lineas_factura = []
+        total = exponente_total = 0
+        for linea in orden.lineas:
+            precio = linea.precio_unitario
+            conocido = precios.get(id(precio))
+            if conocido is None or conocido[0] is not precio:
+                unidades, exponente = descomponer_importe(precio.importe)
+                conocido = (precio, _formatear_importe(precio), unidades, exponente)
+                precios[id(precio)] = conocido
+            if precio.moneda is not moneda and precio.moneda != moneda:
+                raise ValueError("No se pueden sumar importes con monedas distintas")
+            _, texto_precio, unidades, exponente = conocido
+            # Mismo Decimal, exponente incluido, que ``OrdenVenta.total``.
+            if exponente < exponente_total:
+                total *= 10 ** (exponente_total - exponente)
+                exponente_total = exponente
+            elif exponente > exponente_total:
+                unidades *= 10 ** (exponente - exponente_total)
+            total += unidades * linea.cantidad
+            lineas_factura.append(f"- {linea.descripcion}: {linea.cantidad} x {texto_precio}")
+        lineas_albaran = "\n".join(
+            f"- {linea.sku} | {linea.descripcion} | {linea.cantidad}"
+            for linea in orden.lineas_enviables()
+        )
+        importe_total = Money(componer_importe(total, exponente_total), moneda)
+        partes.append(
+            f"ETIQUETA DE ENVIO\nCliente: {cliente.nombre}\nDestino:\n{texto_direccion}\n"
+            f"{separador}"
+            f"ALBARAN\nOrden: {orden.numero}\nFecha: {orden.fecha.isoformat()}\n"
+            f"Cliente: {cliente.nombre}\nDireccion envio:\n{texto_direccion}\n"
+            f"Lineas:\n{lineas_albaran}\n"
+            f"{separador}"
+            f"FACTURA\nOrden: {orden.numero}\nFecha emision: {emision}\n"
+            f"Cliente: {cliente.nombre}\nLineas:\n" + "\n".join(lineas_factura) + "\n"
+            f"Total: {_formatear_importe(importe_total)}\n{separador}"
+        )
+    return "".join(partes), len(ordenes), 3 * len(ordenes)
+
+
+def _bloques(
+    ordenes: Iterable[OrdenVenta], fecha_emision: date, separador: str, tamano_bloque: int
+) -> Iterator[Tuple[List[OrdenVenta], date, str]]:
+    iterador = iter(ordenes)
+    while True:
+        bloque = list(islice(iterador, tamano_bloque))
+        if not bloque:
+            return
+        yield bloque, fecha_emision, separador
+
+
+def renderizar_documentos(
+    ordenes: Iterable[OrdenVenta],
+    fecha_emision: date,
+    destino: TextIO,
+    procesos: Optional[int] = 1,
+    tamano_bloque: int = 250,
+    separador: str = SEPARADOR_DOCUMENTOS,
+) -> ResultadoRenderizado:
+    """Genera etiqueta, albarán y factura de cada orden y los escribe en ``destino``.
+
+    Las órdenes se consumen en bloques de ``tamano_bloque``; cada bloque se
+    renderiza a un único texto (cada documento seguido de ``separador``) y se
+    escribe de una vez, sin acumular el lote entero en memoria. Con
+    ``procesos`` distinto de 1 los bloques se reparten entre un pool de
+    procesos (``None`` usa todos los núcleos) y se escriben en el orden de
+    entrada. El contenido es el mismo que ``generar_documentos`` orden a orden.
+    """
+    if tamano_bloque < 1:
+        raise ValueError("El tamaño de bloque debe ser al menos 1")
+    inicio = time.perf_counter()
+    tareas = _bloques(ordenes, fecha_emision, separador, tamano_bloque)
+    total_ordenes = total_documentos = 0
+
+    def escribir(resultados: Iterable[Tuple[str, int, int]]) -> None:
+        nonlocal total_ordenes, total_documentos
+        for texto, ordenes_bloque, documentos in resultados:
+            destino.write(texto)
+            total_ordenes += ordenes_bloque
+            total_documentos += documentos
+
+    if procesos == 1:
+        escribir(map(_renderizar_bloque, tareas))
+    else:
+        with multiprocessing.Pool(procesos) as pool:
+            escribir(pool.imap(_renderizar_bloque, tareas))
+    return ResultadoRenderizado(
+        ordenes=total_ordenes,
+        documentos=total_documentos,
+        segundos=time.perf_counter() - inicio,
+    )
@@ -0,0 +1,425 @@
+"""Agregación de ventas por cliente, SKU, estado y mes sobre una tabla columnar.
+
+Cada línea de venta ocupa una fila de columnas ``array`` (códigos enteros de
+cliente, SKU, estado y mes, fecha ordinal, cantidad e importe en coma fija),
+así que las consultas se resuelven con NumPy sin recorrer objetos. Además se
+mantienen dos rollups dispersos, ``cliente × mes × estado`` y ``sku × mes ×
+estado``, que reciben deltas al registrar órdenes y cuando
+``OrdenVenta.actualizar_estado`` avisa de un cambio, y responden las
+consultas que caben en ellos sin tocar las filas. Este módulo depende de
+NumPy, por eso no se importa desde ``fabrica``.
+"""
+
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .models import (
+    EstadoOrdenVenta,
+    Moneda,
+    OrdenVenta,
+    componer_importe,
+    descomponer_importe,
+)
+
+DIMENSIONES = ("cliente", "sku", "estado", "mes")
+ROLLUP_CLIENTES = ("cliente", "mes", "estado")
+ROLLUP_SKUS = ("sku", "mes", "estado")
+SKU_SIN_DETALLE = ""
+# Hasta este número de combinaciones se agrupa con bincount sobre la clave
+# densa; por encima, con np.unique.
+_MAX_GRUPOS_DENSOS = 1 << 20
+# Las filas de órdenes sustituidas se quedan inactivas; cuando son al menos
+# tantas y más de la mitad de la tabla, se compacta.
+_MIN_FILAS_MUERTAS = 4096
+
+
+@dataclass
+class FilaInforme:
+    grupo: Tuple[str, ...]
+    importe: Decimal
+    cantidad: int
+    lineas: int
+
+
+def _mes(fecha: date) -> int:
+    return fecha.year * 12 + fecha.month - 1
+
+
+def _texto_mes(mes: int) -> str:
+    return f"{mes // 12:04d}-{mes % 12 + 1:02d}"
+
+
+class _Rollup:
+    """Rollup disperso de tres dimensiones: importe, cantidad y líneas por celda.
+
+    Solo guarda las celdas con líneas, así que ocupa lo mismo que las
+    combinaciones presentes y no el producto de los tamaños de cada eje. Las
+    consultas leen una copia en arrays que se rehace tras cada cambio.
+    """
+
+    def __init__(self) -> None:
+        self.celdas: Dict[Tuple[int, int, int], List[int]] = {}
+        self._arrays: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    def acumular(self, a: int, b: int, c: int, importe: int, cantidad: int, lineas: int) -> None:
+        clave = (a, b, c)
+        medidas = self.celdas.get(clave)
+        if medidas is None:
+            medidas = self.celdas[clave] = [0, 0, 0]
+        medidas[0] += importe
+        medidas[1] += cantidad
+        medidas[2] += lineas
+        if not medidas[2]:
+            del self.celdas[clave]
+        self._arrays = None
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Códigos ``(celdas, 3)`` y medidas ``(celdas, 3)`` de las celdas con líneas."""
+        if self._arrays is None:
+            total = len(self.celdas)
+            codigos = np.fromiter(
+                (codigo for clave in self.celdas for codigo in clave),
+                dtype=np.int64,
+                count=3 * total,
+            )
+            medidas = np.fromiter(
+                (valor for valores in self.celdas.values() for valor in valores),
+                dtype=np.int64,
+                count=3 * total,
+            )
+            self._arrays = codigos.reshape(total, 3), medidas.reshape(total, 3)
+        return self._arrays
+
+
+def _sumar_grupos(grupo: np.ndarray, valores: np.ndarray, cantidad: int) -> np.ndarray:
+    if np.abs(valores).sum() < 2**53:
+        # Con sumas por debajo de 2**53 la acumulación en float64 es exacta.
+        return np.rint(np.bincount(grupo, weights=valores, minlength=cantidad)).astype(np.int64)
+    sumas = np.zeros(cantidad, dtype=np.int64)
+    np.add.at(sumas, grupo, valores)
+    return sumas
+
+
+class InformeVentas:
+    """Tabla columnar de líneas de venta con rollups incrementales.
+
+    Los importes se guardan como enteros en unidades de ``10**exponente`` de
+    ``moneda`` (céntimos por defecto) y los resultados se devuelven como
+    ``Decimal`` exactos. Registrar de nuevo una orden ya registrada sustituye
+    sus líneas.
+    """
+
+    def __init__(self, moneda: Moneda, exponente: int = -2) -> None:
+        self.moneda = moneda
+        self.exponente = exponente
+        self._valores: Dict[str, List[object]] = {dimension: [] for dimension in DIMENSIONES}
+        self._codigos: Dict[str, Dict[object, int]] = {dimension: {} for dimension in DIMENSIONES}
+        self._columnas: Dict[str, array] = {
+            "cliente": array("i"),
+            "sku": array("i"),
+            "estado": array("i"),
+            "mes": array("i"),
+            "fecha": array("i"),
+            "cantidad": array("q"),
+            "importe": array("q"),
+            "activa": array("b"),
+        }
+        self._ordenes: Dict[str, Tuple[int, int]] = {}
+        self._filas_muertas = 0
+        self._rollups = {ROLLUP_CLIENTES: _Rollup(), ROLLUP_SKUS: _Rollup()}
+        self._instantanea: Optional[Dict[str, np.ndarray]] = None
+
+    def __len__(self) -> int:
+        return sum(fin - inicio for inicio, fin in self._ordenes.values())
+
+    def _codigo(self, dimension: str, valor: object) -> int:
+        codigos = self._codigos[dimension]
+        codigo = codigos.get(valor)
+        if codigo is None:
+            codigo = codigos[valor] = len(codigos)
+            self._valores[dimension].append(valor)
+        return codigo
+
+    def _unidades(self, importe: Decimal) -> int:
+        unidades, exponente = descomponer_importe(importe)
+        if exponente < self.exponente:
+            raise ValueError(
+                f"El importe {importe} tiene más decimales de los que admite el informe"
+            )
+        return unidades * 10 ** (exponente - self.exponente)
+
+    def registrar_orden(self, orden: OrdenVenta, observar: bool = True) -> None:
+        """Añade las líneas de ``orden`` y, si ``observar``, sigue sus cambios de estado."""
+        if orden.moneda != self.moneda:
+            raise ValueError("La moneda de la orden no coincide con la del informe")
+        self._agregar(
+            orden.numero,
+            orden.cliente.identificador,
+            orden.estado.value,
+            orden.fecha,
+            [self._codigo("sku", linea.sku) for linea in orden.lineas],
+            [linea.cantidad for linea in orden.lineas],
+            [
+                self._unidades(linea.precio_unitario.importe) * linea.cantidad
+                for linea in orden.lineas
+            ],
+        )
+        if observar and self._al_cambiar_estado not in orden.observadores:
+            orden.observadores.append(self._al_cambiar_estado)
+
+    def registrar_ordenes(self, ordenes: Iterable[OrdenVenta], observar: bool = True) -> None:
+        for orden in ordenes:
+            self.registrar_orden(orden, observar=observar)
+
+    def registrar_pedido_backend(self, pedido) -> None:
+        """Añade un ``SalesOrder`` del backend como una sola línea sin SKU.
+
+        ``SalesOrder`` no tiene líneas: se usa ``total_amount`` como importe,
+        ``customer_id`` como cliente, ``status`` como estado y la fecha de
+        ``created_at``. Su número en el informe es ``backend:<id>``.
+        """
+        if pedido.currency != self.moneda.codigo:
+            raise ValueError("La moneda del pedido no coincide con la del informe")
+        creado = pedido.created_at
+        fecha = creado.date() if isinstance(creado, datetime) else creado
+        self._agregar(
+            f"backend:{pedido.id}",
+            str(pedido.customer_id),
+            pedido.status,
+            fecha,
+            [self._codigo("sku", SKU_SIN_DETALLE)],
+            [1],
+            [self._unidades(Decimal(str(pedido.total_amount)))],
+        )
+
+    def _agregar(
+        self,
+        numero: str,
+        cliente: str,
+        estado: str,
+        fecha: date,
+        skus: List[int],
+        cantidades: List[int],
+        importes: List[int],
+    ) -> None:
+        if numero in self._ordenes:
+            self._retirar(numero)
+        columnas = self._columnas
+        lineas = len(skus)
+        inicio = len(columnas["activa"])
+        columnas["cliente"].extend(array("i", [self._codigo("cliente", cliente)]) * lineas)
+        columnas["estado"].extend(array("i", [self._codigo("estado", estado)]) * lineas)
+        columnas["mes"].extend(array("i", [self._codigo("mes", _mes(fecha))]) * lineas)
+        columnas["fecha"].extend(array("i", [fecha.toordinal()]) * lineas)
+        columnas["activa"].extend(array("b", [1]) * lineas)
+        columnas["sku"].extend(skus)
+        columnas["cantidad"].extend(cantidades)
+        columnas["importe"].extend(importes)
+        self._ordenes[numero] = (inicio, inicio + lineas)
+        self._instantanea = None
+        self._acumular(numero, 1)
+
+    def _retirar(self, numero: str) -> None:
+        self._acumular(numero, -1)
+        inicio, fin = self._ordenes.pop(numero)
+        self._columnas["activa"][inicio:fin] = array("b", bytes(fin - inicio))
+        if self._instantanea is not None:
+            self._instantanea["activa"][inicio:fin] = 0
+        self._filas_muertas += fin - inicio
+        filas = len(self._columnas["activa"])
+        if self._filas_muertas >= _MIN_FILAS_MUERTAS and 2 * self._filas_muertas > filas:
+            self._compactar()
+
+    def _compactar(self) -> None:
+        """Elimina las filas inactivas y recoloca los rangos de cada orden.
+
+        Las órdenes se guardan en ``_ordenes`` en el orden de sus filas, porque
+        cada registro añade al final de la tabla y de ``_ordenes``.
+        """
+        activas = np.frombuffer(self._columnas["activa"], dtype=np.int8).astype(bool)
+        self._columnas = {
+            nombre: array(valores.typecode, np.frombuffer(valores, dtype=valores.typecode)[activas])
+            for nombre, valores in self._columnas.items()
+        }
+        inicio = 0
+        for numero, (desde, hasta) in self._ordenes.items():
+            self._ordenes[numero] = (inicio, inicio + hasta - desde)
+            inicio += hasta - desde
+        self._filas_muertas = 0
+        self._instantanea = None
+
+    def _acumular(self, numero: str, signo: int) -> None:
+        """Suma (``signo=1``) o resta (``-1``) las filas de ``numero`` en los rollups."""
+        inicio, fin = self._ordenes[numero]
+        if inicio == fin:
+            return
+        columnas = self._columnas
+        cliente, mes = columnas["cliente"][inicio], columnas["mes"][inicio]
+        estado = columnas["estado"][inicio]
+        importes = columnas["importe"][inicio:fin]
+        cantidades = columnas["cantidad"][inicio:fin]
+        lineas = fin - inicio
+        self._rollups[ROLLUP_CLIENTES].acumular(
+            cliente, mes, estado, signo * sum(importes), signo * sum(cantidades), signo * lineas
+        )
+        por_sku = self._rollups[ROLLUP_SKUS]
+        for sku, importe, cantidad in zip(columnas["sku"][inicio:fin], importes, cantidades):
+            por_sku.acumular(sku, mes, estado, signo * importe, signo * cantidad, signo)
+
+    def _al_cambiar_estado(
+        self, orden: OrdenVenta, anterior: EstadoOrdenVenta, nuevo: EstadoOrdenVenta
+    ) -> None:
+        self.cambiar_estado(orden.numero, nuevo.value)
+
+    def cambiar_estado(self, numero: str, estado: str) -> None:
+        """Mueve las líneas de ``numero`` a ``estado`` en la tabla y los rollups."""
+        if numero not in self._ordenes:
+            raise ValueError(f"La orden {numero} no está registrada en el informe")
+        inicio, fin = self._ordenes[numero]
+        codigo = self._codigo("estado", estado)
+        self._acumular(numero, -1)
+        self._columnas["estado"][inicio:fin] = array("i", [codigo]) * (fin - inicio)
+        if self._instantanea is not None:
+            self._instantanea["estado"][inicio:fin] = codigo
+        self._acumular(numero, 1)
+
+    def consultar(
+        self,
+        agrupar_por: Sequence[str] = (),
+        clientes: Optional[Iterable[str]] = None,
+        skus: Optional[Iterable[str]] = None,
+        estados: Optional[Iterable[str]] = None,
+        desde: Optional[date] = None,
+        hasta: Optional[date] = None,
+    ) -> List[FilaInforme]:
+        """Importe, cantidad y número de líneas por grupo, ordenados por grupo.
+
+        ``agrupar_por`` admite ``cliente``, ``sku``, ``estado`` y ``mes`` (como
+        ``"AAAA-MM"``); los filtros se combinan con AND y las fechas son
+        inclusivas. Sin filtros de fecha, las consultas que caben en un rollup
+        se responden desde él; el resto recorre las columnas con NumPy.
+        """
+        agrupar_por = list(agrupar_por)
+        desconocidas = set(agrupar_por) - set(DIMENSIONES)
+        if desconocidas:
+            raise ValueError(f"Dimensiones desconocidas: {', '.join(sorted(desconocidas))}")
+        filtros = {
+            dimension: self._codigos_filtro(dimension, valores)
+            for dimension, valores in (("cliente", clientes), ("sku", skus), ("estado", estados))
+            if valores is not None
+        }
+        usadas = set(agrupar_por) | set(filtros)
+        if desde is None and hasta is None:
+            for rollup in (ROLLUP_CLIENTES, ROLLUP_SKUS):
+                if usadas <= set(rollup):
+                    return self._desde_rollup(rollup, agrupar_por, filtros)
+        return self._desde_columnas(agrupar_por, filtros, desde, hasta)
+
+    def _codigos_filtro(self, dimension: str, valores: Iterable[str]) -> np.ndarray:
+        codigos = self._codigos[dimension]
+        return np.array([codigos[v] for v in valores if v in codigos], dtype=np.intp)
+
+    def _filas(
+        self,
+        agrupar_por: List[str],
+        codigos: Sequence[np.ndarray],
+        importes: np.ndarray,
+        cantidades: np.ndarray,
+        lineas: np.ndarray,
+    ) -> List[FilaInforme]:
+        columnas = []
+        for dimension, codigos_dimension in zip(agrupar_por, codigos):
+            valores = self._valores[dimension]
+            if dimension == "mes":
+                valores = [_texto_mes(mes) for mes in valores]
+            columnas.append([valores[codigo] for codigo in codigos_dimension.tolist()])
+        grupos = zip(*columnas) if columnas else [()] * len(lineas)
+        filas = [
+            FilaInforme(grupo, componer_importe(importe, self.exponente), cantidad, numero)
+            for grupo, importe, cantidad, numero in zip(
+                grupos, importes.tolist(), cantidades.tolist(), lineas.tolist()
+            )
+        ]
+        filas.sort(key=lambda fila: fila.grupo)
+        return filas
+
+    def _desde_rollup(
+        self, rollup: Tuple[str, ...], agrupar_por: List[str], filtros: Dict[str, np.ndarray]
+    ) -> List[FilaInforme]:
+        codigos, medidas = self._rollups[rollup].arrays()
+        columnas = {dimension: codigos[:, eje] for eje, dimension in enumerate(rollup)}
+        if filtros:
+            mascara = np.ones(len(medidas), dtype=bool)
+            for dimension, valores in filtros.items():
+                mascara &= np.isin(columnas[dimension], valores)
+            columnas = {dimension: eje[mascara] for dimension, eje in columnas.items()}
+            medidas = medidas[mascara]
+        return self._agrupar(agrupar_por, columnas, medidas[:, 0], medidas[:, 1], medidas[:, 2])
+
+    def _numpy(self) -> Dict[str, np.ndarray]:
+        if self._instantanea is None:
+            self._instantanea = {
+                nombre: np.frombuffer(valores, dtype=valores.typecode).copy()
+                for nombre, valores in self._columnas.items()
+            }
+        return self._instantanea
+
+    def _desde_columnas(
+        self,
+        agrupar_por: List[str],
+        filtros: Dict[str, np.ndarray],
+        desde: Optional[date],
+        hasta: Optional[date],
+    ) -> List[FilaInforme]:
+        columnas = self._numpy()
+        mascara = columnas["activa"].astype(bool)
+        for dimension, codigos in filtros.items():
+            mascara &= np.isin(columnas[dimension], codigos)
+        if desde is not None:
+            mascara &= columnas["fecha"] >= desde.toordinal()
+        if hasta is not None:
+            mascara &= columnas["fecha"] <= hasta.toordinal()
+        return self._agrupar(
+            agrupar_por,
+            {dimension: columnas[dimension][mascara] for dimension in agrupar_por},
+            columnas["importe"][mascara],
+            columnas["cantidad"][mascara],
+        )
+
+    def _agrupar(
+        self,
+        agrupar_por: List[str],
+        columnas: Dict[str, np.ndarray],
+        importe: np.ndarray,
+        cantidad: np.ndarray,
+        lineas: Optional[np.ndarray] = None,
+    ) -> List[FilaInforme]:
+        """Suma las medidas por grupo; sin ``lineas``, cada fila cuenta como una línea."""
+        # Clave de grupo en base mixta sobre los códigos de cada dimensión.
+        forma = tuple(max(len(self._valores[dimension]), 1) for dimension in agrupar_por)
+        clave = np.zeros(importe.size, dtype=np.int64)
+        for dimension, tamano in zip(agrupar_por, forma):
+            clave = clave * tamano + columnas[dimension]
+        if int(np.prod(forma)) <= _MAX_GRUPOS_DENSOS:
+            grupos, inverso = None, clave
+            total = int(np.prod(forma))
+        else:
+            grupos, inverso = np.unique(clave, return_inverse=True)
+            total = grupos.size
+        if lineas is None:
+            lineas = np.bincount(inverso, minlength=total)
+        else:
+            lineas = _sumar_grupos(inverso, lineas, total)
+        presentes = np.flatnonzero(lineas)
+        importes = _sumar_grupos(inverso, importe, total)[presentes]
+        cantidades = _sumar_grupos(inverso, cantidad, total)[presentes]
+        claves = presentes if grupos is None else grupos[presentes]
+        codigos = np.unravel_index(claves, forma) if agrupar_por else ()
+        return self._filas(agrupar_por, codigos, importes, cantidades, lineas[presentes])
@@ -4,7 +4,7 @@ from dataclasses import dataclass, field
 from datetime import date
 from decimal import Decimal
 from enum import Enum
-from typing import Iterable, List, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
 
 @dataclass(frozen=True)
@@ -53,6 +53,127 @@ class Money:
         return Money(self.importe * factor, self.moneda)
 
 
+def descomponer_importe(importe: Decimal) -> Tuple[int, int]:
+    """``(unidades, exponente)`` enteros con ``importe == unidades × 10**exponente``."""
+    signo, digitos, exponente = importe.as_tuple()
+    if not isinstance(exponente, int):
+        raise ValueError("Solo se admiten importes finitos")
+    # Construir el Decimal desde la tupla es exacto; ``scaleb`` redondearía a
+    # la precisión del contexto activo.
+    return int(Decimal((signo, digitos, 0))), exponente
+
+
+def componer_importe(unidades: int, exponente: int) -> Decimal:
+    """Inversa de ``descomponer_importe``, con el exponente dado como representación."""
+    signo, digitos, _ = Decimal(unidades).as_tuple()
+    return Decimal((signo, digitos, exponente))
+
+
+@dataclass(frozen=True)
+class ImporteFijo:
+    """Importe en coma fija: ``unidades × 10**exponente`` con enteros de Python.
+
+    El exponente es el del ``Decimal`` de origen (-2 para céntimos), de modo
+    que sumar y multiplicar por cantidades enteras es exacto y ``a_money``
+    devuelve el mismo ``Decimal``, exponente incluido, que la aritmética de
+    ``Money``.
+    """
+
+    unidades: int
+    exponente: int
+    moneda: Moneda
+
+    @classmethod
+    def desde_money(cls, importe: Money) -> "ImporteFijo":
+        unidades, exponente = descomponer_importe(importe.importe)
+        return cls(unidades, exponente, importe.moneda)
+
+    def a_money(self) -> Money:
+        return Money(componer_importe(self.unidades, self.exponente), self.moneda)
+
+    def __add__(self, other: "ImporteFijo") -> "ImporteFijo":
+        if self.moneda != other.moneda:
+            raise ValueError("No se pueden sumar importes con monedas distintas")
+        exponente = min(self.exponente, other.exponente)
+        unidades = self._unidades_en(exponente) + other._unidades_en(exponente)
+        return ImporteFijo(unidades, exponente, self.moneda)
+
+    def _unidades_en(self, exponente: int) -> int:
+        return self.unidades * 10 ** (self.exponente - exponente)
+
+    def __mul__(self, factor: int) -> "ImporteFijo":
+        return ImporteFijo(self.unidades * int(factor), self.exponente, self.moneda)
+
+
+class SumadorImportes:
+    """Suma en coma fija de líneas de venta, exacta respecto a ``Money``.
+
+    Cada importe se descompone una vez en ``(unidades, exponente)`` y se
+    reutiliza mientras vuelva a aparecer en otras líneas u órdenes; por línea
+    solo quedan una multiplicación y una suma de enteros. La caché se indexa
+    por el valor del ``Decimal`` y guarda como mucho ``maximo_precios``
+    entradas, descartando las usadas hace más tiempo. El acumulador baja de
+    exponente cuando llega un precio con más decimales, igual que hace
+    ``Decimal`` al sumar.
+    """
+
+    def __init__(self, maximo_precios: int = 4096) -> None:
+        if maximo_precios < 1:
+            raise ValueError("maximo_precios debe ser positivo")
+        self.maximo_precios = maximo_precios
+        self._precios: Dict[Decimal, Tuple[Decimal, int, int]] = {}
+
+    def sumar_lineas(self, lineas: Iterable["LineaOrdenVenta"], moneda: Moneda) -> Money:
+        return self.sumar(lineas, moneda).a_money()
+
+    def sumar(self, lineas: Iterable["LineaOrdenVenta"], moneda: Moneda) -> ImporteFijo:
+        precios = self._precios
+        buscar = precios.get
+        total, exponente = 0, 0  # el Decimal("0") inicial de OrdenVenta.total
+        for linea in lineas:
+            precio = linea.precio_unitario
+            if precio.moneda is not moneda and precio.moneda != moneda:
+                raise ValueError("No se pueden sumar importes con monedas distintas")
+            importe = precio.importe
+            conocido = buscar(importe)
+            # Decimal("1.0") == Decimal("1.00"): si no es el mismo objeto, se
+            # comprueba también el exponente con ``compare_total``.
+            if conocido is None or (
+                conocido[0] is not importe and conocido[0].compare_total(importe)
+            ):
+                conocido = (importe, *descomponer_importe(importe))
+                if importe not in precios and len(precios) >= self.maximo_precios:
+                    del precios[next(iter(precios))]
+            else:
+                del precios[importe]  # se reinserta al final: orden LRU
+            precios[importe] = conocido
+            _, unidades, exponente_precio = conocido
+            if exponente_precio < exponente:
+                total *= 10 ** (exponente - exponente_precio)
+                exponente = exponente_precio
+            elif exponente_precio > exponente:
+                unidades *= 10 ** (exponente_precio - exponente)
+            total += unidades * linea.cantidad
+        return ImporteFijo(total, exponente, moneda)
+
+    def totales_ordenes(self, ordenes: Iterable["OrdenVenta"]) -> Dict[str, Money]:
+        return {orden.numero: self.sumar_lineas(orden.lineas, orden.moneda) for orden in ordenes}
+
+
+def totales_ordenes(ordenes: Iterable["OrdenVenta"]) -> Dict[str, Money]:
+    """Total de cada orden por número, iguales a ``OrdenVenta.total``."""
+    return SumadorImportes().totales_ordenes(ordenes)
+
+
+def total_ordenes(ordenes: Iterable["OrdenVenta"], moneda: Moneda) -> Money:
+    """Suma de los totales de ``ordenes``, todas en ``moneda``."""
+    sumador = SumadorImportes()
+    total = ImporteFijo(0, 0, moneda)
+    for orden in ordenes:
+        total = total + sumador.sumar(orden.lineas, orden.moneda)
+    return total.a_money()
+
+
 @dataclass(frozen=True)
 class Cliente:
     identificador: str
@@ -71,7 +192,7 @@ class LineaOrdenVenta:
     precio_unitario: Money
 
     def total(self) -> Money:
-        return self.precio_unitario * Decimal(self.cantidad)
+        return Money(self.precio_unitario.importe * self.cantidad, self.precio_unitario.moneda)
 
 
 class EstadoOrdenVenta(str, Enum):
@@ -90,6 +211,16 @@ class OrdenVenta:
     fecha: date = field(default_factory=date.today)
     estado: EstadoOrdenVenta = EstadoOrdenVenta.CREADO
     lineas: List[LineaOrdenVenta] = field(default_factory=list)
+    # Funciones ``(orden, anterior, nuevo)`` avisadas en cada cambio de estado.
+    # Son locales al proceso: no se comparan, no se muestran ni se serializan.
+    observadores: List[Callable[["OrdenVenta", EstadoOrdenVenta, EstadoOrdenVenta], None]] = (
+        field(default_factory=list, repr=False, compare=False)
+    )
+
+    def __getstate__(self) -> dict:
+        estado = self.__dict__.copy()
+        estado["observadores"] = []
+        return estado
 
     def agregar_linea(self, linea: LineaOrdenVenta) -> None:
         if linea.precio_unitario.moneda != self.moneda:
@@ -97,13 +228,22 @@ class OrdenVenta:
         self.lineas.append(linea)
 
     def total(self) -> Money:
-        total = Money(Decimal("0"), self.moneda)
+        # Mismo resultado y control de moneda que encadenar ``Money.__add__``
+        # sobre ``linea.total()``, sin un ``Money`` intermedio por línea. Para
+        # muchas órdenes, ``totales_ordenes`` reutiliza los precios en coma fija.
+        importe = Decimal("0")
         for linea in self.lineas:
-            total = total + linea.total()
-        return total
+            precio = linea.precio_unitario
+            if precio.moneda is not self.moneda and precio.moneda != self.moneda:
+                raise ValueError("No se pueden sumar importes con monedas distintas")
+            importe += precio.importe * linea.cantidad
+        return Money(importe, self.moneda)
 
     def actualizar_estado(self, nuevo_estado: EstadoOrdenVenta) -> None:
-        self.estado = nuevo_estado
+        anterior, self.estado = self.estado, nuevo_estado
+        if anterior != nuevo_estado:
+            for observador in list(self.observadores):
+                observador(self, anterior, nuevo_estado)
 
     def lineas_enviables(self) -> Iterable[LineaOrdenVenta]:
         return list(self.lineas)
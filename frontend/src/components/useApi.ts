@@ -1,6 +1,8 @@
 import { useEffect, useState } from "react";
 
 const API_BASE = import.meta.env.VITE_API_BASE ?? "http://localhost:8000/api";
+// Largest page the list endpoints accept (MAX_LIMIT in the backend).
+const PAGE_SIZE = 1000;
 
 type ApiState<T> = {
   data: T[];
@@ -8,6 +10,27 @@ type ApiState<T> = {
   error: string | null;
 };
 
+// List endpoints return one page at a time; follow X-Next-Cursor until the
+// last page so callers get the whole collection.
+async function fetchAllPages<T>(path: string, signal: AbortSignal): Promise<T[]> {
+  const items: T[] = [];
+  let cursor: string | null = null;
+  do {
+    const url = new URL(`${API_BASE}${path}`, window.location.origin);
+    url.searchParams.set("limit", String(PAGE_SIZE));
+    if (cursor) {
+      url.searchParams.set("cursor", cursor);
+    }
+    const response = await fetch(url, { signal });
+    if (!response.ok) {
+      throw new Error("No se pudo cargar la información");
+    }
+    items.push(...((await response.json()) as T[]));
+    cursor = response.headers.get("X-Next-Cursor");
+  } while (cursor);
+  return items;
+}
+
 export function useApi<T>(path: string) {
   const [state, setState] = useState<ApiState<T>>({
     data: [],
@@ -16,29 +39,23 @@ export function useApi<T>(path: string) {
   });
 
   useEffect(() => {
-    let active = true;
+    const controller = new AbortController();
     setState({ data: [], loading: true, error: null });
 
-    fetch(`${API_BASE}${path}`)
-      .then(async (response) => {
-        if (!response.ok) {
-          throw new Error("No se pudo cargar la información");
-        }
-        return response.json() as Promise<T[]>;
-      })
+    fetchAllPages<T>(path, controller.signal)
       .then((data) => {
-        if (active) {
+        if (!controller.signal.aborted) {
           setState({ data, loading: false, error: null });
         }
       })
       .catch((error: Error) => {
-        if (active) {
+        if (!controller.signal.aborted) {
           setState({ data: [], loading: false, error: error.message });
         }
       });
 
     return () => {
-      active = false;
+      controller.abort();
     };
   }, [path]);
 
@@ -2,10 +2,12 @@
 
 from __future__ import annotations
 
+from array import array
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from enum import Enum
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 
 class StockType(str, Enum):
@@ -40,41 +42,450 @@ class StockMovement:
     purchase_id: Optional[str] = None
     production_id: Optional[str] = None
     note: Optional[str] = None
+    # ``(ledger, position)`` of every recording of this movement, set by the
+    # ledgers themselves. A plain attribute, not a field, so asdict(), fields()
+    # and replace() never see the ledgers.
+    _recordings: Tuple[Tuple["InventoryLedger", int], ...] = ()
 
     def link_purchase(self, purchase_id: str) -> None:
-        self.purchase_id = purchase_id
+        previous, self.purchase_id = self.purchase_id, purchase_id
+        for ledger, position in self._recordings:
+            ledger._relink(position, "purchase_id", previous, purchase_id)
 
     def link_production(self, production_id: str) -> None:
-        self.production_id = production_id
+        previous, self.production_id = self.production_id, production_id
+        for ledger, position in self._recordings:
+            ledger._relink(position, "production_id", previous, production_id)
+
+
+BalanceKey = Tuple[Location, StockType]
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = _EPOCH.replace(tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+_STOCK_TYPES = list(StockType)
+_MOVEMENT_TYPES = list(MovementType)
+_STOCK_TYPE_CODES = {stock_type: code for code, stock_type in enumerate(_STOCK_TYPES)}
+_MOVEMENT_TYPE_CODES = {
+    movement_type: code for code, movement_type in enumerate(_MOVEMENT_TYPES)
+}
+_AWARE_FLAG = 0x80
+_WIDER_TYPECODES = {"H": "I", "I": "Q", "i": "q"}
+
+
+def _to_epoch_us(moment: datetime) -> int:
+    if moment.tzinfo is None:
+        return (moment - _EPOCH) // _MICROSECOND
+    return (moment - _EPOCH_UTC) // _MICROSECOND
+
+
+def _from_epoch_us(value: int, aware: bool) -> datetime:
+    return (_EPOCH_UTC if aware else _EPOCH) + timedelta(microseconds=value)
+
+
+def _widened(column: array) -> array:
+    return array(_WIDER_TYPECODES[column.typecode], column)
+
+
+class ColumnarMovementStore:
+    """Compact, column-oriented storage for stock movements.
+
+    Quantities and timestamps (epoch microseconds) live in typed arrays, stock
+    and movement types are packed in one byte, locations and purchase or
+    production ids are interned and movement ids are kept in a single UTF-8
+    buffer. Integer columns start narrow and are widened the first time a
+    value does not fit, and notes are stored sparsely. ``StockMovement``
+    objects are only built when a position is read or the store is iterated;
+    timezone-aware timestamps come back in UTC.
+    """
+
+    def __init__(self) -> None:
+        self.ledger: Optional["InventoryLedger"] = None
+        self.locations: List[Location] = []
+        self._location_codes: Dict[Location, int] = {}
+        self._id_buffer = bytearray()
+        self._id_ends = array("I")
+        self._timestamps = array("q")
+        self._quantities = array("i")
+        self._types = array("B")
+        self._location_ids = array("H")
+        self._links: List[Optional[str]] = [None]
+        self._link_codes: Dict[str, int] = {}
+        self._purchase_ids = array("H")
+        self._production_ids = array("H")
+        self._notes: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._quantities)
+
+    def __getitem__(self, position: int) -> StockMovement:
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("movement position out of range")
+        types = self._types[position]
+        start = self._id_ends[position - 1] if position else 0
+        movement = StockMovement(
+            movement_id=self._id_buffer[start : self._id_ends[position]].decode(),
+            stock_type=_STOCK_TYPES[types & 0x0F],
+            movement_type=_MOVEMENT_TYPES[(types >> 4) & 0x07],
+            quantity=self._quantities[position],
+            location=self.locations[self._location_ids[position]],
+            occurred_at=_from_epoch_us(self._timestamps[position], bool(types & _AWARE_FLAG)),
+            purchase_id=self._links[self._purchase_ids[position]],
+            production_id=self._links[self._production_ids[position]],
+            note=self._notes.get(position),
+        )
+        if self.ledger is not None:
+            movement._recordings = ((self.ledger, position),)
+        return movement
+
+    def __iter__(self) -> Iterator[StockMovement]:
+        for position in range(len(self)):
+            yield self[position]
+
+    def append(self, movement: StockMovement) -> None:
+        position = len(self)
+        location_id = self._location_codes.get(movement.location)
+        if location_id is None:
+            location_id = self._location_codes[movement.location] = len(self.locations)
+            self.locations.append(movement.location)
+        self._id_buffer += movement.movement_id.encode()
+        self._append("_id_ends", len(self._id_buffer))
+        self._timestamps.append(_to_epoch_us(movement.occurred_at))
+        self._append("_quantities", movement.quantity)
+        self._types.append(
+            _STOCK_TYPE_CODES[movement.stock_type]
+            | _MOVEMENT_TYPE_CODES[movement.movement_type] << 4
+            | (_AWARE_FLAG if movement.occurred_at.tzinfo is not None else 0)
+        )
+        self._append("_location_ids", location_id)
+        self._append("_purchase_ids", self._link_code(movement.purchase_id))
+        self._append("_production_ids", self._link_code(movement.production_id))
+        if movement.note is not None:
+            self._notes[position] = movement.note
+
+    @property
+    def timestamps(self) -> array:
+        """Epoch-microsecond timestamps in position order."""
+        return self._timestamps
+
+    @property
+    def link_codes(self) -> Dict[str, int]:
+        """Code of every interned purchase or production id."""
+        return self._link_codes
+
+    def set_link(self, position: int, attribute: str, value: str) -> None:
+        name = "_purchase_ids" if attribute == "purchase_id" else "_production_ids"
+        code = self._link_code(value)
+        try:
+            getattr(self, name)[position] = code
+        except OverflowError:
+            setattr(self, name, _widened(getattr(self, name)))
+            getattr(self, name)[position] = code
+
+    def _append(self, name: str, value: int) -> None:
+        try:
+            getattr(self, name).append(value)
+        except OverflowError:
+            setattr(self, name, _widened(getattr(self, name)))
+            getattr(self, name).append(value)
+
+    def _link_code(self, value: Optional[str]) -> int:
+        if value is None:
+            return 0
+        code = self._link_codes.get(value)
+        if code is None:
+            code = self._link_codes[value] = len(self._links)
+            self._links.append(value)
+        return code
+
+    def balance_entry(self, position: int) -> Tuple[BalanceKey, int]:
+        types = self._types[position]
+        quantity = self._quantities[position]
+        if _MOVEMENT_TYPES[(types >> 4) & 0x07] == MovementType.SALIDA:
+            quantity = -quantity
+        location = self.locations[self._location_ids[position]]
+        return (location, _STOCK_TYPES[types & 0x0F]), quantity
+
+
+class _LinkIndex:
+    """Sorted movement positions per purchase or production id.
+
+    Positions of all ids are chained through two shared typed arrays: every
+    entry holds a position and the previous entry of the same id, and each id
+    only keeps the code of its last entry. Ids are coded by ``codes``, which
+    may be shared with a ``ColumnarMovementStore`` so the index adds no
+    per-id objects of its own.
+    """
+
+    def __init__(self, codes: Optional[Dict[str, int]] = None) -> None:
+        self._owns_codes = codes is None
+        self._codes: Dict[str, int] = {} if codes is None else codes
+        self._heads = array("i")
+        self._positions = array("I")
+        self._previous = array("i")
+
+    def get(self, key: str) -> List[int]:
+        positions = []
+        entry = self._head(key)
+        while entry >= 0:
+            positions.append(self._positions[entry])
+            entry = self._previous[entry]
+        positions.reverse()
+        return positions
+
+    def add(self, key: str, position: int) -> None:
+        code = self._codes.get(key)
+        if code is None and self._owns_codes:
+            code = self._codes[key] = len(self._codes)
+        if code >= len(self._heads):
+            self._heads.extend(array("i", [-1]) * (code + 1 - len(self._heads)))
+        following, previous = -1, self._heads[code]
+        while previous >= 0 and self._positions[previous] > position:
+            following, previous = previous, self._previous[previous]
+        entry = len(self._positions)
+        self._positions.append(position)
+        self._previous.append(previous)
+        if following < 0:
+            self._heads[code] = entry
+        else:
+            self._previous[following] = entry
+
+    def remove(self, key: str, position: int) -> None:
+        code = self._codes[key]
+        following, entry = -1, self._heads[code]
+        while self._positions[entry] != position:
+            following, entry = entry, self._previous[entry]
+        if following < 0:
+            self._heads[code] = self._previous[entry]
+        else:
+            self._previous[following] = self._previous[entry]
+
+    def _head(self, key: str) -> int:
+        code = self._codes.get(key)
+        if code is None or code >= len(self._heads):
+            return -1
+        return self._heads[code]
+
+
+@dataclass(frozen=True)
+class BalanceCheckpoint:
+    """Balances after the first ``position`` movements of a ledger.
+
+    ``balances`` holds one value per balance key, in the order the ledger first
+    saw each key; keys are never removed, so they are the ledger's first keys.
+    """
+
+    position: int
+    occurred_at: datetime
+    balances: array
 
 
 @dataclass
 class InventoryLedger:
-    movements: List[StockMovement] = field(default_factory=list)
+    """Movement ledger with running balances.
+
+    Balances keyed by (location, stock type) are kept up to date as movements
+    are recorded, and a checkpoint is stored every ``checkpoint_interval``
+    movements so that historical balances only replay the tail after the
+    nearest checkpoint. Hash indexes by purchase, production and location and
+    a time-sorted index by ``occurred_at`` are maintained alongside, and are
+    updated when a recorded movement is linked through ``link_purchase`` or
+    ``link_production``. Movements must go through ``record_movement`` to be
+    reflected in the balances and indexes.
+
+    ``movements`` may be a plain list or a ``ColumnarMovementStore``; the
+    indexes only hold positions and epoch timestamps in typed arrays, so they
+    stay compact with either backend. With the columnar store, the time index
+    is the store's timestamp column while movements arrive in order, and the
+    purchase and production indexes reuse its id codes.
+    """
+
+    movements: Union[List[StockMovement], ColumnarMovementStore] = field(default_factory=list)
+    checkpoint_interval: int = 10_000
+    # Everything below is derived from ``movements`` and left out of ``==``.
+    _balances: Dict[BalanceKey, int] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _checkpoints: List[BalanceCheckpoint] = field(
+        default_factory=list, init=False, repr=False, compare=False
+    )
+    _checkpoint_times: array = field(
+        default_factory=lambda: array("q"), init=False, repr=False, compare=False
+    )
+    _labels: Dict[Location, str] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _chronological: bool = field(default=True, init=False, repr=False, compare=False)
+    _by_purchase: _LinkIndex = field(
+        default_factory=_LinkIndex, init=False, repr=False, compare=False
+    )
+    _by_production: _LinkIndex = field(
+        default_factory=_LinkIndex, init=False, repr=False, compare=False
+    )
+    _by_location: Dict[Location, array] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _times: array = field(default_factory=lambda: array("q"), init=False, repr=False, compare=False)
+    _time_positions: array = field(
+        default_factory=lambda: array("I"), init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        if self.checkpoint_interval <= 0:
+            raise ValueError("checkpoint_interval must be positive")
+        existing, self.movements = self.movements, type(self.movements)()
+        if isinstance(self.movements, ColumnarMovementStore):
+            self.movements.ledger = self
+            self._by_purchase = _LinkIndex(self.movements.link_codes)
+            self._by_production = _LinkIndex(self.movements.link_codes)
+        for movement in existing:
+            self.record_movement(movement)
 
     def record_movement(self, movement: StockMovement) -> None:
+        position = len(self.movements)
+        timestamp = _to_epoch_us(movement.occurred_at)
+        times = self._sorted_times()
+        if self._chronological and times and timestamp < times[-1]:
+            self._build_time_positions()
         self.movements.append(movement)
+        movement._recordings += ((self, position),)
+        self._index_movement(movement, position, timestamp)
+        key = (movement.location, movement.stock_type)
+        self._balances[key] = self._balances.get(key, 0) + self._signed_quantity(movement)
+        if len(self.movements) % self.checkpoint_interval == 0:
+            self._checkpoints.append(
+                BalanceCheckpoint(
+                    position=len(self.movements),
+                    occurred_at=movement.occurred_at,
+                    balances=array("q", self._balances.values()),
+                )
+            )
+            self._checkpoint_times.append(timestamp)
+
+    def balances(self, as_of: Optional[datetime] = None) -> Dict[BalanceKey, int]:
+        """Balances per (location, stock type), optionally as of a past moment.
+
+        Movements recorded out of chronological order disable the checkpoint
+        shortcut and historical queries replay the time index from the start.
+        """
+        if as_of is None:
+            return dict(self._balances)
+        moment = _to_epoch_us(as_of)
+        end = bisect_right(self._sorted_times(), moment)
+        if not self._chronological:
+            return self._replay({}, self._time_positions[:end])
 
-    def balance_by_location(self) -> Dict[str, int]:
+        index = bisect_right(self._checkpoint_times, moment) - 1
+        if index < 0:
+            return self._replay({}, range(end))
+        checkpoint = self._checkpoints[index]
+        balances = dict(zip(self._balances, checkpoint.balances))
+        return self._replay(balances, range(checkpoint.position, end))
+
+    def balance_by_location(self, as_of: Optional[datetime] = None) -> Dict[str, int]:
         balances: Dict[str, int] = {}
-        for movement in self.movements:
-            key = movement.location.label()
-            balances.setdefault(key, 0)
-            balances[key] += self._signed_quantity(movement)
+        for (location, _), quantity in self.balances(as_of).items():
+            key = self._label(location)
+            balances[key] = balances.get(key, 0) + quantity
         return balances
 
-    def balance_by_stock_type(self) -> Dict[StockType, int]:
+    def balance_by_stock_type(self, as_of: Optional[datetime] = None) -> Dict[StockType, int]:
         balances: Dict[StockType, int] = {}
-        for movement in self.movements:
-            balances.setdefault(movement.stock_type, 0)
-            balances[movement.stock_type] += self._signed_quantity(movement)
+        for (_, stock_type), quantity in self.balances(as_of).items():
+            balances[stock_type] = balances.get(stock_type, 0) + quantity
         return balances
 
     def movements_for_purchase(self, purchase_id: str) -> List[StockMovement]:
-        return [m for m in self.movements if m.purchase_id == purchase_id]
+        return self._at_positions(self._by_purchase.get(purchase_id))
 
     def movements_for_production(self, production_id: str) -> List[StockMovement]:
-        return [m for m in self.movements if m.production_id == production_id]
+        return self._at_positions(self._by_production.get(production_id))
+
+    def movements_at(self, location: Location) -> List[StockMovement]:
+        return self._at_positions(self._by_location.get(location, ()))
+
+    def movements_between(self, start: datetime, end: datetime) -> List[StockMovement]:
+        """Movements with ``start <= occurred_at < end``, in time order."""
+        times = self._sorted_times()
+        first = bisect_left(times, _to_epoch_us(start))
+        last = bisect_left(times, _to_epoch_us(end))
+        if self._chronological:
+            return self._at_positions(range(first, last))
+        return self._at_positions(self._time_positions[first:last])
+
+    def _index_movement(self, movement: StockMovement, position: int, timestamp: int) -> None:
+        if movement.purchase_id is not None:
+            self._by_purchase.add(movement.purchase_id, position)
+        if movement.production_id is not None:
+            self._by_production.add(movement.production_id, position)
+        self._positions(self._by_location, movement.location).append(position)
+        if self._chronological:
+            if not isinstance(self.movements, ColumnarMovementStore):
+                self._times.append(timestamp)
+        else:
+            slot = bisect_right(self._times, timestamp)
+            self._times.insert(slot, timestamp)
+            self._time_positions.insert(slot, position)
+
+    def _sorted_times(self) -> array:
+        # While movements arrive in time order, position i is also the i-th
+        # movement in time, and a columnar store's timestamp column already is
+        # the sorted time index.
+        if self._chronological and isinstance(self.movements, ColumnarMovementStore):
+            return self.movements.timestamps
+        return self._times
+
+    def _build_time_positions(self) -> None:
+        if isinstance(self.movements, ColumnarMovementStore):
+            self._times = array("q", self.movements.timestamps)
+        self._time_positions = array("I", range(len(self.movements)))
+        self._chronological = False
+
+    @staticmethod
+    def _positions(index: Dict, key: object) -> array:
+        positions = index.get(key)
+        if positions is None:
+            positions = index[key] = array("I")
+        return positions
+
+    def _relink(
+        self, position: int, attribute: str, previous: Optional[str], current: str
+    ) -> None:
+        index = self._by_purchase if attribute == "purchase_id" else self._by_production
+        if previous == current:
+            return
+        if isinstance(self.movements, ColumnarMovementStore):
+            self.movements.set_link(position, attribute, current)
+        if previous is not None:
+            index.remove(previous, position)
+        index.add(current, position)
+
+    def _at_positions(self, positions: Iterable[int]) -> List[StockMovement]:
+        return [self.movements[position] for position in positions]
+
+    def _replay(
+        self, balances: Dict[BalanceKey, int], positions: Iterable[int]
+    ) -> Dict[BalanceKey, int]:
+        if isinstance(self.movements, ColumnarMovementStore):
+            entry = self.movements.balance_entry
+        else:
+            entry = self._balance_entry
+        for position in positions:
+            key, quantity = entry(position)
+            balances[key] = balances.get(key, 0) + quantity
+        return balances
+
+    def _balance_entry(self, position: int) -> Tuple[BalanceKey, int]:
+        movement = self.movements[position]
+        return (movement.location, movement.stock_type), self._signed_quantity(movement)
+
+    def _label(self, location: Location) -> str:
+        label = self._labels.get(location)
+        if label is None:
+            label = self._labels[location] = location.label()
+        return label
 
     @staticmethod
     def _signed_quantity(movement: StockMovement) -> int:
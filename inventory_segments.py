@@ -0,0 +1,517 @@
+"""Append-only segment files for persisting inventory movements.
+
+A segment is a header followed by fixed-width little-endian records. Movements,
+location definitions, late purchase/production links, note chunks and text
+chunks are all records, so the file is only ever appended to. Readers map the
+file with ``mmap`` and view it as a NumPy structured array, which lets balances
+be computed over the mapped buffer without building a ``StockMovement`` per row.
+
+Ids of up to ``TEXT_WIDTH`` bytes are stored inline. Longer ids (UUIDs), empty
+ids and ids containing NUL go to a string table of text records, and the
+movement or link record holds the table code with a flag bit set.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from inventory import (
+    BalanceKey,
+    ColumnarMovementStore,
+    InventoryLedger,
+    Location,
+    MovementType,
+    StockMovement,
+    StockType,
+)
+
+MAGIC = b"FABLEDG1"
+KIND_MOVEMENT = 1
+KIND_LOCATION = 2
+KIND_LINK_PURCHASE = 3
+KIND_LINK_PRODUCTION = 4
+KIND_NOTE = 5
+KIND_TEXT = 6
+FLAG_AWARE = 0x01
+FLAG_MOVEMENT_ID_TEXT = 0x02
+FLAG_PURCHASE_ID_TEXT = 0x04
+FLAG_PRODUCTION_ID_TEXT = 0x08
+TEXT_WIDTH = 24
+PAYLOAD_WIDTH = TEXT_WIDTH * 3
+
+# On-disk codes are fixed here rather than derived from enum order.
+STOCK_TYPE_CODES = {
+    StockType.MATERIA_PRIMA: 0,
+    StockType.MODULO: 1,
+    StockType.PRODUCTO_TERMINADO: 2,
+}
+MOVEMENT_TYPE_CODES = {
+    MovementType.ENTRADA: 0,
+    MovementType.SALIDA: 1,
+    MovementType.AJUSTE: 2,
+}
+_STOCK_TYPES = {code: stock_type for stock_type, code in STOCK_TYPE_CODES.items()}
+_MOVEMENT_TYPES = {code: movement_type for movement_type, code in MOVEMENT_TYPE_CODES.items()}
+
+_BODY = struct.Struct("<BBBBIqq24s24s24s")
+_CRC = struct.Struct("<I4x")
+RECORD_SIZE = _BODY.size + _CRC.size
+HEADER = MAGIC + struct.pack("<I", RECORD_SIZE) + bytes(RECORD_SIZE - len(MAGIC) - 4)
+RECORD_DTYPE = np.dtype(
+    [
+        ("kind", "u1"),
+        ("stock_type", "u1"),
+        ("movement_type", "u1"),
+        ("flags", "u1"),
+        ("location", "<u4"),
+        ("occurred_at", "<i8"),
+        ("quantity", "<i8"),
+        ("movement_id", "S24"),
+        ("purchase_id", "S24"),
+        ("production_id", "S24"),
+        ("crc", "<u4"),
+        ("reserved", "V4"),
+    ]
+)
+assert RECORD_DTYPE.itemsize == RECORD_SIZE
+_PAYLOAD_OFFSET = RECORD_DTYPE.fields["movement_id"][1]
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = _EPOCH.replace(tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _pack(
+    kind: int,
+    stock_type: int = 0,
+    movement_type: int = 0,
+    flags: int = 0,
+    location: int = 0,
+    occurred_at: int = 0,
+    quantity: int = 0,
+    first: bytes = b"",
+    second: bytes = b"",
+    third: bytes = b"",
+) -> bytes:
+    body = _BODY.pack(
+        kind,
+        stock_type,
+        movement_type,
+        flags,
+        location,
+        occurred_at,
+        quantity,
+        first,
+        second,
+        third,
+    )
+    return body + _CRC.pack(zlib.crc32(body))
+
+
+def _record_is_valid(record: bytes) -> bool:
+    body = record[: _BODY.size]
+    (crc,) = _CRC.unpack_from(record, _BODY.size)
+    return body[0] != 0 and zlib.crc32(body) == crc
+
+
+def _valid_records(path: str, buffer: bytes, count: int) -> int:
+    """Check every record's checksum and return how many records are valid.
+
+    A bad final record is a torn append and is left out; a bad record before
+    it means the file is corrupt.
+    """
+    with memoryview(buffer) as view:
+        start = len(HEADER)
+        for index in range(count):
+            if not _record_is_valid(view[start : start + RECORD_SIZE]):
+                if index < count - 1:
+                    raise ValueError(f"{path}: record {index} fails its checksum")
+                return index
+            start += RECORD_SIZE
+    return count
+
+
+def _payload(record: np.void) -> bytes:
+    """The 72 text bytes of a note or text record, NUL bytes included."""
+    return record.tobytes()[_PAYLOAD_OFFSET : _PAYLOAD_OFFSET + PAYLOAD_WIDTH]
+
+
+def _text(record: np.void, name: str, flag: int, texts: List[str]) -> Optional[str]:
+    value = record[name]
+    if record["flags"] & flag:
+        return texts[int.from_bytes(value, "little")]
+    return value.decode() or None
+
+
+def recover(path: str) -> int:
+    """Truncate a torn tail and return the number of valid records.
+
+    Only the final record can be torn by a crash during an append, so a
+    partial trailing record or a final record with a bad checksum is dropped.
+    Every other record is checked too, and a bad one raises ``ValueError``.
+    """
+    with open(path, "r+b") as handle:
+        size = os.fstat(handle.fileno()).st_size
+        if size < len(HEADER):
+            handle.truncate(0)
+            return 0
+        handle.seek(0)
+        if handle.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not an inventory segment")
+        count = (size - len(HEADER)) // RECORD_SIZE
+        if count:
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                count = _valid_records(path, mapped, count)
+        valid_size = len(HEADER) + count * RECORD_SIZE
+        if valid_size != size:
+            handle.truncate(valid_size)
+            os.fsync(handle.fileno())
+        return count
+
+
+class SegmentWriter:
+    """Appends movements to a segment file with batched ``fsync``.
+
+    Records are buffered and written, then synced, every ``sync_every``
+    records and on ``flush``/``close``. Opening an existing segment first
+    recovers it from a torn final record. Purchase and production ids in the
+    text table are interned; long movement ids get a text record each.
+    """
+
+    def __init__(self, path: str, sync_every: int = 4096) -> None:
+        if sync_every <= 0:
+            raise ValueError("sync_every must be positive")
+        self.path = path
+        self.sync_every = sync_every
+        self._locations: Dict[Location, int] = {}
+        self._texts: Dict[str, int] = {}
+        self._text_count = 0
+        self._movements = 0
+        self._pending = bytearray()
+        self._pending_records = 0
+        if os.path.exists(path) and os.path.getsize(path):
+            recover(path)
+            segment = LedgerSegment.open(path, verify=False)
+            try:
+                self._locations = {
+                    location: code for code, location in enumerate(segment.locations)
+                }
+                texts = segment.texts()
+                self._texts = {text: code for code, text in enumerate(texts)}
+                self._text_count = len(texts)
+                self._movements = len(segment)
+            finally:
+                segment.close()
+            self._file = open(path, "ab")
+        else:
+            self._file = open(path, "wb")
+            self._file.write(HEADER)
+            self._sync()
+
+    def __enter__(self) -> "SegmentWriter":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._movements
+
+    def append(self, movement: StockMovement) -> int:
+        """Append a movement and return its position in the segment."""
+        location = self._locations.get(movement.location)
+        if location is None:
+            location = self._locations[movement.location] = len(self._locations)
+            text = f"{movement.location.warehouse}\0{movement.location.shelf}".encode()
+            if len(text) > PAYLOAD_WIDTH:
+                raise ValueError(f"location label must be at most {PAYLOAD_WIDTH} bytes")
+            self._write(
+                _pack(
+                    KIND_LOCATION,
+                    location=location,
+                    first=text[:TEXT_WIDTH],
+                    second=text[TEXT_WIDTH : 2 * TEXT_WIDTH],
+                    third=text[2 * TEXT_WIDTH :],
+                )
+            )
+
+        occurred_at = movement.occurred_at
+        aware = occurred_at.tzinfo is not None
+        position = self._movements
+        movement_id, id_flag = self._text_field(
+            movement.movement_id, FLAG_MOVEMENT_ID_TEXT, intern=False
+        )
+        purchase_id, purchase_flag = self._text_field(movement.purchase_id, FLAG_PURCHASE_ID_TEXT)
+        production_id, production_flag = self._text_field(
+            movement.production_id, FLAG_PRODUCTION_ID_TEXT
+        )
+        self._write(
+            _pack(
+                KIND_MOVEMENT,
+                stock_type=STOCK_TYPE_CODES[movement.stock_type],
+                movement_type=MOVEMENT_TYPE_CODES[movement.movement_type],
+                flags=(FLAG_AWARE if aware else 0) | id_flag | purchase_flag | production_flag,
+                location=location,
+                occurred_at=(occurred_at - (_EPOCH_UTC if aware else _EPOCH)) // _MICROSECOND,
+                quantity=movement.quantity,
+                first=movement_id,
+                second=purchase_id,
+                third=production_id,
+            )
+        )
+        self._movements += 1
+        if movement.note is not None:
+            self._write_chunks(KIND_NOTE, movement.note.encode(), occurred_at=position)
+        return position
+
+    def link_purchase(self, position: int, purchase_id: str) -> None:
+        value, flag = self._text_field(purchase_id, FLAG_PURCHASE_ID_TEXT)
+        self._write(_pack(KIND_LINK_PURCHASE, flags=flag, occurred_at=position, second=value))
+
+    def link_production(self, position: int, production_id: str) -> None:
+        value, flag = self._text_field(production_id, FLAG_PRODUCTION_ID_TEXT)
+        self._write(_pack(KIND_LINK_PRODUCTION, flags=flag, occurred_at=position, third=value))
+
+    def flush(self) -> None:
+        if self._pending:
+            self._file.write(self._pending)
+            self._pending.clear()
+            self._pending_records = 0
+        self._sync()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def _text_field(
+        self, value: Optional[str], flag: int, intern: bool = True
+    ) -> Tuple[bytes, int]:
+        """Inline bytes of ``value``, or its text table code and ``flag``."""
+        if value is None:
+            return b"", 0
+        encoded = value.encode()
+        if encoded and len(encoded) <= TEXT_WIDTH and b"\0" not in encoded:
+            return encoded, 0
+        code = self._texts.get(value) if intern else None
+        if code is None:
+            code = self._text_count
+            self._text_count += 1
+            if intern:
+                self._texts[value] = code
+            self._write_chunks(KIND_TEXT, encoded, location=code)
+        return code.to_bytes(4, "little"), flag
+
+    def _write_chunks(self, kind: int, encoded: bytes, **fields: int) -> None:
+        # An empty value still gets one zero-length chunk, so it reads back
+        # as an empty string rather than as missing.
+        for start in range(0, max(len(encoded), 1), PAYLOAD_WIDTH):
+            chunk = encoded[start : start + PAYLOAD_WIDTH]
+            self._write(
+                _pack(
+                    kind,
+                    quantity=len(chunk),
+                    first=chunk[:TEXT_WIDTH],
+                    second=chunk[TEXT_WIDTH : 2 * TEXT_WIDTH],
+                    third=chunk[2 * TEXT_WIDTH :],
+                    **fields,
+                )
+            )
+
+    def _write(self, record: bytes) -> None:
+        self._pending += record
+        self._pending_records += 1
+        if self._pending_records >= self.sync_every:
+            self.flush()
+
+    def _sync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+
+@dataclass
+class LedgerSegment:
+    """Read-only, memory-mapped view of a segment file.
+
+    Opening checks the final record's checksum, where a crash during an
+    append leaves a torn record, and that every record has a known kind, which
+    NumPy does over the mapped buffer in one pass. ``verify=True`` also checks
+    every record's checksum, as ``recover`` does, at about a second per
+    million records. A torn final record is ignored, and ``SegmentWriter`` or
+    ``recover`` truncate it on disk; any other bad record raises ``ValueError``.
+    """
+
+    path: str
+    records: np.ndarray
+    locations: List[Location]
+    _map: Optional[mmap.mmap] = None
+    _texts: Optional[List[str]] = None
+
+    @classmethod
+    def open(cls, path: str, verify: bool = False) -> "LedgerSegment":
+        with open(path, "rb") as handle:
+            size = os.fstat(handle.fileno()).st_size
+            if size < len(HEADER) or handle.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not an inventory segment")
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+        count = (size - len(HEADER)) // RECORD_SIZE
+        if count and verify:
+            try:
+                count = _valid_records(path, mapped, count)
+            except ValueError:
+                mapped.close()
+                raise
+        elif count:
+            last = len(HEADER) + (count - 1) * RECORD_SIZE
+            if not _record_is_valid(mapped[last : last + RECORD_SIZE]):
+                count -= 1
+        records = np.frombuffer(mapped, dtype=RECORD_DTYPE, count=count, offset=len(HEADER))
+        kinds = records["kind"]
+        unknown = np.flatnonzero((kinds < KIND_MOVEMENT) | (kinds > KIND_TEXT))
+        if len(unknown):
+            del records, kinds
+            mapped.close()
+            raise ValueError(f"{path}: record {int(unknown[0])} has an unknown kind")
+
+        locations: List[Location] = []
+        for record in records[records["kind"] == KIND_LOCATION]:
+            text = b"".join(
+                (record["movement_id"], record["purchase_id"], record["production_id"])
+            ).decode()
+            warehouse, shelf = text.split("\0", 1)
+            locations.append(Location(warehouse=warehouse, shelf=shelf))
+        return cls(path=path, records=records, locations=locations, _map=mapped)
+
+    def __enter__(self) -> "LedgerSegment":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.records["kind"] == KIND_MOVEMENT))
+
+    def close(self) -> None:
+        self.records = self.records[:0].copy()
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def texts(self) -> List[str]:
+        """Strings of the segment's text table, indexed by code."""
+        if self._texts is None:
+            chunks: Dict[int, List[bytes]] = {}
+            for record in self.records[self.records["kind"] == KIND_TEXT]:
+                chunks.setdefault(int(record["location"]), []).append(
+                    _payload(record)[: int(record["quantity"])]
+                )
+            self._texts = [b"".join(chunks[code]).decode() for code in range(len(chunks))]
+        return self._texts
+
+    def balances(self, as_of: Optional[datetime] = None) -> Dict[BalanceKey, int]:
+        """Balances per (location, stock type), computed over the mapped records."""
+        records = self.records
+        mask = records["kind"] == KIND_MOVEMENT
+        if as_of is not None:
+            aware = as_of.tzinfo is not None
+            limit = (as_of - (_EPOCH_UTC if aware else _EPOCH)) // _MICROSECOND
+            mask &= records["occurred_at"] <= limit
+        quantity = records["quantity"]
+        signed = np.where(
+            records["movement_type"] == MOVEMENT_TYPE_CODES[MovementType.SALIDA],
+            -quantity,
+            quantity,
+        )
+        width = len(STOCK_TYPE_CODES)
+        keys = records["location"].astype(np.int64) * width + records["stock_type"]
+        # Summed in int64: float weights would lose units above 2**53.
+        totals = np.zeros(len(self.locations) * width, dtype=np.int64)
+        np.add.at(totals, keys[mask], signed[mask])
+        seen = np.zeros(totals.shape, dtype=bool)
+        seen[keys[mask]] = True
+        return {
+            (self.locations[key // width], _STOCK_TYPES[key % width]): int(totals[key])
+            for key in np.flatnonzero(seen)
+        }
+
+    def balance_by_location(self, as_of: Optional[datetime] = None) -> Dict[str, int]:
+        balances: Dict[str, int] = {}
+        for (location, _), quantity in self.balances(as_of).items():
+            label = location.label()
+            balances[label] = balances.get(label, 0) + quantity
+        return balances
+
+    def balance_by_stock_type(self, as_of: Optional[datetime] = None) -> Dict[StockType, int]:
+        balances: Dict[StockType, int] = {}
+        for (_, stock_type), quantity in self.balances(as_of).items():
+            balances[stock_type] = balances.get(stock_type, 0) + quantity
+        return balances
+
+    def movements(self) -> List[StockMovement]:
+        """Deserialize every movement, applying later links and notes."""
+        records = self.records
+        kinds = records["kind"]
+        rows = np.flatnonzero(kinds == KIND_MOVEMENT)
+        texts = self.texts()
+        links: Dict[Tuple[int, int], str] = {}
+        notes: Dict[int, List[bytes]] = {}
+        for row in np.flatnonzero((kinds >= KIND_LINK_PURCHASE) & (kinds <= KIND_NOTE)):
+            record = records[row]
+            position = int(record["occurred_at"])
+            kind = int(record["kind"])
+            if kind == KIND_LINK_PURCHASE:
+                links[(position, kind)] = _text(
+                    record, "purchase_id", FLAG_PURCHASE_ID_TEXT, texts
+                )
+            elif kind == KIND_LINK_PRODUCTION:
+                links[(position, kind)] = _text(
+                    record, "production_id", FLAG_PRODUCTION_ID_TEXT, texts
+                )
+            else:
+                notes.setdefault(position, []).append(
+                    _payload(record)[: int(record["quantity"])]
+                )
+
+        movements: List[StockMovement] = []
+        for position, row in enumerate(rows):
+            record = records[row]
+            aware = bool(record["flags"] & FLAG_AWARE)
+            purchase_id = _text(record, "purchase_id", FLAG_PURCHASE_ID_TEXT, texts)
+            production_id = _text(record, "production_id", FLAG_PRODUCTION_ID_TEXT, texts)
+            note = notes.get(position)
+            movements.append(
+                StockMovement(
+                    movement_id=_text(record, "movement_id", FLAG_MOVEMENT_ID_TEXT, texts) or "",
+                    stock_type=_STOCK_TYPES[int(record["stock_type"])],
+                    movement_type=_MOVEMENT_TYPES[int(record["movement_type"])],
+                    quantity=int(record["quantity"]),
+                    location=self.locations[int(record["location"])],
+                    occurred_at=(_EPOCH_UTC if aware else _EPOCH)
+                    + timedelta(microseconds=int(record["occurred_at"])),
+                    purchase_id=links.get((position, KIND_LINK_PURCHASE), purchase_id),
+                    production_id=links.get((position, KIND_LINK_PRODUCTION), production_id),
+                    note=b"".join(note).decode() if note is not None else None,
+                )
+            )
+        return movements
+
+    def to_ledger(
+        self, columnar: bool = True, checkpoint_interval: int = 10_000
+    ) -> InventoryLedger:
+        """Load the segment into an ``InventoryLedger`` (columnar by default)."""
+        ledger = InventoryLedger(
+            movements=ColumnarMovementStore() if columnar else [],
+            checkpoint_interval=checkpoint_interval,
+        )
+        for movement in self.movements():
+            ledger.record_movement(movement)
+        return ledger
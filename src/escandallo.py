@@ -1,14 +1,54 @@
 from __future__ import annotations
 
+import copy
+import dataclasses
+import math
+from collections.abc import MutableSequence
 from dataclasses import dataclass, field
-from datetime import datetime
-from typing import Dict, List, Optional
+from datetime import datetime, timedelta
+from typing import (
+    Callable,
+    ClassVar,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+    overload,
+)
+
+
+def fabric_quantity(width, height, depth, seam_allowance, layers, roll_width):
+    """Fabric needed for a line; ``roll_width`` must already be at least 1.
+
+    Shared by ``FabricRule`` and the batch costing, so it takes floats or
+    NumPy arrays that broadcast and gives bit-identical results for both.
+    """
+    surface_area = (width + seam_allowance) * (height + seam_allowance)
+    side_area = (depth + seam_allowance) * (height + seam_allowance)
+    total_area = (surface_area + side_area) * layers
+    return total_area / roll_width
+
+
+def filling_quantity(width, height, depth, density):
+    """Filling needed for a line; floats or broadcasting NumPy arrays."""
+    volume = width * height * depth
+    return (volume * density) / 1000
 
 
 @dataclass
 class MaterialRule:
     material_type: str
 
+    # Keys the rule reads from the measurements and from the material metadata.
+    # None means the rule may read any key, so every change recomputes it.
+    measurement_keys: ClassVar[Optional[FrozenSet[str]]] = None
+    metadata_keys: ClassVar[Optional[FrozenSet[str]]] = None
+
     def calculate_quantity(self, measurements: Dict[str, float], material: "MaterialItem") -> float:
         raise NotImplementedError
 
@@ -17,60 +57,96 @@ class MaterialRule:
 class FabricRule(MaterialRule):
     roll_width: float
 
+    measurement_keys: ClassVar[Optional[FrozenSet[str]]] = frozenset({"width", "height", "depth"})
+    metadata_keys: ClassVar[Optional[FrozenSet[str]]] = frozenset({"seam_allowance", "layers"})
+
     def calculate_quantity(self, measurements: Dict[str, float], material: "MaterialItem") -> float:
-        width = measurements.get("width", 0)
-        height = measurements.get("height", 0)
-        depth = measurements.get("depth", 0)
-        seam_allowance = material.metadata.get("seam_allowance", 0)
-        layers = material.metadata.get("layers", 1)
-        surface_area = (width + seam_allowance) * (height + seam_allowance)
-        side_area = (depth + seam_allowance) * (height + seam_allowance)
-        total_area = (surface_area + side_area) * layers
-        return total_area / max(self.roll_width, 1)
+        return fabric_quantity(
+            measurements.get("width", 0),
+            measurements.get("height", 0),
+            measurements.get("depth", 0),
+            material.metadata.get("seam_allowance", 0),
+            material.metadata.get("layers", 1),
+            max(self.roll_width, 1),
+        )
 
 
 @dataclass
 class FillingRule(MaterialRule):
     density: float
 
+    measurement_keys: ClassVar[Optional[FrozenSet[str]]] = frozenset({"width", "height", "depth"})
+    metadata_keys: ClassVar[Optional[FrozenSet[str]]] = frozenset()
+
     def calculate_quantity(self, measurements: Dict[str, float], material: "MaterialItem") -> float:
-        width = measurements.get("width", 0)
-        height = measurements.get("height", 0)
-        depth = measurements.get("depth", 0)
-        volume = width * height * depth
-        return (volume * self.density) / 1000
+        return filling_quantity(
+            measurements.get("width", 0),
+            measurements.get("height", 0),
+            measurements.get("depth", 0),
+            self.density,
+        )
+
+
+class _CostLine:
+    """Base of the lines priced into an escandallo.
+
+    Setting one of ``cost_fields`` marks the line dirty in every escandallo
+    holding it, so cached totals re-price only the lines edited since the
+    last read.
+    """
+
+    cost_fields: ClassVar[FrozenSet[str]] = frozenset()
+    _owners: Tuple["Escandallo", ...] = ()
+
+    def __setattr__(self, name: str, value: object) -> None:
+        object.__setattr__(self, name, value)
+        if name in self.cost_fields:
+            for owner in self._owners:
+                owner._line_changed(self)
+
+    def __getstate__(self) -> Dict[str, object]:
+        # Copies start unowned; an escandallo registers its lines on its next read.
+        state = dict(self.__dict__)
+        state.pop("_owners", None)
+        return state
 
 
 @dataclass
-class MaterialItem:
+class MaterialItem(_CostLine):
     name: str
     material_type: str
     unit_cost: float
     quantity: float = 0
     metadata: Dict[str, float] = field(default_factory=dict)
 
+    cost_fields: ClassVar[FrozenSet[str]] = frozenset({"unit_cost", "quantity"})
+
     @property
     def total_cost(self) -> float:
         return self.unit_cost * self.quantity
 
 
 @dataclass
-class LaborItem:
+class LaborItem(_CostLine):
     name: str
     hourly_rate: float
     hours: float
 
+    cost_fields: ClassVar[FrozenSet[str]] = frozenset({"hourly_rate", "hours"})
+
     @property
     def total_cost(self) -> float:
         return self.hourly_rate * self.hours
 
 
 @dataclass
-class HardwareItem:
+class HardwareItem(_CostLine):
     name: str
     unit_cost: float
     quantity: float
 
+    cost_fields: ClassVar[FrozenSet[str]] = frozenset({"unit_cost", "quantity"})
+
     @property
     def total_cost(self) -> float:
         return self.unit_cost * self.quantity
@@ -89,6 +165,420 @@ class EscandalloSnapshot:
     data: Dict[str, object]
 
 
+@dataclass
+class HistoryChange:
+    path: Tuple[object, ...]
+    old: object
+    new: object
+
+
+_MISSING = object()
+
+
+def _diff(old: object, new: object) -> Optional[tuple]:
+    """Structural patch turning ``old`` into ``new``, or None if they are equal.
+
+    Dicts are patched per key and lists per position, so an edit to one
+    material only stores the fields that changed.
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        changes = {}
+        for key, value in new.items():
+            child = _diff(old.get(key, _MISSING), value)
+            if child is not None:
+                changes[key] = child
+        removed = tuple(key for key in old if key not in new)
+        return ("d", changes, removed) if changes or removed else None
+    if isinstance(old, list) and isinstance(new, list):
+        changes = {}
+        for index, value in enumerate(new):
+            child = _diff(old[index] if index < len(old) else _MISSING, value)
+            if child is not None:
+                changes[index] = child
+        return ("l", len(new), changes) if changes or len(old) != len(new) else None
+    if old is not _MISSING and type(old) is type(new) and old == new:
+        return None
+    return ("=", new)
+
+
+def _patch(target: object, patch: tuple) -> object:
+    """Apply ``patch`` to ``target`` in place where possible and return the result."""
+    kind = patch[0]
+    if kind == "=":
+        return copy.deepcopy(patch[1])
+    if kind == "d":
+        _, changes, removed = patch
+        for key in removed:
+            del target[key]
+        for key, child in changes.items():
+            target[key] = _patch(target.get(key), child)
+        return target
+    _, length, changes = patch
+    del target[length:]
+    target.extend([None] * (length - len(target)))
+    for index, child in changes.items():
+        target[index] = _patch(target[index], child)
+    return target
+
+
+def _changes(old: object, new: object, path: Tuple[object, ...] = ()) -> List[HistoryChange]:
+    if isinstance(old, dict) and isinstance(new, dict):
+        found: List[HistoryChange] = []
+        for key in list(old) + [key for key in new if key not in old]:
+            found.extend(_changes(old.get(key), new.get(key), path + (key,)))
+        return found
+    if isinstance(old, list) and isinstance(new, list):
+        found = []
+        for index in range(max(len(old), len(new))):
+            found.extend(
+                _changes(
+                    old[index] if index < len(old) else None,
+                    new[index] if index < len(new) else None,
+                    path + (index,),
+                )
+            )
+        return found
+    return [] if old == new else [HistoryChange(path=path, old=old, new=new)]
+
+
+@dataclass
+class _HistoryEntry:
+    version: int
+    timestamp: datetime
+    reason: str
+    keyframe: Optional[Dict[str, object]] = None
+    patch: Optional[tuple] = None
+
+
+class SnapshotHistory(MutableSequence):
+    """Escandallo history stored as periodic keyframes plus structural patches.
+
+    Behaves as a mutable sequence of ``EscandalloSnapshot`` and compares equal
+    to a list of the same snapshots; each item's ``data`` is rebuilt from the
+    nearest earlier keyframe. Every snapshot gets a version number that stays
+    with it through eviction and edits; appended and inserted snapshots get
+    new, increasing numbers. ``max_versions`` and ``max_age`` bound what is
+    retained; the oldest retained version is always turned into a keyframe.
+
+    ``append`` and ``clear`` are cheap; replacing, inserting or deleting other
+    items re-encodes the whole history.
+    """
+
+    def __init__(
+        self,
+        keyframe_interval: int = 50,
+        max_versions: Optional[int] = None,
+        max_age: Optional[timedelta] = None,
+    ):
+        if keyframe_interval < 1:
+            raise ValueError("keyframe_interval must be at least 1")
+        if max_versions is not None and max_versions < 1:
+            raise ValueError("max_versions must be at least 1")
+        self.keyframe_interval = keyframe_interval
+        self.max_versions = max_versions
+        self.max_age = max_age
+        self._entries: List[_HistoryEntry] = []
+        self._head: Optional[Dict[str, object]] = None
+        self._since_keyframe = 0
+        self._next_version = 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @overload
+    def __getitem__(self, index: int) -> EscandalloSnapshot: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[EscandalloSnapshot]: ...
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[EscandalloSnapshot, List[EscandalloSnapshot]]:
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        position = range(len(self._entries))[index]
+        entry = self._entries[position]
+        return EscandalloSnapshot(
+            timestamp=entry.timestamp, reason=entry.reason, data=self._reconstruct_at(position)
+        )
+
+    @overload
+    def __setitem__(self, index: int, value: EscandalloSnapshot) -> None: ...
+
+    @overload
+    def __setitem__(self, index: slice, value: Iterable[EscandalloSnapshot]) -> None: ...
+
+    def __setitem__(
+        self,
+        index: Union[int, slice],
+        value: Union[EscandalloSnapshot, Iterable[EscandalloSnapshot]],
+    ) -> None:
+        items = self._versioned()
+        if isinstance(index, slice):
+            items[index] = [(self._take_version(), snapshot) for snapshot in value]
+        else:
+            position = range(len(items))[index]
+            items[position] = (items[position][0], value)
+        self._rebuild(items)
+
+    def __delitem__(self, index: Union[int, slice]) -> None:
+        items = self._versioned()
+        del items[index]
+        self._rebuild(items)
+
+    def insert(self, index: int, value: EscandalloSnapshot) -> None:
+        items = self._versioned()
+        items.insert(index, (self._take_version(), value))
+        self._rebuild(items)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, SnapshotHistory):
+            return list(self) == list(other)
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"SnapshotHistory(versions={len(self)}, keyframe_interval={self.keyframe_interval})"
+
+    def __iter__(self) -> Iterator[EscandalloSnapshot]:
+        # Walk forward applying one patch per step instead of rebuilding each item.
+        state: Optional[Dict[str, object]] = None
+        for entry in self._entries:
+            if entry.keyframe is not None:
+                state = copy.deepcopy(entry.keyframe)
+            else:
+                state = _patch(state, entry.patch)
+            yield EscandalloSnapshot(
+                timestamp=entry.timestamp, reason=entry.reason, data=copy.deepcopy(state)
+            )
+
+    def append(self, snapshot: EscandalloSnapshot) -> int:
+        """Store ``snapshot`` and return its version number."""
+        version = self._take_version()
+        self._store(version, snapshot)
+        self._evict(snapshot.timestamp)
+        return version
+
+    def clear(self) -> None:
+        """Drop every snapshot; version numbers keep increasing afterwards."""
+        self._entries = []
+        self._head = None
+        self._since_keyframe = 0
+
+    def reverse(self) -> None:
+        self._rebuild(self._versioned()[::-1])
+
+    def copy(self) -> "SnapshotHistory":
+        history = SnapshotHistory(self.keyframe_interval, self.max_versions, self.max_age)
+        # Keyframes and patches are never modified once stored, only the
+        # entries that hold them, so copying the entries is enough.
+        history._entries = [dataclasses.replace(entry) for entry in self._entries]
+        history._head = self._head
+        history._since_keyframe = self._since_keyframe
+        history._next_version = self._next_version
+        return history
+
+    __copy__ = copy
+
+    def versions(self) -> List[int]:
+        return [entry.version for entry in self._entries]
+
+    def reconstruct(self, version: int) -> Dict[str, object]:
+        """Return the escandallo data as it was at ``version``."""
+        return self._reconstruct_at(self._position(version))
+
+    def diff(self, old_version: int, new_version: int) -> List[HistoryChange]:
+        """List the fields that differ between two versions, by path."""
+        return _changes(self.reconstruct(old_version), self.reconstruct(new_version))
+
+    def _position(self, version: int) -> int:
+        if self._entries:
+            position = version - self._entries[0].version
+            if 0 <= position < len(self._entries) and self._entries[position].version == version:
+                return position
+        # Deleting or inserting items leaves gaps or reorders the versions.
+        for position, entry in enumerate(self._entries):
+            if entry.version == version:
+                return position
+        raise ValueError(f"Version {version} is not in the history")
+
+    def _take_version(self) -> int:
+        version = self._next_version
+        self._next_version += 1
+        return version
+
+    def _store(self, version: int, snapshot: EscandalloSnapshot) -> None:
+        data = copy.deepcopy(snapshot.data)
+        entry = _HistoryEntry(version=version, timestamp=snapshot.timestamp, reason=snapshot.reason)
+        if self._head is None or self._since_keyframe + 1 >= self.keyframe_interval:
+            entry.keyframe = data
+            self._since_keyframe = 0
+        else:
+            entry.patch = _diff(self._head, data) or ("d", {}, ())
+            self._since_keyframe += 1
+        self._entries.append(entry)
+        self._head = data
+
+    def _versioned(self) -> List[Tuple[int, EscandalloSnapshot]]:
+        return [(entry.version, snapshot) for entry, snapshot in zip(self._entries, self)]
+
+    def _rebuild(self, items: List[Tuple[int, EscandalloSnapshot]]) -> None:
+        self.clear()
+        for version, snapshot in items:
+            self._store(version, snapshot)
+        if items:
+            self._evict(items[-1][1].timestamp)
+
+    def _reconstruct_at(self, position: int) -> Dict[str, object]:
+        start = position
+        while self._entries[start].keyframe is None:
+            start -= 1
+        state = copy.deepcopy(self._entries[start].keyframe)
+        for entry in self._entries[start + 1 : position + 1]:
+            state = _patch(state, entry.patch)
+        return state
+
+    def _evict(self, now: datetime) -> None:
+        drop = 0
+        if self.max_versions is not None:
+            drop = max(drop, len(self._entries) - self.max_versions)
+        if self.max_age is not None:
+            cutoff = now - self.max_age
+            while drop < len(self._entries) - 1 and self._entries[drop].timestamp < cutoff:
+                drop += 1
+        if drop <= 0:
+            return
+        first = self._entries[drop]
+        if first.keyframe is None:
+            first.keyframe = self._reconstruct_at(drop)
+            first.patch = None
+        del self._entries[:drop]
+
+
+class _ExactSum:
+    """Running float sum kept exact with Shewchuk's partials, as ``math.fsum``.
+
+    Adding a value and later its negation cancels exactly, so a total updated
+    one line at a time never drifts from a fresh ``fsum`` of the lines.
+    """
+
+    def __init__(self) -> None:
+        self._partials: List[float] = []
+
+    def add(self, value: float) -> None:
+        partials = self._partials
+        used = 0
+        for partial in partials:
+            if abs(value) < abs(partial):
+                value, partial = partial, value
+            high = value + partial
+            low = partial - (high - value)
+            if low:
+                partials[used] = low
+                used += 1
+            value = high
+        partials[used:] = [value]
+
+    def value(self) -> float:
+        return math.fsum(self._partials)
+
+
+class _LineTotals:
+    """Cached ``total_cost`` of each line of one escandallo list and their sum.
+
+    Lines marked dirty are re-priced on the next read, so reading the total
+    costs O(lines changed). Non-finite line totals are kept out of the exact
+    sum and force a plain ``fsum`` while any is present.
+    """
+
+    def __init__(self, lines: List[_CostLine]) -> None:
+        self.lines = lines
+        self.positions: Dict[int, List[int]] = {}
+        for index, line in enumerate(lines):
+            self.positions.setdefault(id(line), []).append(index)
+        self.totals = [line.total_cost for line in lines]
+        self.dirty: Set[int] = set()
+        self._sum = _ExactSum()
+        self._non_finite = 0
+        for line_total in self.totals:
+            self._add(line_total, 1)
+
+    def mark(self, line: _CostLine) -> None:
+        self.dirty.update(self.positions.get(id(line), ()))
+
+    def total(self) -> float:
+        for index in self.dirty:
+            line_total = self.lines[index].total_cost
+            self._add(self.totals[index], -1)
+            self._add(line_total, 1)
+            self.totals[index] = line_total
+        self.dirty.clear()
+        if self._non_finite:
+            return math.fsum(self.totals)
+        return self._sum.value()
+
+    def _add(self, line_total: float, sign: int) -> None:
+        if math.isfinite(line_total):
+            self._sum.add(sign * line_total)
+        else:
+            self._non_finite += sign
+
+
+def _report_changes(base: type, methods: Tuple[str, ...]) -> type:
+    """Subclass of ``base`` whose mutating ``methods`` call ``on_change`` afterwards.
+
+    Copies and pickles are plain ``base`` instances, so they carry no owner.
+    """
+
+    def __init__(self, items=(), on_change: Optional[Callable[[], None]] = None) -> None:
+        base.__init__(self, items)
+        self._on_change = on_change
+
+    def __reduce_ex__(self, protocol):
+        return (base, (base(self),))
+
+    def reporting(name: str) -> Callable[..., object]:
+        method = getattr(base, name)
+
+        def wrapper(self, *args, **kwargs):
+            result = method(self, *args, **kwargs)
+            if self._on_change is not None:
+                self._on_change()
+            return result
+
+        wrapper.__name__ = name
+        return wrapper
+
+    namespace = {name: reporting(name) for name in methods}
+    namespace.update(__init__=__init__, __reduce_ex__=__reduce_ex__)
+    return type(f"_Reporting{base.__name__.title()}", (base,), namespace)
+
+
+_LineList = _report_changes(
+    list,
+    (
+        "__setitem__",
+        "__delitem__",
+        "__iadd__",
+        "__imul__",
+        "append",
+        "extend",
+        "insert",
+        "pop",
+        "remove",
+        "clear",
+        "sort",
+        "reverse",
+    ),
+)
+_RuleMap = _report_changes(
+    dict,
+    ("__setitem__", "__delitem__", "__ior__", "clear", "pop", "popitem", "setdefault", "update"),
+)
+_LINE_LISTS = ("materials", "labor", "hardware")
+
+
 @dataclass
 class Escandallo:
     module_id: str
@@ -98,18 +588,62 @@ class Escandallo:
     hardware: List[HardwareItem] = field(default_factory=list)
     times: List[TimeEntry] = field(default_factory=list)
     rules: Dict[str, MaterialRule] = field(default_factory=dict)
-    history: List[EscandalloSnapshot] = field(default_factory=list)
+    history: SnapshotHistory = field(default_factory=SnapshotHistory)
+    _dependents: Dict[str, List[int]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _unscoped: List[int] = field(default_factory=list, init=False, repr=False, compare=False)
+    _totals: Dict[str, _LineTotals] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _stale: bool = field(default=True, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        if not isinstance(self.history, SnapshotHistory):
+            snapshots, self.history = self.history, SnapshotHistory()
+            for snapshot in snapshots:
+                self.history.append(snapshot)
+
+    def __setattr__(self, name: str, value: object) -> None:
+        # Line lists and rules report in-place changes, so structural edits
+        # are seen without comparing every line on each read.
+        if name in _LINE_LISTS:
+            value = _LineList(value, self._structure_changed)
+        elif name == "rules":
+            value = _RuleMap(value, self._structure_changed)
+        object.__setattr__(self, name, value)
+        if name in _LINE_LISTS or name == "rules":
+            self._structure_changed()
+
+    def __getstate__(self) -> Dict[str, object]:
+        # Caches are left out; the copy rebuilds them and registers its lines.
+        return {
+            item.name: getattr(self, item.name) for item in dataclasses.fields(self) if item.init
+        }
+
+    def __setstate__(self, state: Dict[str, object]) -> None:
+        self.__init__(**state)
 
     def recalculate(self, reason: str = "recalculated") -> None:
         for material in self.materials:
             rule = self.rules.get(material.material_type)
             if rule:
                 material.quantity = rule.calculate_quantity(self.measurements, material)
+        self._rebuild_index()
         self._add_snapshot(reason)
 
     def update_measurements(self, updates: Dict[str, float]) -> None:
+        changed = {key for key, value in updates.items() if self.measurements.get(key) != value}
         self.measurements.update(updates)
-        self.recalculate("measurements updated")
+        if self._stale:
+            self.recalculate("measurements updated")
+            return
+        affected: Set[int] = set(self._unscoped)
+        for key in changed:
+            affected.update(self._dependents.get(key, ()))
+        for index in sorted(affected):
+            self._recompute(index)
+        self._add_snapshot("measurements updated")
 
     def update_material(
         self,
@@ -117,28 +651,85 @@ class Escandallo:
         unit_cost: Optional[float] = None,
         metadata: Optional[Dict[str, float]] = None,
     ) -> None:
-        for material in self.materials:
+        for index, material in enumerate(self.materials):
             if material.name == name:
-                if unit_cost is not None:
-                    material.unit_cost = unit_cost
-                if metadata is not None:
-                    material.metadata.update(metadata)
-                self.recalculate(f"material updated: {name}")
-                return
-        raise ValueError(f"Material '{name}' not found")
+                break
+        else:
+            raise ValueError(f"Material '{name}' not found")
+
+        reason = f"material updated: {name}"
+        if unit_cost is not None:
+            material.unit_cost = unit_cost
+        if metadata is not None:
+            material.metadata.update(metadata)
+        if self._stale:
+            self.recalculate(reason)
+            return
+        # The line is recomputed even when no key its rule reads changed, so
+        # measurements or metadata edited in place are picked up for it.
+        self._recompute(index)
+        self._add_snapshot(reason)
 
     def total_material_cost(self) -> float:
-        return sum(material.total_cost for material in self.materials)
+        return self._line_totals("materials").total()
 
     def total_labor_cost(self) -> float:
-        return sum(item.total_cost for item in self.labor)
+        return self._line_totals("labor").total()
 
     def total_hardware_cost(self) -> float:
-        return sum(item.total_cost for item in self.hardware)
+        return self._line_totals("hardware").total()
 
     def total_cost(self) -> float:
         return self.total_material_cost() + self.total_labor_cost() + self.total_hardware_cost()
 
+    def _line_totals(self, name: str) -> _LineTotals:
+        if self._stale:
+            self._rebuild_index()
+        return self._totals[name]
+
+    def _structure_changed(self) -> None:
+        object.__setattr__(self, "_stale", True)
+
+    def _line_changed(self, line: _CostLine) -> None:
+        if not self._stale:
+            for totals in self._totals.values():
+                totals.mark(line)
+
+    def _rebuild_index(self) -> None:
+        """Index which materials each measurement feeds and cache line totals.
+
+        The index is rebuilt after lines are added, removed, replaced or
+        reordered or a rule is replaced. Lines report their own cost edits,
+        so totals re-price only those lines on the next read. Measurements,
+        metadata or a rule mutated in place outside ``update_measurements``
+        and ``update_material`` still need an explicit ``recalculate()``.
+        """
+        self._dependents = {}
+        self._unscoped = []
+        for index, material in enumerate(self.materials):
+            rule = self.rules.get(material.material_type)
+            if rule is None:
+                continue
+            if rule.measurement_keys is None:
+                self._unscoped.append(index)
+                continue
+            for key in rule.measurement_keys:
+                self._dependents.setdefault(key, []).append(index)
+        self._totals = {}
+        for name in _LINE_LISTS:
+            lines = getattr(self, name)
+            for line in lines:
+                if not any(owner is self for owner in line._owners):
+                    line._owners += (self,)
+            self._totals[name] = _LineTotals(lines)
+        self._stale = False
+
+    def _recompute(self, index: int) -> None:
+        material = self.materials[index]
+        rule = self.rules.get(material.material_type)
+        if rule:
+            material.quantity = rule.calculate_quantity(self.measurements, material)
+
     def _add_snapshot(self, reason: str) -> None:
         self.history.append(
             EscandalloSnapshot(
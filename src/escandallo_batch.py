@@ -0,0 +1,183 @@
+"""Batch costing of escandallos across module × fabric combinations with NumPy.
+
+Quantities come from ``fabric_quantity`` and ``filling_quantity``, the same
+functions ``FabricRule`` and ``FillingRule`` call, applied to arrays, so each
+line's quantity is bit-identical to the per-object calculation. Requires NumPy.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+
+from escandallo import (
+    Escandallo,
+    FabricRule,
+    FillingRule,
+    fabric_quantity,
+    filling_quantity,
+)
+
+
+@dataclass
+class FabricCatalogue:
+    names: List[str]
+    roll_width: np.ndarray
+    price_per_meter: np.ndarray
+
+    @classmethod
+    def from_rules(cls, fabrics: Dict[str, tuple[FabricRule, float]]) -> "FabricCatalogue":
+        """Build from ``{name: (rule, price_per_meter)}``."""
+        names = list(fabrics)
+        return cls(
+            names=names,
+            roll_width=np.array([fabrics[name][0].roll_width for name in names], dtype=float),
+            price_per_meter=np.array([fabrics[name][1] for name in names], dtype=float),
+        )
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+@dataclass
+class ModuleBatch:
+    """Measurements and rule parameters of many escandallos as flat arrays.
+
+    Fabric and filling lines are stored one row per material line, with
+    ``*_module`` holding the index of the escandallo each line belongs to.
+    Everything not priced by a fabric or filling rule (other materials,
+    labor and hardware) is folded into ``fixed_cost``.
+    """
+
+    module_ids: List[str]
+    width: np.ndarray
+    height: np.ndarray
+    depth: np.ndarray
+    fixed_cost: np.ndarray
+    fabric_module: np.ndarray
+    seam_allowance: np.ndarray
+    layers: np.ndarray
+    filling_module: np.ndarray
+    filling_density: np.ndarray
+    filling_unit_cost: np.ndarray
+
+    @classmethod
+    def from_escandallos(cls, escandallos: Sequence[Escandallo]) -> "ModuleBatch":
+        dimensions = np.zeros((3, len(escandallos)))
+        fixed_cost = np.zeros(len(escandallos))
+        fabric_lines: List[tuple[int, float, float]] = []
+        filling_lines: List[tuple[int, float, float]] = []
+        for index, escandallo in enumerate(escandallos):
+            for axis, key in enumerate(("width", "height", "depth")):
+                dimensions[axis, index] = escandallo.measurements.get(key, 0)
+            fixed = escandallo.total_labor_cost() + escandallo.total_hardware_cost()
+            for material in escandallo.materials:
+                rule = escandallo.rules.get(material.material_type)
+                if isinstance(rule, FabricRule):
+                    fabric_lines.append(
+                        (
+                            index,
+                            material.metadata.get("seam_allowance", 0),
+                            material.metadata.get("layers", 1),
+                        )
+                    )
+                elif isinstance(rule, FillingRule):
+                    filling_lines.append((index, rule.density, material.unit_cost))
+                else:
+                    fixed += material.total_cost
+            fixed_cost[index] = fixed
+
+        fabric = _columns(fabric_lines)
+        filling = _columns(filling_lines)
+        return cls(
+            module_ids=[escandallo.module_id for escandallo in escandallos],
+            width=dimensions[0],
+            height=dimensions[1],
+            depth=dimensions[2],
+            fixed_cost=fixed_cost,
+            fabric_module=fabric[0].astype(np.intp),
+            seam_allowance=fabric[1],
+            layers=fabric[2],
+            filling_module=filling[0].astype(np.intp),
+            filling_density=filling[1],
+            filling_unit_cost=filling[2],
+        )
+
+    def __len__(self) -> int:
+        return len(self.module_ids)
+
+    def filling_cost(self) -> np.ndarray:
+        """Filling cost per module, independent of the fabric chosen."""
+        lines = self.filling_module
+        quantities = filling_quantity(
+            self.width[lines], self.height[lines], self.depth[lines], self.filling_density
+        )
+        return np.bincount(
+            lines, weights=quantities * self.filling_unit_cost, minlength=len(self)
+        )
+
+    def fabric_meters(self, fabrics: FabricCatalogue) -> np.ndarray:
+        """Meters of each fabric every module needs, as a modules × fabrics matrix."""
+        lines = self.fabric_module
+        per_line = fabric_quantity(
+            self.width[lines, None],
+            self.height[lines, None],
+            self.depth[lines, None],
+            self.seam_allowance[:, None],
+            self.layers[:, None],
+            np.maximum(fabrics.roll_width, 1)[None, :],
+        )
+        meters = np.zeros((len(self), len(fabrics)))
+        if np.all(lines[1:] > lines[:-1]):
+            # At most one fabric line per module: scatter rows without summing.
+            meters[lines] = per_line
+        else:
+            np.add.at(meters, lines, per_line)
+        return meters
+
+    def cost_matrix(self, fabrics: FabricCatalogue) -> "CostMatrix":
+        meters = self.fabric_meters(fabrics)
+        base_cost = self.fixed_cost + self.filling_cost()
+        fabric_cost = meters * fabrics.price_per_meter[None, :]
+        return CostMatrix(
+            module_ids=self.module_ids,
+            fabric_names=fabrics.names,
+            meters=meters,
+            base_cost=base_cost,
+            total=base_cost[:, None] + fabric_cost,
+        )
+
+
+@dataclass
+class CostMatrix:
+    module_ids: List[str]
+    fabric_names: List[str]
+    meters: np.ndarray
+    base_cost: np.ndarray
+    total: np.ndarray
+
+    def cost(self, module_id: str, fabric_name: str) -> float:
+        row = self.module_ids.index(module_id)
+        column = self.fabric_names.index(fabric_name)
+        return float(self.total[row, column])
+
+    def cheapest_fabrics(self) -> Dict[str, str]:
+        columns = self.total.argmin(axis=1)
+        return {
+            module_id: self.fabric_names[column]
+            for module_id, column in zip(self.module_ids, columns)
+        }
+
+
+def _columns(lines: Iterable[tuple]) -> np.ndarray:
+    array = np.array(list(lines), dtype=float)
+    return array.T if array.size else np.zeros((3, 0))
+
+
+def cost_catalogue(
+    escandallos: Sequence[Escandallo], fabrics: FabricCatalogue
+) -> CostMatrix:
+    """Cost every escandallo upholstered in every fabric of ``fabrics``."""
+    return ModuleBatch.from_escandallos(escandallos).cost_matrix(fabrics)
@@ -0,0 +1,268 @@
+"""Declarative material rules: quantity formulas compiled once and cached.
+
+A formula is an arithmetic expression. Bare names read the rule's
+parameters or, failing that, the escandallo measurements; ``metadata.x``
+reads the material's metadata. Missing values fall back to the rule's
+``defaults`` (keyed by ``name`` or ``metadata.name``) and then to 0, like
+``measurements.get(key, 0)`` in the hand-written rules. Only numbers,
+``+ - * / // % **``, unary signs and ``min``/``max``/``abs`` are accepted.
+Formulas may come from API requests, so their size is capped and ``**``
+needs a literal exponent of at most ``MAX_EXPONENT`` in absolute value and
+cannot be applied to another power; an unbounded power can hang the process.
+
+Formulas are parsed and validated once per text (``compile_formula``) and
+each rule then gets a generated Python function with its parameters and
+defaults baked in, so evaluation neither walks the expression nor merges
+dictionaries. Both caches are keyed by value, so identical rules loaded
+from the database share compiled code. Measurements and metadata may be
+NumPy arrays for bulk evaluation.
+"""
+
+from __future__ import annotations
+
+import ast
+from dataclasses import dataclass, field
+from functools import lru_cache, reduce
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+from escandallo import FabricRule, FillingRule, MaterialItem, MaterialRule
+
+FABRIC_FORMULA = (
+    "((width + metadata.seam_allowance) * (height + metadata.seam_allowance)"
+    " + (depth + metadata.seam_allowance) * (height + metadata.seam_allowance))"
+    " * metadata.layers / max(roll_width, 1)"
+)
+FILLING_FORMULA = "width * height * depth * density / 1000"
+
+_BINARY_OPERATORS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow)
+_UNARY_OPERATORS = (ast.UAdd, ast.USub)
+MAX_FORMULA_LENGTH = 1000
+MAX_FORMULA_NODES = 200
+MAX_EXPONENT = 4
+
+
+# Scalars take the builtin path; NumPy arrays make the comparison ambiguous
+# and fall through to the element-wise ufunc.
+def _maximum(*values):
+    try:
+        return max(values)
+    except ValueError:
+        import numpy as np
+
+        return reduce(np.maximum, values)
+
+
+def _minimum(*values):
+    try:
+        return min(values)
+    except ValueError:
+        import numpy as np
+
+        return reduce(np.minimum, values)
+
+
+_FUNCTIONS = {"max": "_maximum", "min": "_minimum", "abs": "abs"}
+_ENVIRONMENT = {"__builtins__": {}, "_maximum": _maximum, "_minimum": _minimum, "abs": abs}
+
+
+@dataclass(frozen=True)
+class CompiledFormula:
+    formula: str
+    names: Tuple[str, ...]
+    metadata_names: Tuple[str, ...]
+    expression: str = field(repr=False)
+    function: Callable[..., float] = field(repr=False, compare=False)
+
+    def __reduce__(self):
+        # The generated function cannot be pickled; recompile from the source.
+        return (compile_formula, (self.formula,))
+
+
+class _Compiler(ast.NodeTransformer):
+    def __init__(self) -> None:
+        self.names: List[str] = []
+        self.metadata_names: List[str] = []
+
+    def generic_visit(self, node: ast.AST) -> ast.AST:
+        allowed = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Load) + _BINARY_OPERATORS
+        if not isinstance(node, allowed + _UNARY_OPERATORS):
+            raise ValueError(f"Unsupported syntax in formula: {type(node).__name__}")
+        return super().generic_visit(node)
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.AST:
+        if isinstance(node.op, ast.Pow):
+            exponent = node.right
+            if isinstance(exponent, ast.UnaryOp) and isinstance(exponent.op, _UNARY_OPERATORS):
+                exponent = exponent.operand
+            if not (
+                isinstance(exponent, ast.Constant)
+                and isinstance(exponent.value, (int, float))
+                and not isinstance(exponent.value, bool)
+                and abs(exponent.value) <= MAX_EXPONENT
+            ):
+                raise ValueError(
+                    f"Exponents in formulas must be numbers between {-MAX_EXPONENT} "
+                    f"and {MAX_EXPONENT}"
+                )
+            if any(
+                isinstance(child, ast.BinOp) and isinstance(child.op, ast.Pow)
+                for child in ast.walk(node.left)
+            ):
+                raise ValueError("Powers cannot be raised to a power in formulas")
+        return self.generic_visit(node)
+
+    def visit_Constant(self, node: ast.Constant) -> ast.AST:
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise ValueError(f"Unsupported constant in formula: {node.value!r}")
+        return node
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        if node.id == "metadata" or node.id.startswith("_"):
+            raise ValueError(f"Invalid name in formula: {node.id}")
+        return ast.Name(id=self._slot(self.names, node.id, "v"), ctx=ast.Load())
+
+    def visit_Attribute(self, node: ast.Attribute) -> ast.AST:
+        if not (isinstance(node.value, ast.Name) and node.value.id == "metadata"):
+            raise ValueError("Only metadata.<key> attributes are allowed in formulas")
+        return ast.Name(id=self._slot(self.metadata_names, node.attr, "m"), ctx=ast.Load())
+
+    def visit_Call(self, node: ast.Call) -> ast.AST:
+        if not isinstance(node.func, ast.Name) or node.func.id not in _FUNCTIONS or node.keywords:
+            raise ValueError("Only min(), max() and abs() can be called in formulas")
+        arguments = [self.visit(argument) for argument in node.args]
+        return ast.Call(
+            func=ast.Name(id=_FUNCTIONS[node.func.id], ctx=ast.Load()), args=arguments, keywords=[]
+        )
+
+    @staticmethod
+    def _slot(slots: List[str], name: str, prefix: str) -> str:
+        if name not in slots:
+            slots.append(name)
+        return f"{prefix}{slots.index(name)}"
+
+
+@lru_cache(maxsize=1024)
+def compile_formula(formula: str) -> CompiledFormula:
+    """Parse, validate and compile ``formula``; results are cached by text."""
+    if len(formula) > MAX_FORMULA_LENGTH:
+        raise ValueError(f"Formulas must be at most {MAX_FORMULA_LENGTH} characters")
+    try:
+        tree = ast.parse(formula.strip(), mode="eval")
+    except SyntaxError as exc:
+        raise ValueError(f"Invalid formula {formula!r}: {exc.msg}") from exc
+    if sum(1 for _ in ast.walk(tree)) > MAX_FORMULA_NODES:
+        raise ValueError(f"Formulas must have at most {MAX_FORMULA_NODES} syntax nodes")
+    compiler = _Compiler()
+    body = compiler.visit(tree).body
+    arguments = [f"v{index}" for index in range(len(compiler.names))]
+    arguments += [f"m{index}" for index in range(len(compiler.metadata_names))]
+    expression = ast.unparse(body)
+    return CompiledFormula(
+        formula=formula,
+        names=tuple(compiler.names),
+        metadata_names=tuple(compiler.metadata_names),
+        expression=expression,
+        function=eval(f"lambda {', '.join(arguments)}: {expression}", dict(_ENVIRONMENT)),
+    )
+
+
+@lru_cache(maxsize=1024)
+def _bind(
+    formula: str,
+    parameters: Tuple[Tuple[str, float], ...],
+    defaults: Tuple[Tuple[str, float], ...],
+) -> Callable[[Mapping[str, object], Mapping[str, object]], float]:
+    """Compile ``formula`` with its parameters and defaults fixed.
+
+    The generated function reads each measurement and metadata key once,
+    straight from the two mappings, and evaluates the expression inline.
+    """
+    compiled = compile_formula(formula)
+    fixed, fallback = dict(parameters), dict(defaults)
+    environment = dict(_ENVIRONMENT)
+    lines = ["def rule(measurements, metadata):"]
+    for index, name in enumerate(compiled.names):
+        environment[f"_v{index}"] = fixed.get(name, fallback.get(name, 0))
+        source = f"_v{index}" if name in fixed else f"measurements.get({name!r}, _v{index})"
+        lines.append(f"    v{index} = {source}")
+    for index, name in enumerate(compiled.metadata_names):
+        environment[f"_m{index}"] = fallback.get(f"metadata.{name}", 0)
+        lines.append(f"    m{index} = metadata.get({name!r}, _m{index})")
+    lines.append(f"    return {compiled.expression}")
+    exec("\n".join(lines), environment)
+    return environment["rule"]
+
+
+@dataclass
+class FormulaRule(MaterialRule):
+    formula: str
+    parameters: Dict[str, float] = field(default_factory=dict)
+    defaults: Dict[str, float] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self._compiled = compile_formula(self.formula)
+        self._evaluate = _bind(
+            self.formula,
+            tuple(sorted(self.parameters.items())),
+            tuple(sorted(self.defaults.items())),
+        )
+        self.measurement_keys = frozenset(
+            name for name in self._compiled.names if name not in self.parameters
+        )
+        self.metadata_keys = frozenset(self._compiled.metadata_names)
+
+    def __reduce__(self):
+        # Pickles and copies recompile in __post_init__ instead of carrying
+        # the generated functions, which cannot be pickled.
+        return (
+            type(self),
+            (self.material_type, self.formula, dict(self.parameters), dict(self.defaults)),
+        )
+
+    @property
+    def compiled(self) -> CompiledFormula:
+        return self._compiled
+
+    def calculate_quantity(self, measurements: Dict[str, float], material: MaterialItem) -> float:
+        return self._evaluate(measurements, material.metadata)
+
+    def evaluate(self, measurements: Mapping[str, object], metadata: Mapping[str, object]):
+        """Evaluate the formula; values may be scalars or NumPy arrays."""
+        return self._evaluate(measurements, metadata)
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, object]) -> "FormulaRule":
+        return cls(
+            material_type=str(data["material_type"]),
+            formula=str(data["formula"]),
+            parameters=dict(data.get("parameters") or {}),
+            defaults=dict(data.get("defaults") or {}),
+        )
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "material_type": self.material_type,
+            "formula": self.formula,
+            "parameters": dict(self.parameters),
+            "defaults": dict(self.defaults),
+        }
+
+
+def as_formula_rule(rule: MaterialRule) -> Optional[FormulaRule]:
+    """Express a built-in rule as an equivalent ``FormulaRule``, if possible."""
+    if isinstance(rule, FormulaRule):
+        return rule
+    if isinstance(rule, FabricRule):
+        return FormulaRule(
+            material_type=rule.material_type,
+            formula=FABRIC_FORMULA,
+            parameters={"roll_width": rule.roll_width},
+            defaults={"metadata.layers": 1},
+        )
+    if isinstance(rule, FillingRule):
+        return FormulaRule(
+            material_type=rule.material_type,
+            formula=FILLING_FORMULA,
+            parameters={"density": rule.density},
+        )
+    return None
@@ -0,0 +1,145 @@
+"""What-if cost simulation for escandallos across a process pool.
+
+Scenarios scale material prices and override measurements; every
+escandallo is re-costed under each scenario and the cost deltas are
+aggregated per model. The escandallos are handed to the workers once: with
+the ``fork`` start method they are inherited from the parent process, and
+otherwise each worker receives them a single time through its initializer.
+Tasks only carry a scenario index and a range of escandallos.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from escandallo import Escandallo
+
+# Read-only state of the worker processes, set before the pool starts (fork)
+# or by the pool initializer (spawn).
+_ESCANDALLOS: Sequence[Escandallo] = ()
+_MODELS: Sequence[str] = ()
+_SCENARIOS: Sequence["Scenario"] = ()
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    price_factors: Mapping[str, float] = field(default_factory=dict)
+    measurement_overrides: Mapping[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class ScenarioResult:
+    scenario: str
+    baseline: Dict[str, float]
+    simulated: Dict[str, float]
+
+    @property
+    def deltas(self) -> Dict[str, float]:
+        return {model: self.simulated[model] - self.baseline[model] for model in self.baseline}
+
+    @property
+    def total_delta(self) -> float:
+        return sum(self.simulated.values()) - sum(self.baseline.values())
+
+
+BASELINE = Scenario("baseline")
+
+
+def scenario_cost(escandallo: Escandallo, scenario: Scenario) -> float:
+    """Total cost of ``escandallo`` under ``scenario``, without modifying it.
+
+    ``price_factors`` is keyed by material name; materials with a rule get
+    their quantity recomputed from the overridden measurements.
+    """
+    measurements = escandallo.measurements
+    if scenario.measurement_overrides:
+        measurements = {**measurements, **scenario.measurement_overrides}
+    total = escandallo.total_labor_cost() + escandallo.total_hardware_cost()
+    for material in escandallo.materials:
+        quantity = material.quantity
+        if scenario.measurement_overrides:
+            rule = escandallo.rules.get(material.material_type)
+            if rule:
+                quantity = rule.calculate_quantity(measurements, material)
+        total += material.unit_cost * scenario.price_factors.get(material.name, 1.0) * quantity
+    return total
+
+
+def _cost_chunk(task: Tuple[int, int, int]) -> Tuple[int, Dict[str, float]]:
+    scenario_index, start, stop = task
+    scenario = _SCENARIOS[scenario_index] if scenario_index >= 0 else BASELINE
+    totals: Dict[str, float] = {}
+    for index in range(start, stop):
+        model = _MODELS[index]
+        totals[model] = totals.get(model, 0.0) + scenario_cost(_ESCANDALLOS[index], scenario)
+    return scenario_index, totals
+
+
+def _init_worker(
+    escandallos: Sequence[Escandallo], models: Sequence[str], scenarios: Sequence[Scenario]
+) -> None:
+    global _ESCANDALLOS, _MODELS, _SCENARIOS
+    _ESCANDALLOS, _MODELS, _SCENARIOS = escandallos, models, scenarios
+
+
+class WhatIfSimulator:
+    """Run price and measurement scenarios over a fixed set of escandallos.
+
+    ``model_of`` maps each escandallo to the model its costs are aggregated
+    under (the module id by default). ``processes=1`` runs in-process.
+    """
+
+    def __init__(
+        self,
+        escandallos: Sequence[Escandallo],
+        model_of: Optional[Callable[[Escandallo], str]] = None,
+        processes: Optional[int] = None,
+        chunk_size: int = 1000,
+    ):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        self.escandallos = list(escandallos)
+        model_of = model_of or (lambda escandallo: escandallo.module_id)
+        self.models = [model_of(escandallo) for escandallo in self.escandallos]
+        self.processes = processes or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+
+    def run(self, scenarios: Sequence[Scenario]) -> List[ScenarioResult]:
+        tasks = [
+            (scenario_index, start, min(start + self.chunk_size, len(self.escandallos)))
+            for scenario_index in range(-1, len(scenarios))
+            for start in range(0, len(self.escandallos), self.chunk_size)
+        ]
+        totals: Dict[int, Dict[str, float]] = {index: {} for index in range(-1, len(scenarios))}
+        for scenario_index, chunk in self._map(tasks, scenarios):
+            target = totals[scenario_index]
+            for model, cost in chunk.items():
+                target[model] = target.get(model, 0.0) + cost
+
+        baseline = totals[-1]
+        return [
+            ScenarioResult(scenario=scenario.name, baseline=baseline, simulated=totals[index])
+            for index, scenario in enumerate(scenarios)
+        ]
+
+    def _map(self, tasks, scenarios: Sequence[Scenario]):
+        state = (self.escandallos, self.models, list(scenarios))
+        try:
+            if self.processes == 1:
+                _init_worker(*state)
+                return [_cost_chunk(task) for task in tasks]
+            if "fork" in multiprocessing.get_all_start_methods():
+                _init_worker(*state)
+                pool = multiprocessing.get_context("fork").Pool(self.processes)
+            else:
+                pool = multiprocessing.get_context("spawn").Pool(
+                    self.processes, initializer=_init_worker, initargs=state
+                )
+            with pool:
+                return pool.map(_cost_chunk, tasks, chunksize=1)
+        finally:
+            _init_worker((), (), ())
@@ -1,4 +1,31 @@
-from .mrp import RequerimientoMRP, planificar_mrp
+from .corte import (
+    Colocacion,
+    PlanCorte,
+    Pieza,
+    piezas_modulo,
+    planificar_corte,
+    planificar_corte_ordenes,
+)
+from .estadisticas import (
+    BocetoCuantiles,
+    EstadisticaWelford,
+    EstadisticasEstaciones,
+    ResumenDuracion,
+)
+from .mrp import (
+    ExplosionBOM,
+    PlanificadorMRP,
+    RequerimientoMRP,
+    calcular_codigos_nivel_bajo,
+    planificar_mrp,
+)
+from .planificacion import (
+    PlanificadorCapacidad,
+    Programa,
+    TareaProgramada,
+    duraciones_historicas,
+    programar_produccion,
+)
 from .produccion import (
     EstadoEstacion,
     Estacion,
@@ -10,13 +37,31 @@ from .produccion import (
 )
 
 __all__ = [
+    "BocetoCuantiles",
+    "Colocacion",
     "EstadoEstacion",
     "Estacion",
+    "EstadisticaWelford",
+    "EstadisticasEstaciones",
+    "ExplosionBOM",
     "Modulo",
     "OrdenProduccion",
     "Pedido",
+    "Pieza",
+    "PlanCorte",
+    "PlanificadorCapacidad",
+    "PlanificadorMRP",
+    "Programa",
     "RegistroEstacion",
     "RequerimientoMRP",
+    "ResumenDuracion",
+    "TareaProgramada",
+    "calcular_codigos_nivel_bajo",
     "crear_orden_produccion",
+    "duraciones_historicas",
+    "piezas_modulo",
+    "planificar_corte",
+    "planificar_corte_ordenes",
     "planificar_mrp",
+    "programar_produccion",
 ]
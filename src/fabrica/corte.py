@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+from .produccion import Estacion, EstadoEstacion, OrdenProduccion
+
+# Todas las medidas en centímetros; el largo consumido se informa en metros.
+
+
+@dataclass(frozen=True)
+class Pieza:
+    id_pieza: str
+    ancho: float
+    largo: float
+    tela: str = ""
+    rotable: bool = True
+    id_orden: Optional[str] = None
+
+    @property
+    def area(self) -> float:
+        return self.ancho * self.largo
+
+
+@dataclass(frozen=True)
+class Colocacion:
+    """Posición de una pieza en el rollo: ``x`` a lo ancho e ``y`` a lo largo."""
+
+    pieza: Pieza
+    x: float
+    y: float
+    ancho: float
+    largo: float
+
+    @property
+    def rotada(self) -> bool:
+        return self.ancho != self.pieza.ancho
+
+
+@dataclass
+class PlanCorte:
+    ancho_rollo: float
+    metodo: str
+    colocaciones: List[Colocacion] = field(default_factory=list)
+
+    @property
+    def largo(self) -> float:
+        return max((c.y + c.largo for c in self.colocaciones), default=0.0)
+
+    @property
+    def metros(self) -> float:
+        return self.largo / 100
+
+    @property
+    def aprovechamiento(self) -> float:
+        """Fracción del tejido consumido que acaba en piezas."""
+        superficie = self.ancho_rollo * self.largo
+        if not superficie:
+            return 0.0
+        return sum(c.pieza.area for c in self.colocaciones) / superficie
+
+    def metros_por_orden(self) -> Dict[Optional[str], float]:
+        """Reparte los metros consumidos entre órdenes en proporción al área cortada."""
+        areas: Dict[Optional[str], float] = {}
+        for colocacion in self.colocaciones:
+            orden = colocacion.pieza.id_orden
+            areas[orden] = areas.get(orden, 0.0) + colocacion.pieza.area
+        total = sum(areas.values())
+        if total <= 0:
+            return {orden: 0.0 for orden in areas}
+        return {orden: self.metros * area / total for orden, area in areas.items()}
+
+
+def piezas_modulo(
+    prefijo: str,
+    medidas: Mapping[str, float],
+    margen_costura: float = 0.0,
+    capas: int = 1,
+    tela: str = "",
+    id_orden: Optional[str] = None,
+) -> List[Pieza]:
+    """Paneles de un módulo con las mismas superficies que ``FabricRule``.
+
+    Por cada capa, un panel frontal ``(ancho + margen) × (alto + margen)`` y uno
+    lateral ``(fondo + margen) × (alto + margen)``.
+    """
+    ancho = medidas.get("width", 0) + margen_costura
+    alto = medidas.get("height", 0) + margen_costura
+    fondo = medidas.get("depth", 0) + margen_costura
+    piezas = []
+    for capa in range(capas):
+        for nombre, dimension in (("frontal", ancho), ("lateral", fondo)):
+            piezas.append(
+                Pieza(
+                    id_pieza=f"{prefijo}-{nombre}-{capa + 1}",
+                    ancho=dimension,
+                    largo=alto,
+                    tela=tela,
+                    id_orden=id_orden,
+                )
+            )
+    return piezas
+
+
+def _orientaciones(pieza: Pieza, ancho_rollo: float) -> List[Tuple[float, float]]:
+    opciones = [(pieza.ancho, pieza.largo)]
+    if pieza.rotable and pieza.ancho != pieza.largo:
+        opciones.append((pieza.largo, pieza.ancho))
+    validas = [(ancho, largo) for ancho, largo in opciones if ancho <= ancho_rollo]
+    if not validas:
+        raise ValueError(
+            f"La pieza {pieza.id_pieza} ({pieza.ancho}×{pieza.largo}) no cabe en un rollo "
+            f"de {ancho_rollo}."
+        )
+    return validas
+
+
+def _estantes(piezas: Sequence[Pieza], ancho_rollo: float, separacion: float) -> PlanCorte:
+    """First-fit decreasing height: filas a lo ancho del rollo apiladas a lo largo.
+
+    Cada pieza se orienta con su lado menor a lo largo del rollo, si cabe, para
+    que los estantes sean lo más bajos posible.
+    """
+    orientadas = []
+    for pieza in piezas:
+        ancho, largo = min(_orientaciones(pieza, ancho_rollo), key=lambda o: (o[1], -o[0]))
+        orientadas.append((pieza, ancho, largo))
+    orientadas.sort(key=lambda o: (o[2], o[1]), reverse=True)
+
+    plan = PlanCorte(ancho_rollo=ancho_rollo, metodo="estantes")
+    estantes: List[List[float]] = []  # [y, alto, x libre]
+    for pieza, ancho, largo in orientadas:
+        for estante in estantes:
+            if largo <= estante[1] and estante[2] + ancho <= ancho_rollo:
+                break
+        else:
+            y = estantes[-1][0] + estantes[-1][1] + separacion if estantes else 0.0
+            estante = [y, largo, 0.0]
+            estantes.append(estante)
+        plan.colocaciones.append(Colocacion(pieza, estante[2], estante[0], ancho, largo))
+        estante[2] += ancho + separacion
+    return plan
+
+
+def _guillotina(piezas: Sequence[Pieza], ancho_rollo: float, separacion: float) -> PlanCorte:
+    """Guillotina sobre rectángulos libres con el rollo como tira de largo infinito.
+
+    Las piezas, de mayor a menor área, van al hueco y orientación que dejan el
+    menor largo ocupado (desempate por mejor ajuste de área). Cada colocación
+    parte el hueco con un corte recto y conserva el resto más grande entero.
+    """
+    plan = PlanCorte(ancho_rollo=ancho_rollo, metodo="guillotina")
+    libres: List[Tuple[float, float, float, float]] = [(0.0, 0.0, ancho_rollo, math.inf)]
+    for pieza in sorted(piezas, key=lambda p: (p.area, max(p.ancho, p.largo)), reverse=True):
+        opciones = _orientaciones(pieza, ancho_rollo)
+        mejor = None
+        for indice, (x, y, ancho_libre, largo_libre) in enumerate(libres):
+            for ancho, largo in opciones:
+                if ancho > ancho_libre or largo > largo_libre:
+                    continue
+                clave = (y + largo, ancho_libre * largo_libre - ancho * largo, x)
+                if mejor is None or clave < mejor[0]:
+                    mejor = (clave, indice, ancho, largo)
+        _, indice, ancho, largo = mejor  # el hueco infinito siempre admite la pieza
+        x, y, ancho_libre, largo_libre = libres.pop(indice)
+        plan.colocaciones.append(Colocacion(pieza, x, y, ancho, largo))
+
+        ocupado_ancho = min(ancho + separacion, ancho_libre)
+        ocupado_largo = min(largo + separacion, largo_libre)
+        resto_ancho = ancho_libre - ocupado_ancho
+        resto_largo = largo_libre - ocupado_largo
+        # Corte horizontal: la franja superior conserva todo el ancho del hueco.
+        # Se elige el corte cuyo resto mayor queda más grande.
+        horizontal = math.isinf(largo_libre) or (
+            ancho_libre * resto_largo >= resto_ancho * largo_libre
+        )
+        if horizontal:
+            derecha = (x + ocupado_ancho, y, resto_ancho, ocupado_largo)
+            arriba = (x, y + ocupado_largo, ancho_libre, resto_largo)
+        else:
+            derecha = (x + ocupado_ancho, y, resto_ancho, largo_libre)
+            arriba = (x, y + ocupado_largo, ocupado_ancho, resto_largo)
+        libres.extend(hueco for hueco in (derecha, arriba) if hueco[2] > 0 and hueco[3] > 0)
+    return plan
+
+
+METODOS_CORTE: Dict[str, Callable[[Sequence[Pieza], float, float], PlanCorte]] = {
+    "estantes": _estantes,
+    "guillotina": _guillotina,
+}
+
+
+def planificar_corte(
+    piezas: Iterable[Pieza],
+    ancho_rollo: float,
+    metodo: str = "auto",
+    separacion: float = 0.0,
+) -> PlanCorte:
+    """Coloca ``piezas`` en un rollo de ``ancho_rollo`` minimizando el largo consumido.
+
+    ``metodo`` es ``"estantes"``, ``"guillotina"`` o ``"auto"`` (ejecuta ambos y
+    devuelve el plan más corto). ``separacion`` es el hueco que se deja entre
+    piezas para la cuchilla. Lanza ``ValueError`` si alguna pieza no cabe en el
+    ancho del rollo en ninguna orientación permitida.
+    """
+    if ancho_rollo <= 0:
+        raise ValueError("El ancho del rollo debe ser positivo.")
+    if metodo != "auto" and metodo not in METODOS_CORTE:
+        raise ValueError(f"Método de corte desconocido: {metodo}")
+    piezas = list(piezas)
+    metodos = METODOS_CORTE.values() if metodo == "auto" else [METODOS_CORTE[metodo]]
+    planes = [calcular(piezas, ancho_rollo, separacion) for calcular in metodos]
+    return min(planes, key=lambda plan: plan.largo)
+
+
+def planificar_corte_ordenes(
+    ordenes: Iterable[OrdenProduccion],
+    piezas_por_sku: Mapping[str, Sequence[Pieza]],
+    ancho_rollo: Union[float, Mapping[str, float]],
+    metodo: str = "auto",
+    separacion: float = 0.0,
+) -> Dict[str, PlanCorte]:
+    """Plan de corte del lote de órdenes con ``Estacion.CORTE`` aún pendiente.
+
+    ``piezas_por_sku`` da las piezas de una unidad de cada módulo; se repiten
+    por la cantidad pedida y se etiquetan con la orden. Las piezas se agrupan
+    por tela y cada tela se planifica en su rollo (``ancho_rollo`` puede ser un
+    ancho único o un ancho por tela). Devuelve un plan por tela.
+    """
+    por_tela: Dict[str, List[Pieza]] = {}
+    for orden in ordenes:
+        registro = orden.estaciones.get(Estacion.CORTE)
+        if registro is None or registro.estado != EstadoEstacion.PENDIENTE:
+            continue
+        for modulo in orden.modulos:
+            if modulo.sku not in piezas_por_sku:
+                raise ValueError(f"No hay piezas de corte definidas para el SKU {modulo.sku}.")
+            for unidad in range(modulo.cantidad):
+                for pieza in piezas_por_sku[modulo.sku]:
+                    por_tela.setdefault(pieza.tela, []).append(
+                        Pieza(
+                            id_pieza=f"{orden.id_orden}/{modulo.sku}#{unidad + 1}/{pieza.id_pieza}",
+                            ancho=pieza.ancho,
+                            largo=pieza.largo,
+                            tela=pieza.tela,
+                            rotable=pieza.rotable,
+                            id_orden=orden.id_orden,
+                        )
+                    )
+
+    anchos: Dict[str, float] = {}
+    for tela in por_tela:
+        if isinstance(ancho_rollo, (int, float)):
+            anchos[tela] = ancho_rollo
+        elif tela in ancho_rollo:
+            anchos[tela] = ancho_rollo[tela]
+        else:
+            raise ValueError(f"No hay ancho de rollo definido para la tela {tela!r}.")
+    return {
+        tela: planificar_corte(piezas, anchos[tela], metodo=metodo, separacion=separacion)
+        for tela, piezas in por_tela.items()
+    }
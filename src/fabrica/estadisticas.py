@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional, Tuple
+
+from .produccion import Estacion, OrdenProduccion, RegistroEstacion
+
+
+@dataclass
+class EstadisticaWelford:
+    """Media y varianza incrementales (algoritmo de Welford), sin guardar muestras."""
+
+    n: int = 0
+    media: float = 0.0
+    m2: float = 0.0
+    minimo: float = math.inf
+    maximo: float = -math.inf
+
+    def agregar(self, valor: float) -> None:
+        self.n += 1
+        delta = valor - self.media
+        self.media += delta / self.n
+        self.m2 += delta * (valor - self.media)
+        if valor < self.minimo:
+            self.minimo = valor
+        if valor > self.maximo:
+            self.maximo = valor
+
+    def combinar(self, otra: "EstadisticaWelford") -> None:
+        """Incorpora otra estadística (fórmula de Chan para varianzas paralelas)."""
+        if not otra.n:
+            return
+        total = self.n + otra.n
+        delta = otra.media - self.media
+        self.m2 += otra.m2 + delta * delta * self.n * otra.n / total
+        self.media += delta * otra.n / total
+        self.n = total
+        self.minimo = min(self.minimo, otra.minimo)
+        self.maximo = max(self.maximo, otra.maximo)
+
+    @property
+    def varianza(self) -> float:
+        """Varianza muestral; 0 con menos de dos observaciones."""
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def desviacion(self) -> float:
+        return math.sqrt(self.varianza)
+
+
+@dataclass
+class BocetoCuantiles:
+    """Cuantiles aproximados con error relativo acotado, al estilo de DDSketch.
+
+    Cada valor positivo cae en el cubo ``ceil(log(valor) / log(gamma))`` con
+    ``gamma = (1 + precision) / (1 - precision)``, de modo que cualquier
+    cuantil se devuelve con un error relativo máximo de ``precision``. Insertar
+    es O(1) y la memoria depende del rango de valores, no de cuántos haya; si
+    se superan ``max_cubos`` se funden los cubos más bajos, sacrificando la
+    precisión de la cola inferior (la que menos importa para planificar).
+    """
+
+    precision: float = 0.01
+    max_cubos: int = 2048
+    cubos: Dict[int, int] = field(default_factory=dict)
+    ceros: int = 0
+    n: int = 0
+
+    def __post_init__(self) -> None:
+        if not 0 < self.precision < 1:
+            raise ValueError("La precisión debe estar entre 0 y 1.")
+        self._gamma = (1 + self.precision) / (1 - self.precision)
+        self._log_gamma = math.log(self._gamma)
+
+    def agregar(self, valor: float) -> None:
+        if valor < 0:
+            raise ValueError("El boceto de cuantiles solo admite valores no negativos.")
+        self.n += 1
+        if valor == 0:
+            self.ceros += 1
+            return
+        indice = math.ceil(math.log(valor) / self._log_gamma)
+        self.cubos[indice] = self.cubos.get(indice, 0) + 1
+        if len(self.cubos) > self.max_cubos:
+            self._fundir()
+
+    def combinar(self, otro: "BocetoCuantiles") -> None:
+        if otro.precision != self.precision:
+            raise ValueError("Solo se pueden combinar bocetos con la misma precisión.")
+        for indice, cantidad in otro.cubos.items():
+            self.cubos[indice] = self.cubos.get(indice, 0) + cantidad
+        self.ceros += otro.ceros
+        self.n += otro.n
+        if len(self.cubos) > self.max_cubos:
+            self._fundir()
+
+    def cuantil(self, q: float) -> Optional[float]:
+        if not 0 <= q <= 1:
+            raise ValueError("El cuantil debe estar entre 0 y 1.")
+        if not self.n:
+            return None
+        rango = q * (self.n - 1)
+        acumulado = self.ceros
+        if rango < acumulado:
+            return 0.0
+        for indice in sorted(self.cubos):
+            acumulado += self.cubos[indice]
+            if rango < acumulado:
+                return 2 * self._gamma ** indice / (self._gamma + 1)
+        return 2 * self._gamma ** max(self.cubos) / (self._gamma + 1)
+
+    def _fundir(self) -> None:
+        indices = sorted(self.cubos)
+        sobrantes = len(indices) - self.max_cubos
+        destino = indices[sobrantes]
+        for indice in indices[:sobrantes]:
+            self.cubos[destino] += self.cubos.pop(indice)
+
+
+@dataclass(frozen=True)
+class ResumenDuracion:
+    n: int
+    media: float
+    desviacion: float
+    minimo: float
+    maximo: float
+    p50: Optional[float]
+    p90: Optional[float]
+    p95: Optional[float]
+
+
+def _validar_minutos(minutos: float) -> None:
+    # Se comprueba antes de tocar ningún acumulador: el boceto rechaza los
+    # negativos y, si Welford ya se hubiera actualizado, quedarían desparejos.
+    if not minutos >= 0:
+        raise ValueError("Los minutos por unidad deben ser un número no negativo.")
+
+
+@dataclass
+class _Acumulador:
+    welford: EstadisticaWelford
+    boceto: BocetoCuantiles
+
+    def agregar(self, valor: float) -> None:
+        _validar_minutos(valor)
+        self.welford.agregar(valor)
+        self.boceto.agregar(valor)
+
+
+class EstadisticasEstaciones:
+    """Estadísticas en streaming de minutos por unidad, por estación y por SKU.
+
+    Cada observación actualiza en O(1) el acumulador ``(estacion, sku)`` y el de
+    la estación completa (``sku=None``); la memoria depende del número de
+    combinaciones y no del número de registros. Las consultas devuelven media,
+    desviación y percentiles al instante, y ``duraciones`` da los minutos por
+    unidad en el formato que espera ``programar_produccion``.
+    """
+
+    def __init__(self, precision: float = 0.01, max_cubos: int = 2048) -> None:
+        self.precision = precision
+        self.max_cubos = max_cubos
+        self._acumuladores: Dict[Tuple[Estacion, Optional[str]], _Acumulador] = {}
+
+    def _acumulador(self, estacion: Estacion, sku: Optional[str]) -> _Acumulador:
+        clave = (estacion, sku)
+        acumulador = self._acumuladores.get(clave)
+        if acumulador is None:
+            acumulador = _Acumulador(
+                EstadisticaWelford(), BocetoCuantiles(self.precision, self.max_cubos)
+            )
+            self._acumuladores[clave] = acumulador
+        return acumulador
+
+    def registrar(self, estacion: Estacion, sku: Optional[str], minutos_por_unidad: float) -> None:
+        _validar_minutos(minutos_por_unidad)
+        if sku is not None:
+            self._acumulador(estacion, sku).agregar(minutos_por_unidad)
+        self._acumulador(estacion, None).agregar(minutos_por_unidad)
+
+    def registrar_estacion(self, registro: RegistroEstacion, sku: str, unidades: int = 1) -> bool:
+        """Registra un ``RegistroEstacion`` completado; devuelve False si no tiene tiempo real."""
+        tiempo = registro.tiempo_real
+        if tiempo is None or unidades <= 0:
+            return False
+        self.registrar(registro.estacion, sku, tiempo.total_seconds() / 60 / unidades)
+        return True
+
+    def registrar_orden(self, orden: OrdenProduccion) -> int:
+        """Registra las estaciones completadas de ``orden`` y devuelve cuántas.
+
+        El tiempo de cada estación se reparte por igual entre todas las
+        unidades de la orden. Una orden con varios SKU aporta su tiempo por
+        unidad a cada uno de ellos y una sola observación a la estación. Si
+        alguna estación da un tiempo negativo no se registra ninguna.
+        """
+        unidades = sum(modulo.cantidad for modulo in orden.modulos)
+        skus = {modulo.sku for modulo in orden.modulos}
+        if not unidades:
+            return 0
+        observaciones = [
+            (estacion, tiempo.total_seconds() / 60 / unidades)
+            for estacion, tiempo in orden.tiempos_reales().items()
+            if tiempo is not None
+        ]
+        for _, minutos in observaciones:
+            _validar_minutos(minutos)
+        for estacion, minutos in observaciones:
+            for sku in skus:
+                self._acumulador(estacion, sku).agregar(minutos)
+            self._acumulador(estacion, None).agregar(minutos)
+        return len(observaciones)
+
+    def registrar_ordenes(self, ordenes: Iterable[OrdenProduccion]) -> int:
+        return sum(self.registrar_orden(orden) for orden in ordenes)
+
+    def resumen(self, estacion: Estacion, sku: Optional[str] = None) -> Optional[ResumenDuracion]:
+        acumulador = self._acumuladores.get((estacion, sku))
+        if acumulador is None:
+            return None
+        welford, boceto = acumulador.welford, acumulador.boceto
+        return ResumenDuracion(
+            n=welford.n,
+            media=welford.media,
+            desviacion=welford.desviacion,
+            minimo=welford.minimo,
+            maximo=welford.maximo,
+            p50=boceto.cuantil(0.5),
+            p90=boceto.cuantil(0.9),
+            p95=boceto.cuantil(0.95),
+        )
+
+    def cuantil(self, estacion: Estacion, q: float, sku: Optional[str] = None) -> Optional[float]:
+        acumulador = self._acumuladores.get((estacion, sku))
+        return acumulador.boceto.cuantil(q) if acumulador else None
+
+    def duraciones(self, cuantil: Optional[float] = None) -> Dict[Estacion, float]:
+        """Minutos por unidad de cada estación: la media, o el cuantil indicado."""
+        return {
+            estacion: self._valor(acumulador, cuantil)
+            for (estacion, sku), acumulador in self._acumuladores.items()
+            if sku is None
+        }
+
+    def duraciones_sku(self, cuantil: Optional[float] = None) -> Dict[Tuple[Estacion, str], float]:
+        return {
+            (estacion, sku): self._valor(acumulador, cuantil)
+            for (estacion, sku), acumulador in self._acumuladores.items()
+            if sku is not None
+        }
+
+    def combinar(self, otras: "EstadisticasEstaciones") -> None:
+        """Incorpora las estadísticas de otra instancia (por ejemplo, de otra planta)."""
+        for (estacion, sku), acumulador in otras._acumuladores.items():
+            propio = self._acumulador(estacion, sku)
+            propio.welford.combinar(acumulador.welford)
+            propio.boceto.combinar(acumulador.boceto)
+
+    @staticmethod
+    def _valor(acumulador: _Acumulador, cuantil: Optional[float]) -> float:
+        if cuantil is None:
+            return acumulador.welford.media
+        return acumulador.boceto.cuantil(cuantil) or 0.0
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import heapq
+from collections import deque
 from dataclasses import dataclass
-from typing import Dict, Mapping, Optional
+from typing import Dict, List, Mapping, Optional, Tuple, Union
 
 
 @dataclass(frozen=True)
@@ -16,36 +18,245 @@ def _netear_demanda(demanda: int, stock: int) -> int:
     return max(demanda - stock, 0)
 
 
+def _crear_requerimiento(item: str, cantidad: int, stock: Mapping[str, int]) -> RequerimientoMRP:
+    stock_item = int(stock.get(item, 0))
+    return RequerimientoMRP(
+        item=item,
+        demanda=cantidad,
+        stock=stock_item,
+        requerimiento_neto=_netear_demanda(cantidad, stock_item),
+    )
+
+
+def calcular_codigos_nivel_bajo(bom: Mapping[str, Mapping[str, int]]) -> Dict[str, int]:
+    """Calcula el código de nivel bajo de cada item del BOM.
+
+    El código de nivel bajo es la profundidad máxima a la que aparece un item en
+    cualquier estructura, de modo que al procesar los items en orden creciente
+    de nivel toda su demanda dependiente ya está acumulada. Lanza ``ValueError``
+    si el BOM contiene ciclos.
+    """
+    padres_pendientes: Dict[str, int] = {}
+    for producto, componentes in bom.items():
+        padres_pendientes.setdefault(producto, 0)
+        for componente in componentes:
+            padres_pendientes[componente] = padres_pendientes.get(componente, 0) + 1
+
+    niveles: Dict[str, int] = {item: 0 for item in padres_pendientes}
+    cola = deque(item for item, pendientes in padres_pendientes.items() if pendientes == 0)
+    procesados = 0
+    while cola:
+        producto = cola.popleft()
+        procesados += 1
+        nivel_hijo = niveles[producto] + 1
+        for componente in bom.get(producto, {}):
+            if niveles[componente] < nivel_hijo:
+                niveles[componente] = nivel_hijo
+            padres_pendientes[componente] -= 1
+            if padres_pendientes[componente] == 0:
+                cola.append(componente)
+
+    if procesados < len(padres_pendientes):
+        en_ciclo = sorted(item for item, pendientes in padres_pendientes.items() if pendientes)
+        raise ValueError(f"El BOM contiene ciclos entre los items: {', '.join(en_ciclo)}")
+    return niveles
+
+
+class ExplosionBOM:
+    """Motor de explosión multinivel de un BOM.
+
+    Los códigos de nivel bajo y el orden de procesamiento se calculan una sola
+    vez al construir el motor, por lo que puede reutilizarse en varias corridas
+    de planificación sobre la misma lista de materiales.
+    """
+
+    def __init__(self, bom: Mapping[str, Mapping[str, int]]) -> None:
+        self.bom: Dict[str, Dict[str, int]] = {
+            producto: {componente: int(cantidad) for componente, cantidad in componentes.items()}
+            for producto, componentes in bom.items()
+        }
+        self.codigos_nivel_bajo = calcular_codigos_nivel_bajo(self.bom)
+        self.orden: List[str] = sorted(
+            self.codigos_nivel_bajo, key=self.codigos_nivel_bajo.__getitem__
+        )
+        self._estructura: List[Tuple[str, Tuple[Tuple[str, int], ...]]] = [
+            (item, tuple(self.bom.get(item, {}).items())) for item in self.orden
+        ]
+
+    def explotar(
+        self, demanda: Mapping[str, int], stock: Mapping[str, int]
+    ) -> Dict[str, RequerimientoMRP]:
+        """Netea la demanda nivel a nivel en una única pasada.
+
+        La demanda bruta de cada componente es la suma de los requerimientos
+        netos de sus padres multiplicados por la cantidad por unidad del BOM.
+        """
+        brutos: Dict[str, int] = {item: int(cantidad) for item, cantidad in demanda.items()}
+        requerimientos: Dict[str, RequerimientoMRP] = {}
+
+        for item, componentes in self._estructura:
+            if item not in brutos:
+                continue
+            requerimiento = _crear_requerimiento(item, brutos[item], stock)
+            requerimientos[item] = requerimiento
+            neto = requerimiento.requerimiento_neto
+            for componente, cantidad_componente in componentes:
+                brutos[componente] = brutos.get(componente, 0) + neto * cantidad_componente
+
+        for item, cantidad in brutos.items():
+            if item not in requerimientos:
+                requerimientos[item] = _crear_requerimiento(item, cantidad, stock)
+        return requerimientos
+
+
+class PlanificadorMRP:
+    """Plan MRP con estado que se actualiza por deltas.
+
+    Mantiene la demanda independiente, el stock y los requerimientos vigentes.
+    Cada cambio propaga solo por el subárbol del BOM afectado, en orden de
+    código de nivel bajo, y devuelve únicamente las filas que cambiaron. El
+    resultado es siempre el mismo que regenerar con ``planificar_mrp``.
+    """
+
+    def __init__(
+        self,
+        bom: Union[Mapping[str, Mapping[str, int]], ExplosionBOM],
+        demanda: Optional[Mapping[str, int]] = None,
+        stock: Optional[Mapping[str, int]] = None,
+    ) -> None:
+        self.explosion = bom if isinstance(bom, ExplosionBOM) else ExplosionBOM(bom)
+        self.demanda: Dict[str, int] = {
+            item: int(cantidad) for item, cantidad in (demanda or {}).items()
+        }
+        self.stock: Dict[str, int] = {
+            item: int(cantidad) for item, cantidad in (stock or {}).items()
+        }
+        self.requerimientos = self.explosion.explotar(self.demanda, self.stock)
+
+    def registrar_pedido(self, item: str, cantidad: int) -> Dict[str, RequerimientoMRP]:
+        if cantidad <= 0:
+            raise ValueError("La cantidad del pedido debe ser positiva.")
+        return self.aplicar_cambios(demanda={item: cantidad})
+
+    def cancelar_pedido(self, item: str, cantidad: int) -> Dict[str, RequerimientoMRP]:
+        if cantidad <= 0:
+            raise ValueError("La cantidad a cancelar debe ser positiva.")
+        if cantidad > self.demanda.get(item, 0):
+            raise ValueError(f"No hay demanda suficiente de '{item}' para cancelar.")
+        return self.aplicar_cambios(demanda={item: -cantidad})
+
+    def registrar_movimiento_stock(self, item: str, cantidad: int) -> Dict[str, RequerimientoMRP]:
+        """Aplica un movimiento de stock (positivo entrada, negativo salida)."""
+        return self.aplicar_cambios(stock={item: cantidad})
+
+    def aplicar_cambios(
+        self,
+        demanda: Optional[Mapping[str, int]] = None,
+        stock: Optional[Mapping[str, int]] = None,
+    ) -> Dict[str, RequerimientoMRP]:
+        """Aplica varios deltas de demanda y stock en una sola propagación.
+
+        Una demanda cancelada por completo deja su fila con demanda cero, igual
+        que regenerar el plan con la clave a cero en el mapa de demanda.
+        """
+        pendientes: Dict[str, int] = {}
+        for item, delta in (demanda or {}).items():
+            self.demanda[item] = self.demanda.get(item, 0) + int(delta)
+            pendientes[item] = pendientes.get(item, 0) + int(delta)
+        for item, delta in (stock or {}).items():
+            self.stock[item] = self.stock.get(item, 0) + int(delta)
+            if item in self.requerimientos:
+                pendientes.setdefault(item, 0)
+        return self._propagar(pendientes)
+
+    def _propagar(self, pendientes: Dict[str, int]) -> Dict[str, RequerimientoMRP]:
+        niveles = self.explosion.codigos_nivel_bajo
+        bom = self.explosion.bom
+        cola = [(niveles.get(item, 0), item) for item in pendientes]
+        heapq.heapify(cola)
+        cambios: Dict[str, RequerimientoMRP] = {}
+
+        while cola:
+            _, item = heapq.heappop(cola)
+            delta = pendientes.pop(item)
+            anterior = self.requerimientos.get(item)
+            bruto = (anterior.demanda if anterior else 0) + delta
+            actual = _crear_requerimiento(item, bruto, self.stock)
+            if actual != anterior:
+                self.requerimientos[item] = actual
+                cambios[item] = actual
+
+            neto_anterior = anterior.requerimiento_neto if anterior else 0
+            delta_neto = actual.requerimiento_neto - neto_anterior
+            if not delta_neto and anterior is not None:
+                continue
+            for componente, cantidad in bom.get(item, {}).items():
+                if componente not in pendientes:
+                    pendientes[componente] = 0
+                    heapq.heappush(cola, (niveles[componente], componente))
+                pendientes[componente] += delta_neto * cantidad
+        return cambios
+
+
 def planificar_mrp(
     demanda: Mapping[str, int],
     stock: Mapping[str, int],
-    bom: Optional[Mapping[str, Mapping[str, int]]] = None,
+    bom: Optional[Union[Mapping[str, Mapping[str, int]], ExplosionBOM]] = None,
 ) -> Dict[str, RequerimientoMRP]:
     """Calcula requerimientos netos considerando stock disponible y demanda.
 
-    Si se proporciona un BOM (lista de materiales), la demanda de productos terminados
-    se expande a componentes.
+    Si se proporciona un BOM (lista de materiales), los requerimientos netos de
+    cada nivel se expanden a sus componentes hasta llegar a las materias primas.
+    Con un BOM en forma de mapa se explota en una sola pasada topológica; para
+    varias corridas sobre el mismo BOM conviene pasar una ``ExplosionBOM`` ya
+    construida, que reutiliza el orden de procesamiento.
+    """
+    if isinstance(bom, ExplosionBOM):
+        return bom.explotar(demanda, stock)
+    return _explotar_topologico(demanda, stock, bom or {})
+
+
+def _explotar_topologico(
+    demanda: Mapping[str, int],
+    stock: Mapping[str, int],
+    bom: Mapping[str, Mapping[str, int]],
+) -> Dict[str, RequerimientoMRP]:
+    """Explosión de una sola corrida sin construir ``ExplosionBOM``.
+
+    Recorre el BOM en orden topológico (Kahn): un item se netea cuando ya se
+    han procesado todos sus padres, es decir, con su demanda bruta completa.
+    Da el mismo resultado que ``ExplosionBOM.explotar`` sin calcular antes los
+    códigos de nivel bajo ni copiar el BOM.
     """
+    padres_pendientes: Dict[str, int] = {}
+    for producto, componentes in bom.items():
+        padres_pendientes.setdefault(producto, 0)
+        for componente in componentes:
+            padres_pendientes[componente] = padres_pendientes.get(componente, 0) + 1
+
+    brutos: Dict[str, int] = {item: int(cantidad) for item, cantidad in demanda.items()}
     requerimientos: Dict[str, RequerimientoMRP] = {}
-    demanda_expandida: Dict[str, int] = dict(demanda)
-
-    if bom:
-        for producto, cantidad in demanda.items():
-            componentes = bom.get(producto, {})
-            for componente, cantidad_componente in componentes.items():
-                demanda_expandida[componente] = (
-                    demanda_expandida.get(componente, 0)
-                    + cantidad * cantidad_componente
-                )
-
-    for item, cantidad in demanda_expandida.items():
-        stock_item = int(stock.get(item, 0))
-        neto = _netear_demanda(int(cantidad), stock_item)
-        requerimientos[item] = RequerimientoMRP(
-            item=item,
-            demanda=int(cantidad),
-            stock=stock_item,
-            requerimiento_neto=neto,
-        )
+    cola = deque(item for item, pendientes in padres_pendientes.items() if pendientes == 0)
+    procesados = 0
+    while cola:
+        producto = cola.popleft()
+        procesados += 1
+        componentes = bom.get(producto, {})
+        if producto in brutos:
+            requerimiento = _crear_requerimiento(producto, brutos[producto], stock)
+            requerimientos[producto] = requerimiento
+            neto = requerimiento.requerimiento_neto
+            for componente, cantidad in componentes.items():
+                brutos[componente] = brutos.get(componente, 0) + neto * int(cantidad)
+        for componente in componentes:
+            padres_pendientes[componente] -= 1
+            if padres_pendientes[componente] == 0:
+                cola.append(componente)
 
+    if procesados < len(padres_pendientes):
+        en_ciclo = sorted(item for item, pendientes in padres_pendientes.items() if pendientes)
+        raise ValueError(f"El BOM contiene ciclos entre los items: {', '.join(en_ciclo)}")
+    for item, cantidad in brutos.items():
+        if item not in requerimientos:
+            requerimientos[item] = _crear_requerimiento(item, cantidad, stock)
     return requerimientos
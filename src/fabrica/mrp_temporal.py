@@ -0,0 +1,239 @@
+"""MRP por periodos con desfase de plazos de entrega y recepciones programadas.
+
+Cada item guarda su demanda, recepciones y lanzamientos como una fila de una
+matriz ``items × periodos``, de modo que el neteo de todos los items de un
+mismo nivel se resuelve con operaciones de NumPy sobre filas completas. Este
+módulo depende de NumPy, por eso no se importa desde ``fabrica``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from enum import Enum
+from typing import Dict, List, Mapping, Optional, Union
+
+import numpy as np
+
+from .mrp import ExplosionBOM
+from .mrp_vectorial import BOMCompilada, IndiceItems
+
+Fecha = Union[date, datetime]
+
+
+class Bucket(str, Enum):
+    DIARIO = "diario"
+    SEMANAL = "semanal"
+
+    @property
+    def dias(self) -> int:
+        return 7 if self is Bucket.SEMANAL else 1
+
+
+@dataclass(frozen=True)
+class Horizonte:
+    inicio: date
+    periodos: int
+    bucket: Bucket = Bucket.SEMANAL
+
+    def __post_init__(self) -> None:
+        if self.periodos <= 0:
+            raise ValueError("El horizonte debe tener al menos un periodo.")
+
+    def periodo(self, fecha: Fecha) -> int:
+        """Periodo de una fecha; las fechas pasadas caen en el periodo 0 y las
+        posteriores al horizonte devuelven ``self.periodos``."""
+        if isinstance(fecha, datetime):
+            fecha = fecha.date()
+        periodo = (fecha - self.inicio).days // self.bucket.dias
+        return min(max(periodo, 0), self.periodos)
+
+    def fecha(self, periodo: int) -> date:
+        return self.inicio + timedelta(days=periodo * self.bucket.dias)
+
+    def periodos_de_plazo(self, dias: int) -> int:
+        """Convierte un plazo en días al número de periodos, redondeando hacia arriba."""
+        return -(-max(int(dias), 0) // self.bucket.dias)
+
+
+@dataclass(frozen=True)
+class RequerimientoTemporal:
+    item: str
+    fechas: List[date]
+    demanda_bruta: List[int]
+    recepciones_programadas: List[int]
+    requerimiento_neto: List[int]
+    lanzamientos: List[int]
+    stock_inicial: int
+
+
+class PlanTemporal:
+    """Resultado por periodos de una corrida de ``MRPTemporal``.
+
+    Todas las matrices tienen forma ``(items, periodos)`` y sus filas siguen el
+    orden de ``indice``. ``lanzamientos`` son las órdenes planificadas desfasadas
+    por el plazo de entrega; lo que debería haberse lanzado antes del inicio
+    del horizonte se acumula como atraso en el periodo 0.
+    """
+
+    def __init__(
+        self,
+        horizonte: Horizonte,
+        indice: IndiceItems,
+        stock: np.ndarray,
+        brutos: np.ndarray,
+        recepciones: np.ndarray,
+        netos: np.ndarray,
+        lanzamientos: np.ndarray,
+    ) -> None:
+        self.horizonte = horizonte
+        self.indice = indice
+        self.stock = stock
+        self.brutos = brutos
+        self.recepciones = recepciones
+        self.netos = netos
+        self.lanzamientos = lanzamientos
+
+    def __len__(self) -> int:
+        return len(self.indice)
+
+    def __contains__(self, item: object) -> bool:
+        return item in self.indice
+
+    def __getitem__(self, item: str) -> RequerimientoTemporal:
+        fila = self.indice.posiciones[item]
+        return RequerimientoTemporal(
+            item=item,
+            fechas=self.fechas(),
+            demanda_bruta=self.brutos[fila].tolist(),
+            recepciones_programadas=self.recepciones[fila].tolist(),
+            requerimiento_neto=self.netos[fila].tolist(),
+            lanzamientos=self.lanzamientos[fila].tolist(),
+            stock_inicial=int(self.stock[fila]),
+        )
+
+    def fechas(self) -> List[date]:
+        return [self.horizonte.fecha(periodo) for periodo in range(self.horizonte.periodos)]
+
+    def lanzamientos_en(self, periodo: int) -> Dict[str, int]:
+        """Órdenes planificadas a lanzar en un periodo, por item."""
+        columna = self.lanzamientos[:, periodo]
+        return {self.indice.items[fila]: int(columna[fila]) for fila in np.flatnonzero(columna)}
+
+
+class MRPTemporal:
+    """Planificador MRP por periodos (lote a lote) sobre un BOM compilado."""
+
+    def __init__(
+        self,
+        bom: Union[Mapping[str, Mapping[str, int]], ExplosionBOM, BOMCompilada],
+        plazos_dias: Optional[Mapping[str, int]] = None,
+    ) -> None:
+        self.bom = bom if isinstance(bom, BOMCompilada) else BOMCompilada(bom)
+        self.plazos_dias: Dict[str, int] = dict(plazos_dias or {})
+
+    def planificar(
+        self,
+        horizonte: Horizonte,
+        demanda: Mapping[str, Mapping[Fecha, int]],
+        stock: Mapping[str, int],
+        recepciones: Optional[Mapping[str, Mapping[Fecha, int]]] = None,
+    ) -> PlanTemporal:
+        """Netea por periodos y desfasa los requerimientos de los componentes.
+
+        ``demanda`` y ``recepciones`` asocian a cada item sus cantidades por fecha
+        (por ejemplo, ``PurchaseOrder.expected_date`` para las recepciones).
+        Las fechas anteriores al inicio se acumulan en el periodo 0 (demanda o
+        recepciones vencidas) y las posteriores al horizonte se ignoran.
+        """
+        indice = self.bom.indice
+        extra = [item for item in demanda if item not in indice]
+        if extra:
+            indice = indice.copiar()
+            for item in extra:
+                indice.internar(item)
+
+        filas, periodos = len(indice), horizonte.periodos
+        brutos = self._matriz(demanda, indice, horizonte)
+        programadas = self._matriz(recepciones or {}, indice, horizonte)
+        vector_stock = np.zeros(filas, dtype=np.int64)
+        for item, cantidad in stock.items():
+            posicion = indice.posiciones.get(item)
+            if posicion is not None:
+                vector_stock[posicion] = int(cantidad)
+        desfases = np.zeros(filas, dtype=np.int64)
+        for item, dias in self.plazos_dias.items():
+            posicion = indice.posiciones.get(item)
+            if posicion is not None:
+                desfases[posicion] = horizonte.periodos_de_plazo(dias)
+
+        netos = np.zeros((filas, periodos), dtype=np.int64)
+        lanzamientos = np.zeros((filas, periodos), dtype=np.int64)
+        niveles = np.zeros(filas, dtype=np.int64)
+        niveles[: len(self.bom.codigos_nivel_bajo)] = self.bom.codigos_nivel_bajo
+        niveles_bom = {nivel.codigo: nivel for nivel in self.bom.niveles}
+        # Como en ``planificar_mrp``, solo se netean los items con demanda o a
+        # los que llega demanda de un padre: un item no alcanzado con stock
+        # negativo no lanza órdenes ni genera demanda en sus componentes.
+        alcanzados = np.zeros(filas, dtype=bool)
+        alcanzados[[indice.posiciones[item] for item in demanda]] = True
+
+        for codigo in range(int(niveles.max(initial=0)) + 1):
+            grupo = np.flatnonzero(niveles == codigo)
+            netos[grupo] = self._netear(brutos[grupo], programadas[grupo], vector_stock[grupo])
+            netos[grupo] *= alcanzados[grupo, None]
+            lanzamientos[grupo] = self._desfasar(netos[grupo], desfases[grupo])
+            nivel = niveles_bom.get(codigo)
+            if nivel is not None:
+                aportes = lanzamientos[nivel.padres] * nivel.cantidades[:, None]
+                brutos[nivel.componentes] += np.add.reduceat(aportes, nivel.inicios, axis=0)
+                alcanzados[nivel.componentes] |= np.logical_or.reduceat(
+                    alcanzados[nivel.padres], nivel.inicios
+                )
+
+        return PlanTemporal(
+            horizonte=horizonte,
+            indice=indice,
+            stock=vector_stock,
+            brutos=brutos,
+            recepciones=programadas,
+            netos=netos,
+            lanzamientos=lanzamientos,
+        )
+
+    @staticmethod
+    def _netear(brutos: np.ndarray, recepciones: np.ndarray, stock: np.ndarray) -> np.ndarray:
+        """Neteo lote a lote: el acumulado planificado hasta ``t`` es el mayor
+        faltante proyectado hasta ``t``, y el neto del periodo es su incremento."""
+        proyectado = stock[:, None] + np.cumsum(recepciones - brutos, axis=1)
+        acumulado = np.maximum(np.maximum.accumulate(-proyectado, axis=1), 0)
+        return np.diff(acumulado, axis=1, prepend=0)
+
+    @staticmethod
+    def _desfasar(netos: np.ndarray, desfases: np.ndarray) -> np.ndarray:
+        filas, periodos = netos.shape
+        if not filas:
+            return netos.copy()
+        relleno = np.concatenate([netos, np.zeros_like(netos)], axis=1)
+        origen = np.minimum(np.arange(periodos)[None, :] + desfases[:, None], 2 * periodos - 1)
+        lanzamientos = np.take_along_axis(relleno, origen, axis=1)
+        acumulado = np.cumsum(netos, axis=1)
+        atrasados = np.minimum(desfases, periodos)
+        con_atraso = atrasados > 0
+        lanzamientos[con_atraso, 0] += acumulado[con_atraso, atrasados[con_atraso] - 1]
+        return lanzamientos
+
+    @staticmethod
+    def _matriz(
+        valores: Mapping[str, Mapping[Fecha, int]], indice: IndiceItems, horizonte: Horizonte
+    ) -> np.ndarray:
+        matriz = np.zeros((len(indice), horizonte.periodos), dtype=np.int64)
+        for item, por_fecha in valores.items():
+            fila = indice.posiciones.get(item)
+            if fila is None:
+                continue
+            for fecha, cantidad in por_fecha.items():
+                periodo = horizonte.periodo(fecha)
+                if periodo < horizonte.periodos:
+                    matriz[fila, periodo] += int(cantidad)
+        return matriz
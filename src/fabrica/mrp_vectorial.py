@@ -0,0 +1,262 @@
+"""Planificación MRP sobre arrays de NumPy para corridas de catálogo completo.
+
+Este módulo depende de NumPy, por eso no se importa desde ``fabrica``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .mrp import ExplosionBOM, RequerimientoMRP
+
+
+class IndiceItems:
+    """Asigna a cada item un índice entero estable y consecutivo."""
+
+    def __init__(self, items: Sequence[str] = ()) -> None:
+        self.items: List[str] = []
+        self.posiciones: Dict[str, int] = {}
+        for item in items:
+            self.internar(item)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __contains__(self, item: object) -> bool:
+        return item in self.posiciones
+
+    def internar(self, item: str) -> int:
+        posicion = self.posiciones.get(item)
+        if posicion is None:
+            posicion = len(self.items)
+            self.posiciones[item] = posicion
+            self.items.append(item)
+        return posicion
+
+    def copiar(self) -> "IndiceItems":
+        copia = IndiceItems()
+        copia.items = list(self.items)
+        copia.posiciones = dict(self.posiciones)
+        return copia
+
+
+@dataclass(frozen=True)
+class NivelBOM:
+    """Aristas padre → componente cuyos padres comparten código de nivel bajo.
+
+    Las aristas están ordenadas por componente y ``inicios`` marca el primer
+    tramo de cada componente distinto, de modo que la explosión del nivel es
+    una multiplicación matriz dispersa × vector resuelta con ``np.add.reduceat``.
+    """
+
+    codigo: int
+    padres: np.ndarray
+    cantidades: np.ndarray
+    componentes: np.ndarray
+    inicios: np.ndarray
+
+
+class BOMCompilada:
+    """BOM compilado a arrays de índices agrupados por nivel."""
+
+    def __init__(self, bom: Union[Mapping[str, Mapping[str, int]], ExplosionBOM]) -> None:
+        explosion = bom if isinstance(bom, ExplosionBOM) else ExplosionBOM(bom)
+        self.indice = IndiceItems(explosion.orden)
+        self.codigos_nivel_bajo = np.fromiter(
+            (explosion.codigos_nivel_bajo[item] for item in explosion.orden),
+            dtype=np.int64,
+            count=len(explosion.orden),
+        )
+
+        aristas: Dict[int, List[Tuple[int, int, int]]] = {}
+        posiciones = self.indice.posiciones
+        for producto, componentes in explosion.bom.items():
+            padre = posiciones[producto]
+            nivel = explosion.codigos_nivel_bajo[producto]
+            for componente, cantidad in componentes.items():
+                aristas.setdefault(nivel, []).append((posiciones[componente], padre, cantidad))
+
+        self.niveles: List[NivelBOM] = []
+        for nivel in sorted(aristas):
+            filas = np.array(sorted(aristas[nivel]), dtype=np.int64).reshape(-1, 3)
+            componentes = filas[:, 0]
+            cambios = np.flatnonzero(componentes[1:] != componentes[:-1]) + 1
+            inicios = np.concatenate(([0], cambios)).astype(np.int64)
+            self.niveles.append(
+                NivelBOM(
+                    codigo=nivel,
+                    padres=filas[:, 1].copy(),
+                    cantidades=filas[:, 2].copy(),
+                    componentes=componentes[inicios].copy(),
+                    inicios=inicios,
+                )
+            )
+
+    def __len__(self) -> int:
+        return len(self.indice)
+
+    def explotar(
+        self,
+        demanda: np.ndarray,
+        stock: np.ndarray,
+        presentes: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Devuelve la demanda bruta explotada y la máscara de items alcanzados.
+
+        ``demanda`` y ``stock`` son vectores ``int64`` indexados con ``self.indice``
+        (pueden ser más largos si incluyen items ajenos al BOM). ``presentes``
+        marca los items de partida; por defecto, los que tienen demanda.
+        """
+        brutos = np.array(demanda, dtype=np.int64, copy=True)
+        alcanzados = brutos != 0 if presentes is None else presentes.copy()
+        for nivel in self.niveles:
+            padres = nivel.padres
+            # Solo se netean los padres a los que llega demanda: un padre no
+            # alcanzado con stock negativo no debe generar demanda en sus hijos.
+            netos = np.maximum(brutos[padres] - stock[padres], 0) * alcanzados[padres]
+            brutos[nivel.componentes] += np.add.reduceat(netos * nivel.cantidades, nivel.inicios)
+            alcanzados[nivel.componentes] |= np.logical_or.reduceat(
+                alcanzados[padres], nivel.inicios
+            )
+        return brutos, alcanzados
+
+
+class ResultadoMRP:
+    """Resultado columnar de una corrida MRP vectorial.
+
+    Guarda los items, la demanda bruta, el stock y el requerimiento neto como
+    columnas; los ``RequerimientoMRP`` solo se construyen al inspeccionar una fila.
+    """
+
+    def __init__(
+        self,
+        items: Sequence[str],
+        demanda: np.ndarray,
+        stock: np.ndarray,
+        requerimiento_neto: np.ndarray,
+    ) -> None:
+        self.items = items
+        self.demanda = demanda
+        self.stock = stock
+        self.requerimiento_neto = requerimiento_neto
+        self._posiciones: Optional[Dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __contains__(self, item: object) -> bool:
+        return item in self._indice()
+
+    def __getitem__(self, item: str) -> RequerimientoMRP:
+        return self.fila(self._indice()[item])
+
+    def __iter__(self) -> Iterator[RequerimientoMRP]:
+        for posicion in range(len(self.items)):
+            yield self.fila(posicion)
+
+    def get(self, item: str) -> Optional[RequerimientoMRP]:
+        posicion = self._indice().get(item)
+        return None if posicion is None else self.fila(posicion)
+
+    def fila(self, posicion: int) -> RequerimientoMRP:
+        return RequerimientoMRP(
+            item=self.items[posicion],
+            demanda=int(self.demanda[posicion]),
+            stock=int(self.stock[posicion]),
+            requerimiento_neto=int(self.requerimiento_neto[posicion]),
+        )
+
+    def con_requerimiento(self) -> Iterator[RequerimientoMRP]:
+        """Itera solo las filas con requerimiento neto positivo."""
+        for posicion in np.flatnonzero(self.requerimiento_neto > 0):
+            yield self.fila(int(posicion))
+
+    def a_diccionario(self) -> Dict[str, RequerimientoMRP]:
+        """Materializa todas las filas con la forma que devuelve ``planificar_mrp``."""
+        return {requerimiento.item: requerimiento for requerimiento in self}
+
+    def _indice(self) -> Dict[str, int]:
+        if self._posiciones is None:
+            self._posiciones = {item: posicion for posicion, item in enumerate(self.items)}
+        return self._posiciones
+
+
+class MRPVectorial:
+    """Planificador MRP con vectores ``int64`` y BOM disperso por niveles."""
+
+    def __init__(
+        self, bom: Union[Mapping[str, Mapping[str, int]], ExplosionBOM, BOMCompilada]
+    ) -> None:
+        self.bom = bom if isinstance(bom, BOMCompilada) else BOMCompilada(bom)
+
+    @property
+    def indice(self) -> IndiceItems:
+        return self.bom.indice
+
+    def planificar_vectores(self, demanda: np.ndarray, stock: np.ndarray) -> ResultadoMRP:
+        """Planifica a partir de vectores ya indexados con ``self.indice``.
+
+        Devuelve todas las filas del índice, incluidas las que no tienen demanda.
+        """
+        demanda = np.asarray(demanda, dtype=np.int64)
+        stock = np.asarray(stock, dtype=np.int64)
+        if demanda.shape != (len(self.indice),) or stock.shape != demanda.shape:
+            raise ValueError("Los vectores de demanda y stock deben tener un valor por item")
+        brutos, _ = self.bom.explotar(demanda, stock)
+        return ResultadoMRP(
+            items=self.indice.items,
+            demanda=brutos,
+            stock=stock,
+            requerimiento_neto=np.maximum(brutos - stock, 0),
+        )
+
+    def planificar(self, demanda: Mapping[str, int], stock: Mapping[str, int]) -> ResultadoMRP:
+        """Equivalente vectorial de ``planificar_mrp`` con el mismo conjunto de filas."""
+        indice = self.indice
+        extra = [item for item in demanda if item not in indice]
+        if extra:
+            indice = indice.copiar()
+            for item in extra:
+                indice.internar(item)
+
+        vector_demanda = self._vectorizar(demanda, indice)
+        vector_stock = self._vectorizar(stock, indice)
+        presentes = np.zeros(len(indice), dtype=bool)
+        presentes[[indice.posiciones[item] for item in demanda]] = True
+
+        brutos, alcanzados = self.bom.explotar(vector_demanda, vector_stock, presentes)
+        filas = np.flatnonzero(alcanzados)
+        items = [indice.items[posicion] for posicion in filas]
+        return ResultadoMRP(
+            items=items,
+            demanda=brutos[filas],
+            stock=vector_stock[filas],
+            requerimiento_neto=np.maximum(brutos[filas] - vector_stock[filas], 0),
+        )
+
+    @staticmethod
+    def _vectorizar(valores: Mapping[str, int], indice: IndiceItems) -> np.ndarray:
+        vector = np.zeros(len(indice), dtype=np.int64)
+        posiciones = np.fromiter(
+            (indice.posiciones.get(item, -1) for item in valores),
+            dtype=np.int64,
+            count=len(valores),
+        )
+        cantidades = np.fromiter(
+            (int(cantidad) for cantidad in valores.values()), dtype=np.int64, count=len(valores)
+        )
+        conocidos = posiciones >= 0
+        vector[posiciones[conocidos]] = cantidades[conocidos]
+        return vector
+
+
+def planificar_mrp_vectorial(
+    demanda: Mapping[str, int],
+    stock: Mapping[str, int],
+    bom: Optional[Union[Mapping[str, Mapping[str, int]], ExplosionBOM, BOMCompilada]] = None,
+) -> ResultadoMRP:
+    """Versión columnar de ``planificar_mrp`` para catálogos grandes."""
+    return MRPVectorial(bom if bom is not None else {}).planificar(demanda, stock)
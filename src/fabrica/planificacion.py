@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .produccion import Estacion, EstadoEstacion, OrdenProduccion
+
+RUTA_PRODUCCION: Tuple[Estacion, ...] = tuple(Estacion)
+PRIORIDAD_POR_DEFECTO = 3
+
+
+@dataclass(frozen=True)
+class TareaProgramada:
+    id_orden: str
+    estacion: Estacion
+    recurso: int
+    inicio: datetime
+    fin: datetime
+
+    @property
+    def duracion(self) -> timedelta:
+        return self.fin - self.inicio
+
+
+@dataclass
+class Programa:
+    inicio: datetime
+    capacidad: Dict[Estacion, int]
+    tareas: List[TareaProgramada] = field(default_factory=list)
+
+    @property
+    def fin(self) -> datetime:
+        return max((tarea.fin for tarea in self.tareas), default=self.inicio)
+
+    @property
+    def makespan(self) -> timedelta:
+        return self.fin - self.inicio
+
+    def tareas_de(self, id_orden: str) -> List[TareaProgramada]:
+        return [tarea for tarea in self.tareas if tarea.id_orden == id_orden]
+
+    def fin_por_orden(self) -> Dict[str, datetime]:
+        fines: Dict[str, datetime] = {}
+        for tarea in self.tareas:
+            if tarea.id_orden not in fines or tarea.fin > fines[tarea.id_orden]:
+                fines[tarea.id_orden] = tarea.fin
+        return fines
+
+    def utilizacion(self) -> Dict[Estacion, float]:
+        """Fracción del tiempo hasta ``fin`` que cada estación tiene ocupados sus recursos."""
+        horizonte = self.makespan.total_seconds()
+        ocupado: Dict[Estacion, float] = {estacion: 0.0 for estacion in self.capacidad}
+        for tarea in self.tareas:
+            ocupado[tarea.estacion] += tarea.duracion.total_seconds()
+        utilizacion: Dict[Estacion, float] = {}
+        for estacion, capacidad in self.capacidad.items():
+            disponible = horizonte * capacidad
+            utilizacion[estacion] = ocupado[estacion] / disponible if disponible else 0.0
+        return utilizacion
+
+
+def duraciones_historicas(ordenes: Iterable[OrdenProduccion]) -> Dict[Estacion, float]:
+    """Minutos medios por unidad de módulo en cada estación.
+
+    Se calculan a partir de los tiempos reales de las estaciones completadas,
+    repartiendo el tiempo de cada orden entre todas sus unidades.
+    """
+    minutos: Dict[Estacion, float] = {}
+    unidades: Dict[Estacion, int] = {}
+    for orden in ordenes:
+        cantidad = sum(modulo.cantidad for modulo in orden.modulos)
+        if not cantidad:
+            continue
+        for estacion, tiempo in orden.tiempos_reales().items():
+            if tiempo is None:
+                continue
+            minutos[estacion] = minutos.get(estacion, 0.0) + tiempo.total_seconds() / 60
+            unidades[estacion] = unidades.get(estacion, 0) + cantidad
+    return {estacion: minutos[estacion] / unidades[estacion] for estacion in minutos}
+
+
+class PlanificadorCapacidad:
+    """Programación a capacidad finita de órdenes por la ruta de estaciones.
+
+    Cada estación tiene ``capacidad[estacion]`` recursos idénticos en paralelo
+    y las órdenes recorren CORTE → COSTURA → TAPIZADO → EMBALAJE saltándose las
+    estaciones ya completadas o que la orden no incluye. La simulación avanza
+    por eventos de fin de tarea guardados en un heap; cuando un recurso queda
+    libre toma de la cola de su estación la orden de mejor prioridad (número
+    menor, como ``ProductionOrder.priority``) y, a igualdad, la que llegó antes.
+
+    La duración de una orden en una estación es la suma, por módulo, de
+    unidades × minutos por unidad, buscando primero ``(estacion, sku)`` en
+    ``duraciones_sku`` y después ``duraciones[estacion]``.
+    """
+
+    def __init__(
+        self,
+        capacidad: Mapping[Estacion, int],
+        duraciones: Mapping[Estacion, float],
+        duraciones_sku: Optional[Mapping[Tuple[Estacion, str], float]] = None,
+    ) -> None:
+        for estacion, recursos in capacidad.items():
+            if recursos < 0:
+                raise ValueError(f"La capacidad de {estacion.value} no puede ser negativa.")
+        self.capacidad = {estacion: int(capacidad.get(estacion, 0)) for estacion in RUTA_PRODUCCION}
+        self.duraciones = dict(duraciones)
+        self.duraciones_sku = dict(duraciones_sku or {})
+
+    def duracion(self, orden: OrdenProduccion, estacion: Estacion) -> float:
+        minutos = 0.0
+        for modulo in orden.modulos:
+            por_unidad = self.duraciones_sku.get((estacion, modulo.sku))
+            if por_unidad is None:
+                if estacion not in self.duraciones:
+                    raise ValueError(
+                        f"No hay duración para {modulo.sku} en la estación {estacion.value}."
+                    )
+                por_unidad = self.duraciones[estacion]
+            minutos += modulo.cantidad * por_unidad
+        return minutos
+
+    def programar(
+        self,
+        ordenes: Iterable[OrdenProduccion],
+        prioridades: Optional[Mapping[str, int]] = None,
+        inicio: Optional[datetime] = None,
+    ) -> Programa:
+        inicio = inicio or datetime.utcnow()
+        prioridades = prioridades or {}
+        ordenes = list(ordenes)
+        rutas: List[List[Tuple[Estacion, float]]] = []
+        for orden in ordenes:
+            ruta = []
+            for estacion in RUTA_PRODUCCION:
+                registro = orden.estaciones.get(estacion)
+                if registro is None or registro.estado == EstadoEstacion.COMPLETADO:
+                    continue
+                if not self.capacidad[estacion]:
+                    raise ValueError(f"La estación {estacion.value} no tiene capacidad.")
+                ruta.append((estacion, self.duracion(orden, estacion)))
+            rutas.append(ruta)
+
+        colas: Dict[Estacion, List[Tuple[int, float, int]]] = {e: [] for e in RUTA_PRODUCCION}
+        libres: Dict[Estacion, List[int]] = {
+            estacion: list(range(recursos)) for estacion, recursos in self.capacidad.items()
+        }
+        etapa = [0] * len(ordenes)
+        eventos: List[Tuple[float, int, int]] = []  # (fin, orden, recurso)
+        programadas: List[Tuple[int, Estacion, int, float, float]] = []
+
+        def encolar(indice: int, momento: float) -> Optional[Estacion]:
+            ruta = rutas[indice]
+            if etapa[indice] >= len(ruta):
+                return None
+            estacion = ruta[etapa[indice]][0]
+            prioridad = prioridades.get(ordenes[indice].id_orden, PRIORIDAD_POR_DEFECTO)
+            heapq.heappush(colas[estacion], (prioridad, momento, indice))
+            return estacion
+
+        def despachar(estacion: Estacion, momento: float) -> None:
+            cola, recursos = colas[estacion], libres[estacion]
+            while cola and recursos:
+                _, _, indice = heapq.heappop(cola)
+                recurso = heapq.heappop(recursos)
+                fin = momento + rutas[indice][etapa[indice]][1]
+                programadas.append((indice, estacion, recurso, momento, fin))
+                heapq.heappush(eventos, (fin, indice, recurso))
+
+        for indice in range(len(ordenes)):
+            encolar(indice, 0.0)
+        for estacion in RUTA_PRODUCCION:
+            despachar(estacion, 0.0)
+
+        while eventos:
+            # Se liberan todas las tareas que terminan en el mismo instante antes
+            # de despachar, para que compitan por prioridad y no por orden de pop.
+            momento = eventos[0][0]
+            afectadas = set()
+            while eventos and eventos[0][0] == momento:
+                _, indice, recurso = heapq.heappop(eventos)
+                estacion = rutas[indice][etapa[indice]][0]
+                heapq.heappush(libres[estacion], recurso)
+                etapa[indice] += 1
+                afectadas.add(estacion)
+                afectadas.add(encolar(indice, momento))
+            for estacion in RUTA_PRODUCCION:
+                if estacion in afectadas:
+                    despachar(estacion, momento)
+
+        programa = Programa(inicio=inicio, capacidad=dict(self.capacidad))
+        programa.tareas = [
+            TareaProgramada(
+                id_orden=ordenes[indice].id_orden,
+                estacion=estacion,
+                recurso=recurso,
+                inicio=inicio + timedelta(minutes=desde),
+                fin=inicio + timedelta(minutes=hasta),
+            )
+            for indice, estacion, recurso, desde, hasta in programadas
+        ]
+        return programa
+
+
+def programar_produccion(
+    ordenes: Iterable[OrdenProduccion],
+    capacidad: Mapping[Estacion, int],
+    duraciones: Mapping[Estacion, float],
+    prioridades: Optional[Mapping[str, int]] = None,
+    inicio: Optional[datetime] = None,
+    duraciones_sku: Optional[Mapping[Tuple[Estacion, str], float]] = None,
+) -> Programa:
+    """Programa ``ordenes`` a capacidad finita desde ``inicio``.
+
+    ``duraciones`` son minutos por unidad de módulo en cada estación (por
+    ejemplo, los de ``duraciones_historicas``) y ``prioridades`` asigna a cada
+    ``id_orden`` la prioridad de ``ProductionOrder.priority`` (1 es la más
+    urgente; por defecto 3).
+    """
+    planificador = PlanificadorCapacidad(capacidad, duraciones, duraciones_sku)
+    return planificador.programar(ordenes, prioridades=prioridades, inicio=inicio)
@@ -0,0 +1,21 @@
+import importlib.util
+import sys
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RAIZ / "src"))
+sys.path.insert(1, str(RAIZ))
+
+
+def _cargar_paquete(nombre: str, ruta: Path) -> None:
+    spec = importlib.util.spec_from_file_location(
+        nombre, ruta / "__init__.py", submodule_search_locations=[str(ruta)]
+    )
+    paquete = importlib.util.module_from_spec(spec)
+    sys.modules[nombre] = paquete
+    spec.loader.exec_module(paquete)
+
+
+# El paquete ``fabrica`` de la raíz (ventas, documentos e informes) se llama
+# igual que ``src/fabrica``; en los tests se importa como ``fabrica_ventas``.
+_cargar_paquete("fabrica_ventas", RAIZ / "fabrica")
@@ -0,0 +1,33 @@
+import pytest
+
+from fabrica import Modulo, Pedido, crear_orden_produccion, piezas_modulo, planificar_corte_ordenes
+
+MEDIDAS = {"width": 90, "height": 80, "depth": 95}
+
+
+def orden_con_telas(*telas):
+    catalogo = {
+        f"SKU-{tela}": piezas_modulo("panel", MEDIDAS, margen_costura=1.5, tela=tela)
+        for tela in telas
+    }
+    pedido = Pedido("PED-1", "cliente", [Modulo(sku, "módulo", 2) for sku in catalogo])
+    return [crear_orden_produccion("OP-1", pedido)], catalogo
+
+
+def test_ancho_por_tela_planifica_cada_tela_en_su_rollo():
+    ordenes, catalogo = orden_con_telas("lino", "pana")
+
+    planes = planificar_corte_ordenes(ordenes, catalogo, {"lino": 140, "pana": 280})
+
+    assert {tela: plan.ancho_rollo for tela, plan in planes.items()} == {
+        "lino": 140,
+        "pana": 280,
+    }
+    assert all(len(plan.colocaciones) == 4 for plan in planes.values())
+
+
+def test_tela_sin_ancho_de_rollo_lanza_value_error():
+    ordenes, catalogo = orden_con_telas("lino", "pana")
+
+    with pytest.raises(ValueError, match="tela 'pana'"):
+        planificar_corte_ordenes(ordenes, catalogo, {"lino": 140})
@@ -0,0 +1,95 @@
+import io
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+from fabrica_ventas import (
+    Cliente,
+    Direccion,
+    LineaOrdenVenta,
+    Moneda,
+    Money,
+    OrdenVenta,
+    generar_documentos,
+    renderizar_documentos,
+)
+
+EUR = Moneda("EUR", "€")
+USD = Moneda("USD", "$")
+EMISION = date(2026, 3, 2)
+
+
+def direccion(indice, instrucciones=None):
+    return Direccion(
+        f"Calle {indice}", "Madrid", "Madrid", f"{28000 + indice}", "España", instrucciones
+    )
+
+
+def ordenes_aleatorias(semilla, cantidad=60):
+    aleatorio = random.Random(semilla)
+    clientes = [
+        Cliente(f"CLI-{i}", f"Cliente {i}", direccion_envio=direccion(i, "Timbre" * (i % 2)))
+        for i in range(5)
+    ]
+    # Precios compartidos y sueltos, con exponentes distintos (1.0, 1.00, 12.345, 7).
+    catalogo = [Money(Decimal(texto), EUR) for texto in ("1.0", "1.00", "12.345", "7", "0.10")]
+    ordenes = []
+    for indice in range(cantidad):
+        orden = OrdenVenta(
+            f"OV-{indice}", aleatorio.choice(clientes), EUR, EMISION - timedelta(days=indice % 3)
+        )
+        for linea in range(aleatorio.randint(0, 4)):
+            suelto = Money(Decimal(aleatorio.randint(1, 999)) / 8, EUR)
+            precio = aleatorio.choice(catalogo + [suelto])
+            orden.agregar_linea(
+                LineaOrdenVenta(f"SKU-{linea}", f"Módulo {linea}", aleatorio.randint(0, 5), precio)
+            )
+        ordenes.append(orden)
+    return ordenes
+
+
+def por_orden(ordenes, separador="\f"):
+    return "".join(
+        documento + separador
+        for orden in ordenes
+        for documento in generar_documentos(orden, EMISION)
+    )
+
+
+@pytest.mark.parametrize("tamano_bloque", [1, 7, 250])
+@pytest.mark.parametrize("semilla", range(3))
+def test_lote_identico_a_generar_documentos(semilla, tamano_bloque):
+    ordenes = ordenes_aleatorias(semilla)
+    destino = io.StringIO()
+
+    resultado = renderizar_documentos(
+        iter(ordenes), EMISION, destino, tamano_bloque=tamano_bloque, separador="<>"
+    )
+
+    assert destino.getvalue() == por_orden(ordenes, "<>")
+    assert (resultado.ordenes, resultado.documentos) == (len(ordenes), 3 * len(ordenes))
+
+
+def test_pool_escribe_en_orden_de_entrada():
+    ordenes = ordenes_aleatorias(4, cantidad=30)
+    destino = io.StringIO()
+
+    renderizar_documentos(ordenes, EMISION, destino, procesos=2, tamano_bloque=4)
+
+    assert destino.getvalue() == por_orden(ordenes)
+
+
+def test_mismos_errores_que_generar_documentos():
+    sin_envio = OrdenVenta("OV-1", Cliente("CLI", "Cliente"), EUR)
+    mezclada = OrdenVenta("OV-2", Cliente("CLI", "Cliente", direccion_envio=direccion(1)), EUR)
+    mezclada.lineas.append(LineaOrdenVenta("SKU", "Módulo", 1, Money(Decimal("2"), USD)))
+
+    for orden, mensaje in [(sin_envio, "direccion de envio"), (mezclada, "monedas distintas")]:
+        with pytest.raises(ValueError, match=mensaje):
+            generar_documentos(orden, EMISION)
+        with pytest.raises(ValueError, match=mensaje):
+            renderizar_documentos([orden], EMISION, io.StringIO())
+    with pytest.raises(ValueError, match="bloque"):
+        renderizar_documentos([], EMISION, io.StringIO(), tamano_bloque=0)
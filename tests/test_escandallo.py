@@ -0,0 +1,146 @@
+import copy
+import math
+import pickle
+import random
+
+import pytest
+
+from escandallo import (
+    Escandallo,
+    FabricRule,
+    FillingRule,
+    HardwareItem,
+    LaborItem,
+    MaterialItem,
+)
+
+
+class CountingMaterial(MaterialItem):
+    reads = 0
+
+    @property
+    def total_cost(self):
+        CountingMaterial.reads += 1
+        return self.unit_cost * self.quantity
+
+
+def build(lines=3):
+    escandallo = Escandallo(
+        module_id="SOFA-3P",
+        measurements={"width": 200, "height": 85, "depth": 95},
+        materials=[
+            MaterialItem(f"tela-{index}", "fabric", 12.5 + index, metadata={"layers": 1})
+            for index in range(lines)
+        ]
+        + [MaterialItem("espuma", "filling", 3.2)],
+        labor=[LaborItem("tapizado", 18.0, 2.5)],
+        hardware=[HardwareItem("patas", 1.75, 4)],
+        rules={"fabric": FabricRule("fabric", 140), "filling": FillingRule("filling", 30)},
+    )
+    escandallo.recalculate()
+    return escandallo
+
+
+def expected_totals(escandallo):
+    return tuple(
+        math.fsum(line.total_cost for line in lines)
+        for lines in (escandallo.materials, escandallo.labor, escandallo.hardware)
+    )
+
+
+def totals(escandallo):
+    return (
+        escandallo.total_material_cost(),
+        escandallo.total_labor_cost(),
+        escandallo.total_hardware_cost(),
+    )
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_edits_match_fresh_totals_exactly(seed):
+    rng = random.Random(seed)
+    escandallo = build()
+    for _ in range(300):
+        action = rng.randrange(9)
+        if action == 0:
+            escandallo.update_measurements({rng.choice(["width", "height"]): rng.uniform(50, 250)})
+        elif action == 1:
+            escandallo.update_material("espuma", unit_cost=rng.uniform(0.1, 9))
+        elif action == 2:
+            rng.choice(escandallo.materials).unit_cost = rng.choice([1e16, 1e-3, rng.random()])
+        elif action == 3:
+            escandallo.labor[0].hours = rng.uniform(0, 8)
+        elif action == 4:
+            escandallo.hardware.append(HardwareItem("tornillo", rng.random(), rng.randint(1, 9)))
+        elif action == 5 and len(escandallo.hardware) > 1:
+            escandallo.hardware.pop(rng.randrange(len(escandallo.hardware)))
+        elif action == 6:
+            names = [line.name for line in escandallo.materials]
+            escandallo.materials[names.index("tela-0")] = MaterialItem(
+                "tela-0", "fabric", rng.uniform(5, 30)
+            )
+            escandallo.recalculate()
+        elif action == 7:
+            escandallo.rules["fabric"] = FabricRule("fabric", rng.choice([120, 140, 280]))
+            escandallo.recalculate()
+        else:
+            escandallo.materials.reverse()
+        if rng.random() < 0.5:
+            assert totals(escandallo) == expected_totals(escandallo)
+    assert totals(escandallo) == expected_totals(escandallo)
+
+
+def test_running_total_does_not_drift():
+    escandallo = Escandallo(
+        module_id="X",
+        measurements={},
+        materials=[MaterialItem("grande", "x", 1e16, 1), MaterialItem("chica", "x", 1.0, 1)],
+    )
+    escandallo.total_material_cost()
+    for step in range(1000):
+        escandallo.materials[0].unit_cost = 1e16 if step % 2 else 3.0
+        escandallo.materials[1].unit_cost = 0.1 * step
+        escandallo.total_material_cost()
+
+    assert escandallo.total_material_cost() == math.fsum(
+        line.total_cost for line in escandallo.materials
+    )
+
+
+def test_read_reprices_only_edited_lines():
+    escandallo = Escandallo(
+        module_id="X",
+        measurements={},
+        materials=[CountingMaterial(f"m{index}", "x", 1.0, index) for index in range(100)],
+    )
+    escandallo.total_material_cost()
+
+    CountingMaterial.reads = 0
+    escandallo.materials[42].quantity = 7
+    assert escandallo.total_material_cost() == math.fsum(range(100)) - 42 + 7
+    assert escandallo.total_material_cost() == math.fsum(range(100)) - 42 + 7
+    assert CountingMaterial.reads == 1
+
+
+def test_update_material_picks_up_measurements_edited_in_place():
+    escandallo = build(lines=1)
+    escandallo.measurements["width"] = 300
+
+    escandallo.update_material("tela-0", unit_cost=20)
+
+    rule = escandallo.rules["fabric"]
+    line = escandallo.materials[0]
+    assert line.quantity == rule.calculate_quantity(escandallo.measurements, line)
+    assert escandallo.total_material_cost() == expected_totals(escandallo)[0]
+
+
+def test_copies_keep_their_own_cache():
+    escandallo = build()
+    for clone in (copy.deepcopy(escandallo), pickle.loads(pickle.dumps(escandallo))):
+        assert clone == escandallo
+        clone.materials[0].unit_cost = 99
+        clone.labor[0].hours = 10
+
+        assert totals(clone) == expected_totals(clone)
+        assert totals(escandallo) == expected_totals(escandallo)
+        assert totals(clone) != totals(escandallo)
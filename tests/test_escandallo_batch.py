@@ -0,0 +1,100 @@
+import random
+
+import numpy as np
+import pytest
+
+from escandallo import (
+    Escandallo,
+    FabricRule,
+    FillingRule,
+    HardwareItem,
+    LaborItem,
+    MaterialItem,
+)
+from escandallo_batch import FabricCatalogue, ModuleBatch, cost_catalogue
+
+FABRICS = {
+    "lino": (FabricRule("fabric", 140), 18.5),
+    "terciopelo": (FabricRule("fabric", 280), 31.0),
+    # Widths below 1 are clamped to 1 by both paths.
+    "retal": (FabricRule("fabric", 0.5), 2.0),
+}
+
+
+def random_escandallo(rng, index):
+    materials = [
+        MaterialItem(
+            f"tela-{line}",
+            "fabric",
+            0,
+            metadata={"seam_allowance": rng.choice([0, 1.5, 3]), "layers": rng.randint(1, 3)},
+        )
+        for line in range(rng.choice([0, 1, 1, 2]))
+    ]
+    materials += [MaterialItem("espuma", "filling", rng.uniform(1, 6))] * rng.randint(0, 2)
+    materials.append(MaterialItem("cremallera", "accesorio", rng.uniform(0, 3), rng.randint(1, 4)))
+    measurements = {"width": rng.uniform(40, 260), "height": rng.uniform(30, 110)}
+    if rng.random() < 0.8:
+        measurements["depth"] = rng.uniform(50, 120)
+    return Escandallo(
+        module_id=f"mod-{index}",
+        measurements=measurements,
+        materials=materials,
+        labor=[LaborItem("tapizado", 21.0, rng.uniform(0.5, 4))],
+        hardware=[HardwareItem("patas", 1.5, rng.randint(0, 6))],
+        rules={"fabric": FabricRule("fabric", 140), "filling": FillingRule("filling", 28)},
+    )
+
+
+def scalar_cost(escandallo, rule, price):
+    """Cost the escandallo object by object in one fabric."""
+    escandallo.rules["fabric"] = rule
+    for material in escandallo.materials:
+        if material.material_type == "fabric":
+            material.unit_cost = price
+    escandallo.recalculate()
+    meters = [m.quantity for m in escandallo.materials if m.material_type == "fabric"]
+    return escandallo.total_cost(), meters
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_cost_matrix_matches_object_costing(seed):
+    rng = random.Random(seed)
+    escandallos = [random_escandallo(rng, index) for index in range(40)]
+    catalogue = FabricCatalogue.from_rules(FABRICS)
+    batch = ModuleBatch.from_escandallos(escandallos)
+
+    matrix = batch.cost_matrix(catalogue)
+
+    for column, name in enumerate(catalogue.names):
+        rule, price = FABRICS[name]
+        for row, escandallo in enumerate(escandallos):
+            total, meters = scalar_cost(escandallo, rule, price)
+            assert matrix.total[row, column] == pytest.approx(total, rel=1e-12, abs=1e-9)
+            # The batch adds a module's fabric lines; each line is bit-identical.
+            assert matrix.meters[row, column] == pytest.approx(sum(meters), rel=1e-15)
+            if len(meters) == 1:
+                assert matrix.meters[row, column] == meters[0]
+
+
+def test_modules_without_fabric_cost_their_base_in_every_fabric():
+    escandallo = Escandallo(
+        module_id="pouf",
+        measurements={"width": 50, "height": 40, "depth": 50},
+        materials=[MaterialItem("espuma", "filling", 4.0)],
+        rules={"filling": FillingRule("filling", 25)},
+    )
+    escandallo.recalculate()
+
+    matrix = cost_catalogue([escandallo], FabricCatalogue.from_rules(FABRICS))
+
+    assert np.all(matrix.meters == 0)
+    assert matrix.total.tolist() == [[escandallo.total_cost()] * len(FABRICS)]
+    assert matrix.cheapest_fabrics() == {"pouf": "lino"}
+
+
+def test_empty_batch():
+    matrix = cost_catalogue([], FabricCatalogue.from_rules(FABRICS))
+
+    assert matrix.total.shape == (0, len(FABRICS))
+    assert matrix.cheapest_fabrics() == {}
@@ -0,0 +1,84 @@
+import copy
+import pickle
+
+import pytest
+
+from escandallo import Escandallo, FabricRule, FillingRule, MaterialItem
+from escandallo_formulas import FormulaRule, as_formula_rule, compile_formula
+
+MEASUREMENTS = {"width": 180, "height": 85, "depth": 95}
+
+
+def clones(value):
+    return [
+        pickle.loads(pickle.dumps(value)),
+        copy.deepcopy(value),
+        copy.copy(value),
+    ]
+
+
+def test_formula_rule_survives_pickle_and_copy():
+    rule = FormulaRule(
+        "tela",
+        "max(width, depth) * height * metadata.layers / roll_width",
+        parameters={"roll_width": 140},
+        defaults={"height": 80, "metadata.layers": 2},
+    )
+    material = MaterialItem("tela", "tela", 10.0, metadata={"layers": 3})
+
+    for clone in clones(rule):
+        assert clone == rule
+        assert clone.measurement_keys == rule.measurement_keys
+        assert clone.metadata_keys == rule.metadata_keys
+        assert clone.calculate_quantity(MEASUREMENTS, material) == rule.calculate_quantity(
+            MEASUREMENTS, material
+        )
+        assert clone.evaluate({"width": 100}, {}) == rule.evaluate({"width": 100}, {})
+
+
+def test_copies_do_not_share_parameters():
+    rule = FormulaRule("tela", "width / roll_width", parameters={"roll_width": 140})
+
+    clone = copy.deepcopy(rule)
+    clone.parameters["roll_width"] = 1
+
+    assert rule.parameters == {"roll_width": 140}
+
+
+def test_compiled_formula_pickles():
+    compiled = compile_formula("abs(width - depth) + min(height, 3)")
+
+    restored = pickle.loads(pickle.dumps(compiled))
+
+    assert restored == compiled
+    assert restored.function(1, 5, 10) == compiled.function(1, 5, 10)
+
+
+def test_escandallo_with_formula_rules_pickles():
+    escandallo = Escandallo(
+        module_id="SOFA",
+        measurements=dict(MEASUREMENTS),
+        materials=[MaterialItem("tela", "fabric", 15.0), MaterialItem("espuma", "filling", 3.0)],
+        rules={
+            "fabric": as_formula_rule(FabricRule("fabric", 140)),
+            "filling": as_formula_rule(FillingRule("filling", 28)),
+        },
+    )
+    escandallo.recalculate()
+
+    restored = pickle.loads(pickle.dumps(escandallo))
+    restored.update_measurements({"width": 200})
+    escandallo.update_measurements({"width": 200})
+
+    assert restored.total_cost() == escandallo.total_cost()
+
+
+@pytest.mark.parametrize("rule", [FabricRule("fabric", 140), FillingRule("filling", 28)])
+def test_builtin_rules_as_formulas_give_identical_quantities(rule):
+    material = MaterialItem("linea", rule.material_type, 1.0, metadata={"seam_allowance": 2})
+
+    formula = as_formula_rule(rule)
+
+    assert formula.calculate_quantity(MEASUREMENTS, material) == rule.calculate_quantity(
+        MEASUREMENTS, material
+    )
@@ -0,0 +1,139 @@
+import copy
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from escandallo import EscandalloSnapshot, HistoryChange, SnapshotHistory
+
+INICIO = datetime(2026, 3, 2, 8, 0)
+
+
+def random_data(rng, previous=None):
+    data = copy.deepcopy(previous) if previous else {"module_id": "M", "materials": []}
+    for _ in range(rng.randint(1, 3)):
+        action = rng.randrange(5)
+        materials = data["materials"]
+        if action == 0 or not materials:
+            materials.append({"name": f"m{rng.randrange(99)}", "quantity": rng.randint(0, 5)})
+        elif action == 1:
+            materials.pop(rng.randrange(len(materials)))
+        elif action == 2:
+            # 1 and 1.0 compare equal but must not be merged.
+            rng.choice(materials)["quantity"] = rng.choice([1, 1.0, rng.random()])
+        elif action == 3:
+            data["note"] = rng.choice(["a", "b", None])
+        else:
+            data.pop("note", None)
+    return data
+
+
+def random_snapshots(seed, count=60):
+    rng = random.Random(seed)
+    snapshots, data = [], None
+    for step in range(count):
+        data = random_data(rng, data)
+        snapshots.append(
+            EscandalloSnapshot(
+                timestamp=INICIO + timedelta(minutes=step), reason=f"paso {step}", data=data
+            )
+        )
+    return snapshots
+
+
+def assert_same(history, snapshots):
+    assert history == snapshots
+    for stored, expected in zip(history, snapshots):
+        assert repr(stored.data) == repr(expected.data)
+
+
+@pytest.mark.parametrize("keyframe_interval", [1, 3, 50])
+@pytest.mark.parametrize("seed", range(4))
+def test_round_trips_every_snapshot(seed, keyframe_interval):
+    snapshots = random_snapshots(seed)
+    history = SnapshotHistory(keyframe_interval=keyframe_interval)
+    versions = [history.append(snapshot) for snapshot in snapshots]
+
+    assert_same(history, snapshots)
+    assert versions == history.versions() == list(range(1, len(snapshots) + 1))
+    for position in (0, 17, len(snapshots) - 1):
+        assert history[position] == snapshots[position]
+        assert history.reconstruct(versions[position]) == snapshots[position].data
+
+
+def test_stored_data_is_isolated_from_callers():
+    data = {"materials": [{"name": "tela", "quantity": 2}]}
+    history = SnapshotHistory()
+    history.append(EscandalloSnapshot(INICIO, "alta", data))
+
+    data["materials"][0]["quantity"] = 9
+    history[0].data["materials"].clear()
+
+    assert history.reconstruct(1) == {"materials": [{"name": "tela", "quantity": 2}]}
+
+
+def test_sequence_edits_match_a_list_and_keep_versions():
+    snapshots = random_snapshots(7, count=20)
+    history = SnapshotHistory(keyframe_interval=4)
+    for snapshot in snapshots:
+        history.append(snapshot)
+    model = list(snapshots)
+    versions = history.versions()
+
+    history[5] = model[5] = snapshots[0]
+    del history[2:4], model[2:4], versions[2:4]
+    history.insert(1, snapshots[-1])
+    model.insert(1, snapshots[-1])
+    versions.insert(1, 21)
+    history.reverse()
+    model.reverse()
+    versions.reverse()
+
+    assert_same(history, model)
+    assert history.versions() == versions
+    assert history.reconstruct(21) == snapshots[-1].data
+
+
+def test_eviction_keeps_recent_versions_reconstructible():
+    snapshots = random_snapshots(3, count=30)
+    history = SnapshotHistory(keyframe_interval=10, max_versions=7)
+    for snapshot in snapshots:
+        history.append(snapshot)
+
+    assert history.versions() == list(range(24, 31))
+    assert_same(history, snapshots[-7:])
+    with pytest.raises(ValueError, match="Version 23"):
+        history.reconstruct(23)
+
+
+def test_max_age_drops_old_snapshots_but_keeps_the_last():
+    snapshots = random_snapshots(5, count=10)
+    history = SnapshotHistory(max_age=timedelta(minutes=3))
+    for snapshot in snapshots:
+        history.append(snapshot)
+
+    assert history.versions() == [7, 8, 9, 10]
+
+    history.append(EscandalloSnapshot(INICIO + timedelta(days=1), "tarde", snapshots[0].data))
+    assert history.versions() == [11]
+
+
+def test_clear_keeps_version_numbers_increasing():
+    history = SnapshotHistory()
+    history.append(EscandalloSnapshot(INICIO, "a", {"x": 1}))
+    history.clear()
+
+    assert history.append(EscandalloSnapshot(INICIO, "b", {"x": 2})) == 2
+    assert history.versions() == [2]
+
+
+def test_diff_lists_changed_paths():
+    history = SnapshotHistory()
+    history.append(EscandalloSnapshot(INICIO, "a", {"materials": [{"quantity": 1}], "x": 1}))
+    history.append(EscandalloSnapshot(INICIO, "b", {"materials": [{"quantity": 2}, {}]}))
+
+    assert history.diff(1, 2) == [
+        HistoryChange(path=("materials", 0, "quantity"), old=1, new=2),
+        HistoryChange(path=("materials", 1), old=None, new={}),
+        HistoryChange(path=("x",), old=1, new=None),
+    ]
@@ -0,0 +1,125 @@
+import copy
+import multiprocessing
+import random
+
+import pytest
+
+import escandallo_simulation
+from escandallo import (
+    Escandallo,
+    FabricRule,
+    FillingRule,
+    HardwareItem,
+    LaborItem,
+    MaterialItem,
+)
+from escandallo_simulation import Scenario, WhatIfSimulator, scenario_cost
+
+SCENARIOS = [
+    Scenario("tela +10%", price_factors={"tela": 1.1}),
+    Scenario("más ancho", measurement_overrides={"width": 240}),
+    Scenario(
+        "ambos", price_factors={"tela": 1.1, "espuma": 0.8}, measurement_overrides={"depth": 80}
+    ),
+]
+
+
+def build_escandallos(count, seed=3):
+    rng = random.Random(seed)
+    escandallos = []
+    for index in range(count):
+        escandallo = Escandallo(
+            module_id=f"modelo-{index % 4}",
+            measurements={
+                "width": rng.uniform(60, 220),
+                "height": rng.uniform(70, 95),
+                "depth": rng.uniform(80, 110),
+            },
+            materials=[
+                MaterialItem("tela", "fabric", rng.uniform(12, 30), metadata={"layers": 1}),
+                MaterialItem("espuma", "filling", rng.uniform(2, 5)),
+                MaterialItem("grapas", "consumible", 0.02, rng.randint(50, 200)),
+            ],
+            labor=[LaborItem("tapizado", 20.0, rng.uniform(1, 3))],
+            hardware=[HardwareItem("patas", 1.5, 4)],
+            rules={"fabric": FabricRule("fabric", 140), "filling": FillingRule("filling", 28)},
+        )
+        escandallo.recalculate()
+        escandallos.append(escandallo)
+    return escandallos
+
+
+def applied_cost(escandallo, scenario):
+    """Cost after applying the scenario to a copy of the escandallo."""
+    clone = copy.deepcopy(escandallo)
+    for material in clone.materials:
+        material.unit_cost *= scenario.price_factors.get(material.name, 1.0)
+    if scenario.measurement_overrides:
+        clone.update_measurements(dict(scenario.measurement_overrides))
+    return clone.total_cost()
+
+
+def test_scenario_cost_matches_applying_the_scenario():
+    for escandallo in build_escandallos(10):
+        before = copy.deepcopy(escandallo)
+        for scenario in SCENARIOS:
+            assert scenario_cost(escandallo, scenario) == pytest.approx(
+                applied_cost(escandallo, scenario), rel=1e-12
+            )
+        assert escandallo == before
+
+
+def expected_results(escandallos, scenarios):
+    results = []
+    for scenario in scenarios:
+        baseline, simulated = {}, {}
+        for escandallo in escandallos:
+            model = escandallo.module_id
+            baseline[model] = baseline.get(model, 0.0) + escandallo.total_cost()
+            simulated[model] = simulated.get(model, 0.0) + applied_cost(escandallo, scenario)
+        results.append((scenario.name, baseline, simulated))
+    return results
+
+
+def assert_results(results, expected):
+    assert [result.scenario for result in results] == [name for name, _, _ in expected]
+    for result, (_, baseline, simulated) in zip(results, expected):
+        assert result.baseline == pytest.approx(baseline, rel=1e-12)
+        assert result.simulated == pytest.approx(simulated, rel=1e-12)
+
+
+@pytest.mark.parametrize("processes, chunk_size", [(1, 1000), (1, 3), (2, 7)])
+def test_simulator_aggregates_per_model(processes, chunk_size):
+    escandallos = build_escandallos(30)
+
+    results = WhatIfSimulator(escandallos, processes=processes, chunk_size=chunk_size).run(
+        SCENARIOS
+    )
+
+    assert_results(results, expected_results(escandallos, SCENARIOS))
+    assert escandallo_simulation._ESCANDALLOS == ()
+
+
+def test_spawned_workers_receive_the_escandallos(monkeypatch):
+    monkeypatch.setattr(multiprocessing, "get_all_start_methods", lambda: ["spawn"])
+    escandallos = build_escandallos(12)
+
+    results = WhatIfSimulator(escandallos, processes=2, chunk_size=5).run(SCENARIOS[:1])
+
+    assert_results(results, expected_results(escandallos, SCENARIOS[:1]))
+
+
+def test_model_of_and_deltas():
+    escandallos = build_escandallos(8)
+    simulator = WhatIfSimulator(escandallos, model_of=lambda escandallo: "todos", processes=1)
+
+    (result,) = simulator.run([Scenario("tela gratis", price_factors={"tela": 0.0})])
+
+    fabric = sum(material.total_cost for e in escandallos for material in e.materials[:1])
+    assert result.deltas == {"todos": pytest.approx(-fabric, rel=1e-12)}
+    assert result.total_delta == pytest.approx(-fabric, rel=1e-12)
+
+
+def test_chunk_size_must_be_positive():
+    with pytest.raises(ValueError, match="chunk_size"):
+        WhatIfSimulator([], chunk_size=0)
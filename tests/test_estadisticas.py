@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from fabrica import EstadisticasEstaciones
+from fabrica.produccion import Estacion, Modulo, OrdenProduccion, Pedido
+
+INICIO = datetime(2026, 3, 2, 8, 0)
+
+
+def orden(id_orden: str, minutos: dict, skus=("SOFA-3P", "CHAISE")) -> OrdenProduccion:
+    pedido = Pedido(id_orden, "cliente", [Modulo(sku, sku, 1) for sku in skus])
+    orden = OrdenProduccion(id_orden, pedido)
+    for estacion, duracion in minutos.items():
+        orden.registrar_inicio(estacion, INICIO)
+        orden.registrar_fin(estacion, INICIO + timedelta(minutes=duracion))
+    return orden
+
+
+def test_valor_negativo_no_deja_el_acumulador_a_medias():
+    estadisticas = EstadisticasEstaciones()
+    estadisticas.registrar(Estacion.CORTE, "SOFA-3P", 12)
+
+    with pytest.raises(ValueError):
+        estadisticas.registrar(Estacion.CORTE, "SOFA-3P", -1)
+    with pytest.raises(ValueError):
+        estadisticas.registrar(Estacion.COSTURA, "SOFA-3P", -1)
+
+    resumen = estadisticas.resumen(Estacion.CORTE, "SOFA-3P")
+    assert (resumen.n, resumen.media, resumen.p50) == (1, 12, pytest.approx(12, rel=0.02))
+    assert estadisticas.resumen(Estacion.COSTURA) is None
+
+
+def test_orden_con_una_estacion_negativa_no_registra_ninguna():
+    estadisticas = EstadisticasEstaciones()
+    estadisticas.registrar_orden(orden("OP-1", {Estacion.CORTE: 20, Estacion.COSTURA: 40}))
+
+    invalida = orden("OP-2", {Estacion.CORTE: 30, Estacion.COSTURA: -10})
+    with pytest.raises(ValueError):
+        estadisticas.registrar_orden(invalida)
+
+    for sku in ("SOFA-3P", "CHAISE", None):
+        assert estadisticas.resumen(Estacion.CORTE, sku).n == 1
+        assert estadisticas.resumen(Estacion.COSTURA, sku).n == 1
+    assert estadisticas.resumen(Estacion.CORTE).media == 10
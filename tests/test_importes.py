@@ -0,0 +1,128 @@
+import random
+from decimal import Decimal, localcontext
+
+import pytest
+
+from fabrica_ventas import (
+    Cliente,
+    ImporteFijo,
+    LineaOrdenVenta,
+    Moneda,
+    Money,
+    OrdenVenta,
+    SumadorImportes,
+    componer_importe,
+    descomponer_importe,
+    total_ordenes,
+    totales_ordenes,
+)
+
+EUR = Moneda("EUR", "€")
+USD = Moneda("USD", "$")
+CLIENTE = Cliente("CLI", "Cliente")
+
+
+def importe_aleatorio(aleatorio, cifras=30):
+    signo = "-" if aleatorio.random() < 0.2 else ""
+    digitos = str(aleatorio.randint(1, 10 ** aleatorio.randint(1, cifras)))
+    return Decimal(f"{signo}{digitos}E{aleatorio.randint(-8, 4)}")
+
+
+def orden(numero, *lineas, moneda=EUR):
+    orden = OrdenVenta(numero, CLIENTE, moneda)
+    for cantidad, importe in lineas:
+        orden.lineas.append(LineaOrdenVenta("SKU", "Módulo", cantidad, Money(importe, moneda)))
+    return orden
+
+
+def misma_representacion(a, b):
+    return a.compare_total(b) == 0
+
+
+@pytest.mark.parametrize("semilla", range(5))
+def test_descomponer_y_componer_son_exactos(semilla):
+    aleatorio = random.Random(semilla)
+    with localcontext() as contexto:
+        contexto.prec = 3
+        for _ in range(200):
+            importe = importe_aleatorio(aleatorio)
+            unidades, exponente = descomponer_importe(importe)
+            assert exponente == importe.as_tuple().exponent
+            assert misma_representacion(componer_importe(unidades, exponente), importe)
+
+
+@pytest.mark.parametrize("importe", ["Infinity", "-Infinity", "NaN", "sNaN"])
+def test_descomponer_rechaza_importes_no_finitos(importe):
+    with pytest.raises(ValueError, match="finitos"):
+        descomponer_importe(Decimal(importe))
+
+
+@pytest.mark.parametrize("semilla", range(5))
+def test_sumador_igual_que_orden_total(semilla):
+    aleatorio = random.Random(semilla)
+    # Con importes que caben en la precisión del contexto, ``OrdenVenta.total`` no redondea.
+    catalogo = [importe_aleatorio(aleatorio, cifras=10) for _ in range(6)]
+    ordenes = [
+        orden(
+            f"OV-{indice}",
+            *[
+                (aleatorio.randint(0, 9), aleatorio.choice(catalogo))
+                for _ in range(aleatorio.randint(0, 8))
+            ],
+        )
+        for indice in range(50)
+    ]
+
+    totales = totales_ordenes(ordenes)
+
+    for o in ordenes:
+        assert misma_representacion(totales[o.numero].importe, o.total().importe)
+    esperado = sum((o.total().importe for o in ordenes), Decimal("0"))
+    assert misma_representacion(total_ordenes(ordenes, EUR).importe, esperado)
+
+
+def test_sumador_es_exacto_con_poca_precision():
+    o = orden("OV-1", (3, Decimal("123456.78")), (7, Decimal("0.01")), (1, Decimal("1E+6")))
+
+    with localcontext() as contexto:
+        contexto.prec = 4
+        redondeado = o.total().importe
+        total = SumadorImportes().sumar_lineas(o.lineas, EUR).importe
+
+    assert redondeado != Decimal("1370370.41")
+    assert misma_representacion(total, Decimal("1370370.41"))
+
+
+def test_uno_coma_cero_y_uno_coma_cero_cero_no_comparten_representacion():
+    sumador = SumadorImportes()
+
+    dos_decimales = sumador.sumar_lineas(orden("A", (1, Decimal("1.00"))).lineas, EUR)
+    un_decimal = sumador.sumar_lineas(orden("B", (1, Decimal("1.0"))).lineas, EUR)
+
+    assert str(dos_decimales.importe) == "1.00"
+    assert str(un_decimal.importe) == "1.0"
+
+
+def test_cache_de_precios_lru_acotada():
+    sumador = SumadorImportes(maximo_precios=2)
+    uno, dos, tres = Decimal("1.10"), Decimal("2.20"), Decimal("3.30")
+
+    for importe in (uno, dos, uno, tres):
+        sumador.sumar(orden("OV", (1, importe)).lineas, EUR)
+
+    # ``dos`` fue el menos usado recientemente; ``uno`` se reutilizó antes de ``tres``.
+    assert list(sumador._precios) == [uno, tres]
+    total = sumador.sumar(orden("OV", (2, dos), (1, uno), (4, tres), (1, dos)).lineas, EUR)
+    assert len(sumador._precios) == 2
+    assert total == ImporteFijo(2 * 220 + 110 + 4 * 330 + 220, -2, EUR)
+
+
+def test_errores():
+    with pytest.raises(ValueError, match="positivo"):
+        SumadorImportes(maximo_precios=0)
+    mezclada = orden("OV", (1, Decimal("1")))
+    mezclada.lineas.append(LineaOrdenVenta("SKU", "Módulo", 1, Money(Decimal("1"), USD)))
+    with pytest.raises(ValueError, match="monedas distintas"):
+        totales_ordenes([mezclada])
+    with pytest.raises(ValueError, match="monedas distintas"):
+        ImporteFijo(1, 0, EUR) + ImporteFijo(1, 0, USD)
@@ -0,0 +1,170 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+from fabrica_ventas import (
+    Cliente,
+    EstadoOrdenVenta,
+    LineaOrdenVenta,
+    Moneda,
+    Money,
+    OrdenVenta,
+)
+from fabrica_ventas import informes
+from fabrica_ventas.informes import InformeVentas
+
+EUR = Moneda("EUR", "€")
+INICIO = date(2026, 1, 1)
+CLIENTES = [Cliente(f"CLI-{indice}", f"Cliente {indice}") for indice in range(4)]
+ESTADOS = list(EstadoOrdenVenta)
+# ``desde`` obliga a recorrer las columnas aunque la consulta quepa en un rollup.
+POR_COLUMNAS = {"desde": date.min}
+CONSULTAS = [
+    {"agrupar_por": ()},
+    {"agrupar_por": ("cliente", "mes", "estado")},
+    {"agrupar_por": ("sku", "estado"), "estados": ["creado", "enviado"]},
+    {"agrupar_por": ("mes",), "clientes": ["CLI-1", "CLI-3", "desconocido"]},
+    {"agrupar_por": ("sku",), "skus": ["SKU-1", "SKU-2"]},
+]
+
+
+def orden_aleatoria(aleatorio, numero):
+    orden = OrdenVenta(
+        numero,
+        aleatorio.choice(CLIENTES),
+        EUR,
+        INICIO + timedelta(days=aleatorio.randint(0, 120)),
+        aleatorio.choice(ESTADOS),
+    )
+    for _ in range(aleatorio.randint(0, 4)):
+        precio = Money(Decimal(aleatorio.randint(-500, 90_000)) / 100, EUR)
+        orden.agregar_linea(
+            LineaOrdenVenta(
+                f"SKU-{aleatorio.randint(0, 5)}", "Módulo", aleatorio.randint(0, 6), precio
+            )
+        )
+    return orden
+
+
+def esperado(ordenes, agrupar_por=(), clientes=None, skus=None, estados=None):
+    filas = {}
+    for orden in ordenes:
+        for linea in orden.lineas:
+            valores = {
+                "cliente": orden.cliente.identificador,
+                "sku": linea.sku,
+                "estado": orden.estado.value,
+                "mes": orden.fecha.strftime("%Y-%m"),
+            }
+            if (
+                (clientes is not None and valores["cliente"] not in clientes)
+                or (skus is not None and valores["sku"] not in skus)
+                or (estados is not None and valores["estado"] not in estados)
+            ):
+                continue
+            grupo = tuple(valores[dimension] for dimension in agrupar_por)
+            importe, cantidad, lineas = filas.get(grupo, (Decimal("0.00"), 0, 0))
+            filas[grupo] = (
+                importe + linea.precio_unitario.importe * linea.cantidad,
+                cantidad + linea.cantidad,
+                lineas + 1,
+            )
+    return sorted(
+        (grupo, importe, cantidad, lineas) for grupo, (importe, cantidad, lineas) in filas.items()
+    )
+
+
+def obtenido(informe, **consulta):
+    return [
+        (fila.grupo, fila.importe, fila.cantidad, fila.lineas)
+        for fila in informe.consultar(**consulta)
+    ]
+
+
+def simular(semilla, pasos=300, nuevas=0.5):
+    """Registra, sustituye y cambia de estado órdenes al azar; devuelve las vigentes."""
+    aleatorio = random.Random(semilla)
+    informe = InformeVentas(EUR)
+    vigentes = {}
+    for paso in range(pasos):
+        accion = aleatorio.random()
+        if accion < nuevas or not vigentes:
+            orden = orden_aleatoria(aleatorio, f"OV-{paso}")
+        elif accion < 0.8:
+            # Nueva versión de una orden ya registrada: sustituye sus filas.
+            orden = orden_aleatoria(aleatorio, aleatorio.choice(list(vigentes)))
+        else:
+            vigentes[aleatorio.choice(list(vigentes))].actualizar_estado(aleatorio.choice(ESTADOS))
+            continue
+        informe.registrar_orden(orden)
+        vigentes[orden.numero] = orden
+    return informe, list(vigentes.values())
+
+
+@pytest.mark.parametrize("consulta", CONSULTAS)
+@pytest.mark.parametrize("semilla", range(3))
+def test_rollups_y_columnas_coinciden_con_las_ordenes(semilla, consulta):
+    informe, ordenes = simular(semilla)
+
+    assert obtenido(informe, **consulta) == esperado(ordenes, **consulta)
+    assert obtenido(informe, **consulta, **POR_COLUMNAS) == esperado(ordenes, **consulta)
+    assert len(informe) == sum(len(orden.lineas) for orden in ordenes)
+
+
+@pytest.mark.parametrize("semilla", range(3))
+def test_compacta_las_filas_de_ordenes_sustituidas(semilla, monkeypatch):
+    monkeypatch.setattr(informes, "_MIN_FILAS_MUERTAS", 20)
+    compactaciones = []
+    compactar = InformeVentas._compactar
+    monkeypatch.setattr(
+        InformeVentas, "_compactar", lambda self: compactaciones.append(compactar(self))
+    )
+
+    informe, ordenes = simular(semilla, nuevas=0.1)
+
+    assert compactaciones
+    filas, muertas = len(informe._columnas["activa"]), informe._filas_muertas
+    assert muertas < 20 or 2 * muertas <= filas
+    assert filas - muertas == len(informe)
+    # Cada orden conserva sus filas tras recolocarlas.
+    for orden in ordenes:
+        inicio, fin = informe._ordenes[orden.numero]
+        codigos = informe._columnas["sku"][inicio:fin]
+        assert [informe._valores["sku"][codigo] for codigo in codigos] == [
+            linea.sku for linea in orden.lineas
+        ]
+    for consulta in CONSULTAS:
+        assert obtenido(informe, **consulta) == esperado(ordenes, **consulta)
+        assert obtenido(informe, **consulta, **POR_COLUMNAS) == esperado(ordenes, **consulta)
+
+
+def test_compactar_descarta_la_instantanea(monkeypatch):
+    monkeypatch.setattr(informes, "_MIN_FILAS_MUERTAS", 2)
+    informe = InformeVentas(EUR)
+    orden = OrdenVenta("OV-1", CLIENTES[0], EUR, INICIO)
+    for sku in ("SKU-0", "SKU-1", "SKU-2"):
+        orden.agregar_linea(LineaOrdenVenta(sku, "Módulo", 1, Money(Decimal("1.50"), EUR)))
+    informe.registrar_orden(orden)
+    informe.consultar(**POR_COLUMNAS)
+
+    orden.lineas.pop()
+    informe.registrar_orden(orden)
+
+    assert len(informe._columnas["activa"]) == 2
+    assert obtenido(informe, agrupar_por=("sku",), **POR_COLUMNAS) == esperado(
+        [orden], agrupar_por=("sku",)
+    )
+
+
+def test_errores():
+    informe = InformeVentas(EUR)
+    with pytest.raises(ValueError, match="no está registrada"):
+        informe.cambiar_estado("OV-1", "enviado")
+    with pytest.raises(ValueError, match="Dimensiones desconocidas: color"):
+        informe.consultar(agrupar_por=("color",))
+    orden = OrdenVenta("OV-1", CLIENTES[0], EUR)
+    orden.agregar_linea(LineaOrdenVenta("SKU", "Módulo", 1, Money(Decimal("0.001"), EUR)))
+    with pytest.raises(ValueError, match="más decimales"):
+        informe.registrar_orden(orden)
@@ -0,0 +1,82 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from inventory import (
+    ColumnarMovementStore,
+    InventoryLedger,
+    Location,
+    MovementType,
+    StockMovement,
+    StockType,
+)
+
+INICIO = datetime(2026, 3, 2, 8, 0)
+UBICACIONES = [Location("A", "1"), Location("A", "2"), Location("B", "1")]
+
+
+def movimientos_aleatorios(semilla: int, cantidad: int, desordenados: bool):
+    aleatorio = random.Random(semilla)
+    movimientos = []
+    for numero in range(cantidad):
+        minutos = aleatorio.randrange(cantidad * 3) if desordenados else numero * 3
+        movimientos.append(
+            StockMovement(
+                movement_id=f"M{numero}",
+                stock_type=aleatorio.choice(list(StockType)),
+                movement_type=aleatorio.choice(list(MovementType)),
+                quantity=aleatorio.randint(1, 50),
+                location=aleatorio.choice(UBICACIONES),
+                occurred_at=INICIO + timedelta(minutes=minutos),
+            )
+        )
+    return movimientos
+
+
+def saldos_recorriendo(movimientos, hasta=None):
+    saldos = {}
+    for m in movimientos:
+        if hasta is not None and m.occurred_at > hasta:
+            continue
+        signo = -1 if m.movement_type == MovementType.SALIDA else 1
+        clave = (m.location, m.stock_type)
+        saldos[clave] = saldos.get(clave, 0) + signo * m.quantity
+    return saldos
+
+
+@pytest.mark.parametrize("almacen", [list, ColumnarMovementStore])
+@pytest.mark.parametrize("desordenados", [False, True])
+def test_saldos_historicos_equivalen_a_recorrer_los_movimientos(almacen, desordenados):
+    movimientos = movimientos_aleatorios(3, 300, desordenados)
+    ledger = InventoryLedger(almacen(), checkpoint_interval=25)
+    for m in movimientos:
+        ledger.record_movement(m)
+
+    assert ledger.balances() == saldos_recorriendo(movimientos)
+    for minutos in (-1, 0, 1, 74, 75, 76, 450, 899, 2000):
+        hasta = INICIO + timedelta(minutes=minutos)
+        esperado = saldos_recorriendo(movimientos, hasta)
+        # Un checkpoint puede traer claves que aún no se habían movido, a cero.
+        obtenido = {k: v for k, v in ledger.balances(hasta).items() if v or k in esperado}
+        assert obtenido == esperado
+
+
+def test_saldos_con_fechas_con_zona_horaria():
+    ledger = InventoryLedger(checkpoint_interval=2)
+    for hora in range(5):
+        ledger.record_movement(
+            StockMovement(
+                movement_id=f"M{hora}",
+                stock_type=StockType.MODULO,
+                movement_type=MovementType.ENTRADA,
+                quantity=1,
+                location=UBICACIONES[0],
+                occurred_at=datetime(2026, 3, 2, hora, tzinfo=timezone.utc),
+            )
+        )
+
+    madrid = timezone(timedelta(hours=1))
+    saldos = ledger.balance_by_stock_type(datetime(2026, 3, 2, 3, 30, tzinfo=madrid))
+
+    assert saldos == {StockType.MODULO: 3}
@@ -0,0 +1,64 @@
+from dataclasses import asdict
+from datetime import datetime, timedelta, timezone
+
+from inventory import (
+    ColumnarMovementStore,
+    InventoryLedger,
+    Location,
+    MovementType,
+    StockMovement,
+    StockType,
+)
+
+INICIO = datetime(2026, 3, 2, 8, 0)
+
+
+def movimiento(numero: int, **campos) -> StockMovement:
+    valores = dict(
+        movement_id=f"M{numero}",
+        stock_type=StockType.PRODUCTO_TERMINADO,
+        movement_type=MovementType.SALIDA,
+        quantity=numero,
+        location=Location("A", str(numero % 3)),
+        occurred_at=INICIO + timedelta(minutes=numero),
+    )
+    valores.update(campos)
+    return StockMovement(**valores)
+
+
+def test_el_almacen_columnar_devuelve_los_mismos_movimientos():
+    originales = [
+        movimiento(0, movement_id="entrada-ñandú-€", note="revisar"),
+        movimiento(1, quantity=2**40, purchase_id="PO-1"),
+        movimiento(2, occurred_at=datetime(2026, 3, 2, 9, tzinfo=timezone.utc)),
+        movimiento(3, production_id="OP-1", note=""),
+    ]
+    almacen = ColumnarMovementStore()
+    for m in originales:
+        almacen.append(m)
+
+    assert len(almacen) == len(originales)
+    assert [asdict(m) for m in almacen] == [asdict(m) for m in originales]
+    assert asdict(almacen[-1]) == asdict(originales[-1])
+
+
+def test_columnas_se_ensanchan_con_muchas_ubicaciones_y_enlaces():
+    almacen = ColumnarMovementStore()
+    for numero in range(70_000):
+        almacen.append(
+            movimiento(numero, location=Location("A", str(numero)), purchase_id=f"PO-{numero}")
+        )
+
+    ultimo = almacen[69_999]
+    assert ultimo.location == Location("A", "69999")
+    assert ultimo.purchase_id == "PO-69999"
+
+
+def test_movimientos_entre_fechas_con_llegadas_desordenadas():
+    ledger = InventoryLedger(ColumnarMovementStore())
+    for numero in (5, 1, 9, 3, 7, 2):
+        ledger.record_movement(movimiento(numero))
+
+    entre = ledger.movements_between(INICIO + timedelta(minutes=2), INICIO + timedelta(minutes=7))
+
+    assert [m.movement_id for m in entre] == ["M2", "M3", "M5"]
@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from inventory import (
+    ColumnarMovementStore,
+    InventoryLedger,
+    Location,
+    MovementType,
+    StockMovement,
+    StockType,
+)
+
+INICIO = datetime(2026, 3, 2, 8, 0)
+ALMACEN = Location("A", "1")
+
+
+def movimiento(numero: int, **campos) -> StockMovement:
+    valores = dict(
+        movement_id=f"M{numero}",
+        stock_type=StockType.MATERIA_PRIMA,
+        movement_type=MovementType.ENTRADA,
+        quantity=numero,
+        location=ALMACEN,
+        occurred_at=INICIO + timedelta(minutes=numero),
+    )
+    valores.update(campos)
+    return StockMovement(**valores)
+
+
+def test_ledgers_con_los_mismos_movimientos_son_iguales():
+    compartido = movimiento(1, purchase_id="PO-1")
+    primero, segundo = InventoryLedger([compartido]), InventoryLedger([compartido])
+    primero.balance_by_location()
+
+    assert primero == segundo
+    assert primero != InventoryLedger([movimiento(2)])
+
+
+def test_enlazar_un_movimiento_compartido_reindexa_todos_sus_ledgers():
+    compartido = movimiento(1, purchase_id="PO-1")
+    original = InventoryLedger([movimiento(0), compartido])
+    copia = InventoryLedger(movements=original.movements)
+
+    compartido.link_purchase("PO-2")
+
+    for ledger in (original, copia):
+        assert ledger.movements_for_purchase("PO-1") == []
+        assert ledger.movements_for_purchase("PO-2") == [compartido]
+
+
+@pytest.mark.parametrize("almacen", [list, ColumnarMovementStore])
+def test_enlazar_tras_registrar_actualiza_los_indices(almacen):
+    ledger = InventoryLedger(almacen())
+    for numero in range(5):
+        ledger.record_movement(movimiento(numero, production_id="OP-1" if numero % 2 else None))
+
+    leido = ledger.movements[3]
+    leido.link_production("OP-2")
+    ledger.movements[0].link_production("OP-2")
+
+    assert [m.movement_id for m in ledger.movements_for_production("OP-1")] == ["M1"]
+    assert [m.movement_id for m in ledger.movements_for_production("OP-2")] == ["M0", "M3"]
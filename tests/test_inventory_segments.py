@@ -0,0 +1,64 @@
+import os
+from datetime import datetime
+
+import pytest
+
+from inventory import Location, MovementType, StockMovement, StockType
+from inventory_segments import HEADER, RECORD_SIZE, LedgerSegment, SegmentWriter
+
+BODEGA = Location(warehouse="central", shelf="A-01")
+
+
+def escribir_segmento(ruta, cantidad=10):
+    with SegmentWriter(str(ruta)) as escritor:
+        for indice in range(cantidad):
+            escritor.append(
+                StockMovement(
+                    movement_id=f"m{indice}",
+                    stock_type=StockType.MATERIA_PRIMA,
+                    movement_type=MovementType.ENTRADA,
+                    quantity=indice + 1,
+                    location=BODEGA,
+                    occurred_at=datetime(2026, 1, 1, 8, indice),
+                )
+            )
+    return str(ruta)
+
+
+def corromper(ruta, registro, byte=20):
+    with open(ruta, "r+b") as archivo:
+        archivo.seek(len(HEADER) + registro * RECORD_SIZE + byte)
+        valor = archivo.read(1)[0]
+        archivo.seek(-1, os.SEEK_CUR)
+        archivo.write(bytes([valor ^ 0xFF]))
+
+
+@pytest.mark.parametrize("verify", [False, True])
+def test_ultimo_registro_roto_se_ignora(tmp_path, verify):
+    ruta = escribir_segmento(tmp_path / "ledger.seg")
+    corromper(ruta, registro=10)
+
+    with LedgerSegment.open(ruta, verify=verify) as segmento:
+        assert len(segmento) == 9
+        assert segmento.balance_by_location() == {BODEGA.label(): sum(range(1, 10))}
+
+
+def test_registro_intermedio_con_crc_malo_solo_falla_con_verify(tmp_path):
+    ruta = escribir_segmento(tmp_path / "ledger.seg")
+    # El byte 20 cae en la cantidad: el registro sigue pareciendo un movimiento.
+    corromper(ruta, registro=3)
+
+    with LedgerSegment.open(ruta) as segmento:
+        assert len(segmento) == 10
+    with pytest.raises(ValueError, match="record 3 fails its checksum"):
+        LedgerSegment.open(ruta, verify=True)
+
+
+def test_registro_intermedio_con_tipo_desconocido_falla_sin_verify(tmp_path):
+    ruta = escribir_segmento(tmp_path / "ledger.seg")
+    with open(ruta, "r+b") as archivo:
+        archivo.seek(len(HEADER) + 3 * RECORD_SIZE)
+        archivo.write(bytes(RECORD_SIZE))
+
+    with pytest.raises(ValueError, match="record 3 has an unknown kind"):
+        LedgerSegment.open(ruta)
@@ -0,0 +1,39 @@
+import random
+
+import pytest
+
+from fabrica import planificar_mrp
+from fabrica.mrp import ExplosionBOM, RequerimientoMRP
+
+
+def test_explota_varios_niveles_neteando_cada_uno():
+    bom = {"SOFA": {"ARMAZON": 1, "TELA": 6}, "ARMAZON": {"TABLERO": 4, "TELA": 1}}
+    requerimientos = planificar_mrp({"SOFA": 3}, {"SOFA": 1, "ARMAZON": 1, "TELA": 2}, bom)
+
+    assert requerimientos["ARMAZON"] == RequerimientoMRP("ARMAZON", 2, 1, 1)
+    assert requerimientos["TABLERO"] == RequerimientoMRP("TABLERO", 4, 0, 4)
+    assert requerimientos["TELA"] == RequerimientoMRP("TELA", 13, 2, 11)
+
+
+@pytest.mark.parametrize("semilla", range(20))
+def test_bom_como_mapa_equivale_a_explosion_precompilada(semilla):
+    aleatorio = random.Random(semilla)
+    items = aleatorio.randint(3, 30)
+    bom = {}
+    for padre in range(items - 1):
+        hijos = aleatorio.sample(range(padre + 1, items), min(3, items - padre - 1))
+        bom[f"i{padre}"] = {f"i{hijo}": aleatorio.randint(1, 4) for hijo in hijos}
+    demanda = {f"i{item}": aleatorio.randint(0, 10) for item in range(0, items, 3)}
+    demanda["fuera-del-bom"] = 2
+    stock = {f"i{item}": aleatorio.randint(-3, 8) for item in range(items)}
+
+    assert planificar_mrp(demanda, stock, bom) == ExplosionBOM(bom).explotar(demanda, stock)
+
+
+def test_bom_con_ciclo_lanza_value_error():
+    bom = {"A": {"B": 1}, "B": {"C": 1}, "C": {"B": 1}}
+
+    with pytest.raises(ValueError, match="B, C"):
+        planificar_mrp({"A": 1}, {}, bom)
+    with pytest.raises(ValueError, match="B, C"):
+        ExplosionBOM(bom)
@@ -0,0 +1,62 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from fabrica import planificar_mrp
+from fabrica.mrp_temporal import Bucket, Horizonte, MRPTemporal
+
+INICIO = date(2026, 3, 2)
+
+
+def planificar_en_un_periodo(demanda, stock, bom):
+    horizonte = Horizonte(INICIO, periodos=1, bucket=Bucket.SEMANAL)
+    por_fecha = {item: {INICIO: cantidad} for item, cantidad in demanda.items()}
+    return MRPTemporal(bom).planificar(horizonte, por_fecha, stock)
+
+
+def test_item_no_alcanzado_con_stock_negativo_no_lanza_ordenes():
+    bom = {"P": {"C": 2}, "Q": {"C": 1}}
+
+    plan = planificar_en_un_periodo({"P": 1}, {"Q": -5}, bom)
+
+    assert plan["Q"].requerimiento_neto == [0]
+    assert plan["Q"].lanzamientos == [0]
+    assert plan["C"].demanda_bruta == [planificar_mrp({"P": 1}, {"Q": -5}, bom)["C"].demanda]
+
+
+@pytest.mark.parametrize("semilla", range(20))
+def test_un_periodo_sin_plazos_equivale_a_planificar_mrp(semilla):
+    aleatorio = random.Random(semilla)
+    items = aleatorio.randint(3, 20)
+    bom = {
+        f"i{padre}": {
+            f"i{hijo}": aleatorio.randint(1, 4)
+            for hijo in aleatorio.sample(range(padre + 1, items), min(3, items - padre - 1))
+        }
+        for padre in range(items - 1)
+    }
+    demanda = {
+        f"i{item}": aleatorio.randint(0, 10)
+        for item in aleatorio.sample(range(items), aleatorio.randint(1, items))
+    }
+    stock = {f"i{item}": aleatorio.randint(-5, 8) for item in range(items)}
+
+    plan = planificar_en_un_periodo(demanda, stock, bom)
+    esperado = planificar_mrp(demanda, stock, bom)
+
+    for item in plan.indice.items:
+        neto = esperado[item].requerimiento_neto if item in esperado else 0
+        assert plan[item].requerimiento_neto == [neto], item
+
+
+def test_plazo_desfasa_el_lanzamiento_del_componente():
+    horizonte = Horizonte(INICIO, periodos=4, bucket=Bucket.SEMANAL)
+    mrp = MRPTemporal({"SOFA": {"TELA": 3}}, plazos_dias={"SOFA": 7, "TELA": 10})
+
+    plan = mrp.planificar(horizonte, {"SOFA": {INICIO + timedelta(weeks=3): 2}}, {})
+
+    assert plan["SOFA"].lanzamientos == [0, 0, 2, 0]
+    assert plan["TELA"].demanda_bruta == [0, 0, 6, 0]
+    # Dos semanas de plazo: lo que debía lanzarse antes del inicio queda atrasado.
+    assert plan["TELA"].lanzamientos == [6, 0, 0, 0]
@@ -0,0 +1,41 @@
+import random
+
+import pytest
+
+from fabrica import planificar_mrp
+from fabrica.mrp_vectorial import planificar_mrp_vectorial
+
+
+def bom_aleatorio(aleatorio: random.Random, items: int) -> dict:
+    bom = {}
+    for padre in range(items - 1):
+        hijos = aleatorio.sample(range(padre + 1, items), min(3, items - padre - 1))
+        bom[f"i{padre}"] = {f"i{hijo}": aleatorio.randint(1, 4) for hijo in hijos}
+    return bom
+
+
+def test_padre_no_alcanzado_con_stock_negativo_no_genera_demanda():
+    bom = {"i0": {"i2": 3}, "i1": {"i2": 3}, "i2": {"i3": 1}, "i3": {"i4": 1}}
+    demanda = {"i1": 0, "i2": 0}
+    stock = {"i0": -3, "i3": -3}
+
+    vectorial = planificar_mrp_vectorial(demanda, stock, bom).a_diccionario()
+
+    assert vectorial == planificar_mrp(demanda, stock, bom)
+    assert vectorial["i2"].demanda == 0
+
+
+@pytest.mark.parametrize("semilla", range(20))
+def test_equivale_a_planificar_mrp_con_stock_negativo(semilla):
+    aleatorio = random.Random(semilla)
+    items = aleatorio.randint(3, 25)
+    bom = bom_aleatorio(aleatorio, items)
+    demanda = {
+        f"i{item}": aleatorio.randint(0, 10)
+        for item in aleatorio.sample(range(items), aleatorio.randint(1, items))
+    }
+    stock = {f"i{item}": aleatorio.randint(-5, 8) for item in range(items)}
+
+    vectorial = planificar_mrp_vectorial(demanda, stock, bom).a_diccionario()
+
+    assert vectorial == planificar_mrp(demanda, stock, bom)
@@ -0,0 +1,149 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from fabrica import (
+    Estacion,
+    EstadoEstacion,
+    Modulo,
+    Pedido,
+    PlanificadorCapacidad,
+    crear_orden_produccion,
+    duraciones_historicas,
+    programar_produccion,
+)
+
+INICIO = datetime(2026, 3, 2, 8, 0)
+RUTA = list(Estacion)
+DURACIONES = {
+    Estacion.CORTE: 12.0,
+    Estacion.COSTURA: 35.0,
+    Estacion.TAPIZADO: 50.0,
+    Estacion.EMBALAJE: 8.0,
+}
+
+
+def orden(id_orden, *cantidades, estaciones=None):
+    modulos = [
+        Modulo(f"SKU-{indice}", "módulo", cantidad) for indice, cantidad in enumerate(cantidades)
+    ]
+    pedido = Pedido(f"PED-{id_orden}", "cliente", modulos)
+    return crear_orden_produccion(id_orden, pedido, estaciones)
+
+
+def cubierto(intervalos, desde, hasta):
+    """True si los intervalos ordenados cubren ``[desde, hasta)`` sin huecos."""
+    for inicio, fin in intervalos:
+        if inicio > desde:
+            break
+        desde = max(desde, fin)
+    return desde >= hasta
+
+
+@pytest.mark.parametrize("semilla", range(5))
+def test_programa_respeta_capacidad_ruta_y_no_deja_recursos_ociosos(semilla):
+    aleatorio = random.Random(semilla)
+    capacidad = {estacion: aleatorio.randint(1, 3) for estacion in RUTA}
+    ordenes = []
+    for indice in range(40):
+        nueva = orden(f"OP-{indice:03d}", *[aleatorio.randint(1, 3) for _ in range(2)])
+        if aleatorio.random() < 0.2:
+            nueva.estaciones[Estacion.CORTE].estado = EstadoEstacion.COMPLETADO
+        ordenes.append(nueva)
+    prioridades = {o.id_orden: aleatorio.randint(1, 5) for o in ordenes}
+    planificador = PlanificadorCapacidad(capacidad, DURACIONES)
+
+    programa = planificador.programar(ordenes, prioridades, INICIO)
+
+    ocupacion = {}
+    for tarea in programa.tareas:
+        assert tarea.recurso < capacidad[tarea.estacion]
+        ocupacion.setdefault((tarea.estacion, tarea.recurso), []).append((tarea.inicio, tarea.fin))
+    for intervalos in ocupacion.values():
+        intervalos.sort()
+        assert all(a[1] <= b[0] for a, b in zip(intervalos, intervalos[1:]))
+
+    for o in ordenes:
+        tareas = sorted(programa.tareas_de(o.id_orden), key=lambda tarea: tarea.inicio)
+        pendientes = [
+            estacion
+            for estacion in RUTA
+            if o.estaciones[estacion].estado != EstadoEstacion.COMPLETADO
+        ]
+        assert [tarea.estacion for tarea in tareas] == pendientes
+        listo = INICIO
+        for tarea in tareas:
+            assert tarea.duracion == timedelta(minutes=planificador.duracion(o, tarea.estacion))
+            assert tarea.inicio >= listo
+            # Lista sin demoras: mientras la orden espera, todos los recursos trabajan.
+            for recurso in range(capacidad[tarea.estacion]):
+                intervalos = ocupacion.get((tarea.estacion, recurso), [])
+                assert cubierto(intervalos, listo, tarea.inicio), (tarea, recurso)
+            listo = tarea.fin
+
+
+def test_prioridad_y_luego_orden_de_llegada():
+    ordenes = [orden("A", 1), orden("B", 1), orden("C", 1), orden("D", 1)]
+    capacidad = {estacion: 1 for estacion in RUTA}
+
+    programa = programar_produccion(
+        ordenes, capacidad, DURACIONES, prioridades={"C": 1, "B": 2, "D": 2}, inicio=INICIO
+    )
+
+    cortes = [t for t in programa.tareas if t.estacion == Estacion.CORTE]
+    assert [t.id_orden for t in sorted(cortes, key=lambda t: t.inicio)] == ["C", "B", "D", "A"]
+
+
+def test_fines_simultaneos_compiten_por_prioridad():
+    # A y B terminan el corte a la vez; B es más urgente y cose primero.
+    ordenes = [orden("A", 1), orden("B", 1)]
+    capacidad = {estacion: 1 for estacion in RUTA}
+    capacidad[Estacion.CORTE] = 2
+
+    programa = programar_produccion(
+        ordenes, capacidad, DURACIONES, prioridades={"A": 5, "B": 1}, inicio=INICIO
+    )
+
+    (costura_b,) = [t for t in programa.tareas_de("B") if t.estacion == Estacion.COSTURA]
+    assert costura_b.inicio == INICIO + timedelta(minutes=12)
+
+
+def test_duraciones_por_sku_y_estaciones_omitidas():
+    o = orden("A", 2, 1, estaciones=[Estacion.COSTURA, Estacion.EMBALAJE])
+    capacidad = {Estacion.COSTURA: 1, Estacion.EMBALAJE: 1}
+
+    programa = programar_produccion(
+        [o],
+        capacidad,
+        DURACIONES,
+        inicio=INICIO,
+        duraciones_sku={(Estacion.COSTURA, "SKU-0"): 10.0},
+    )
+
+    assert [(t.estacion, t.duracion) for t in programa.tareas] == [
+        (Estacion.COSTURA, timedelta(minutes=2 * 10 + 1 * 35)),
+        (Estacion.EMBALAJE, timedelta(minutes=3 * 8)),
+    ]
+    assert programa.makespan == timedelta(minutes=79)
+    assert programa.utilizacion()[Estacion.CORTE] == 0.0
+
+
+def test_errores_de_configuracion():
+    with pytest.raises(ValueError, match="negativa"):
+        PlanificadorCapacidad({Estacion.CORTE: -1}, DURACIONES)
+    with pytest.raises(ValueError, match="no tiene capacidad"):
+        programar_produccion([orden("A", 1)], {Estacion.CORTE: 1}, DURACIONES)
+    with pytest.raises(ValueError, match="No hay duración para SKU-0"):
+        programar_produccion(
+            [orden("A", 1)], {estacion: 1 for estacion in RUTA}, {Estacion.CORTE: 1.0}
+        )
+
+
+def test_duraciones_historicas_reparten_por_unidad():
+    o = orden("A", 2, 2)
+    o.registrar_inicio(Estacion.CORTE, INICIO)
+    o.registrar_fin(Estacion.CORTE, INICIO + timedelta(minutes=60))
+    o.registrar_inicio(Estacion.COSTURA, INICIO)
+
+    assert duraciones_historicas([o, orden("vacía")]) == {Estacion.CORTE: 15.0}
@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+from fabrica import planificar_mrp
+from fabrica.mrp import PlanificadorMRP
+
+BOM = {"SOFA": {"ARMAZON": 1, "TELA": 6}, "ARMAZON": {"TABLERO": 4, "TELA": 1}}
+
+
+def test_pedido_devuelve_solo_las_filas_que_cambian():
+    planificador = PlanificadorMRP(BOM, {"SOFA": 2}, {"TABLERO": 100})
+
+    cambios = planificador.registrar_pedido("SOFA", 1)
+
+    assert set(cambios) == {"SOFA", "ARMAZON", "TABLERO", "TELA"}
+    assert cambios["TABLERO"].requerimiento_neto == 0
+    assert set(planificador.registrar_movimiento_stock("TABLERO", 5)) == {"TABLERO"}
+    assert planificador.requerimientos == planificar_mrp({"SOFA": 3}, {"TABLERO": 105}, BOM)
+
+
+def test_cancelar_mas_de_lo_pedido_falla_sin_cambiar_el_plan():
+    planificador = PlanificadorMRP(BOM, {"SOFA": 2})
+    antes = dict(planificador.requerimientos)
+
+    with pytest.raises(ValueError):
+        planificador.cancelar_pedido("SOFA", 3)
+    with pytest.raises(ValueError):
+        planificador.registrar_pedido("SOFA", 0)
+
+    assert planificador.requerimientos == antes
+
+
+@pytest.mark.parametrize("semilla", range(10))
+def test_deltas_equivalen_a_regenerar_el_plan(semilla):
+    aleatorio = random.Random(semilla)
+    items = 15
+    bom = {
+        f"i{padre}": {
+            f"i{hijo}": aleatorio.randint(1, 3)
+            for hijo in aleatorio.sample(range(padre + 1, items), min(3, items - padre - 1))
+        }
+        for padre in range(items - 1)
+    }
+    planificador = PlanificadorMRP(bom)
+    demanda, stock = {}, {}
+    for _ in range(40):
+        item = f"i{aleatorio.randrange(items)}"
+        if aleatorio.random() < 0.5:
+            cantidad = aleatorio.randint(1, 5)
+            planificador.registrar_pedido(item, cantidad)
+            demanda[item] = demanda.get(item, 0) + cantidad
+        elif demanda.get(item):
+            cantidad = aleatorio.randint(1, demanda[item])
+            planificador.cancelar_pedido(item, cantidad)
+            demanda[item] -= cantidad
+        else:
+            delta = aleatorio.randint(-4, 6)
+            planificador.registrar_movimiento_stock(item, delta)
+            stock[item] = stock.get(item, 0) + delta
+
+        assert planificador.requerimientos == planificar_mrp(demanda, stock, bom)